@@ -0,0 +1,62 @@
+import os
+import sys
+import fire
+import statistics
+import subprocess
+from parse.atn_cache import ATN_CACHE_DIR
+
+SCRIPT = '''
+import time
+start = time.perf_counter()
+import parse.lexer, parse.parser
+print(time.perf_counter() - start)
+'''
+
+
+def import_time() -> float:
+
+    """
+    Imports the generated lexer and parser in a fresh interpreter.
+
+    :return: import time in seconds
+    """
+
+    stdout = subprocess.run([sys.executable, '-c', SCRIPT], stdout=subprocess.PIPE,
+                            check=True, universal_newlines=True).stdout
+    return float(stdout.split()[-1])
+
+
+def clear_atn_cache() -> None:
+
+    for name in os.listdir(ATN_CACHE_DIR):
+        if name.startswith('atn-'):
+            os.remove(os.path.join(ATN_CACHE_DIR, name))
+
+
+def main(n: int = 10) -> None:
+
+    """
+    Measures the import time of the generated lexer and parser, which build
+    their ATNs at import, with and without the ATN cache. A first import
+    writes the bytecode of the generated modules, unless disabled by
+    PYTHONDONTWRITEBYTECODE, in which case compilation dominates timings.
+
+    :param n: number of imports of each kind
+    """
+
+    import_time()
+
+    misses = []
+    for _ in range(n):
+        clear_atn_cache()
+        misses.append(import_time())
+
+    hits = [import_time() for _ in range(n)]
+
+    print(f'import without ATN cache: {statistics.median(misses):.3f}s median')
+    print(f'import with ATN cache:    {statistics.median(hits):.3f}s median')
+
+
+if __name__ == '__main__':
+
+    fire.Fire(main)
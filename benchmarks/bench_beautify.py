@@ -0,0 +1,117 @@
+import os
+import fire
+import time
+import tracemalloc
+from colorama import Fore, Style
+from typing import List, Callable, Tuple
+from output.cmd import Beautifier
+from parse.models import Table, Statement, Procedure
+
+
+def results(statements: int, per_procedure: int = 50) -> List[Procedure]:
+
+    """
+    Builds results holding a given number of statements, each reading from
+    and joining two tables.
+
+    :param statements: number of statements
+    :param per_procedure: number of statements per procedure
+    :return: list of Procedure objects
+    """
+
+    statement = Statement('INSERT', Table('dwh', 'target'),
+                          from_table=(Table('staging', 'source_1'), Table('staging', 'source_2')),
+                          join_table=(Table('staging', 'source_3'), Table('staging', 'source_4')),
+                          target_columns=('col_1', 'col_2', 'col_3'), procedure='load')
+
+    return [Procedure('dwh', f'load_{i}', f'procedures/load_{i}.sql', (statement,) * per_procedure)
+            for i in range(statements // per_procedure)]
+
+
+def previous_beautify(results: List[Procedure]) -> None:
+
+    """Previous beautify: whole report built by string concatenation, then printed"""
+
+    msg = f''
+
+    for p in results:
+
+        title_len = len(f"| {p.schema}.{p.name} ({p.path} |") + 1
+        msg += f'\n{Fore.GREEN}{"".join(["-" for x in range(title_len)])}\n'
+        msg += f"{Fore.GREEN}| {p.schema}.{p.name} ({p.path}) |\n"
+        msg += f'{Fore.GREEN}{"".join(["-" for x in range(title_len)])}\n{Style.RESET_ALL}'
+        for q in p.statements:
+            msg += f"|\n|--- {Fore.BLUE}{q.operation}{Style.RESET_ALL} " \
+                   f"----> {Fore.CYAN}{q.target_table.schema}.{q.target_table.name}\n{Style.RESET_ALL}"
+
+            if q.from_table:
+                for f in q.from_table:
+                    msg += f'{Fore.CYAN}                  ' \
+                           f". {Fore.BLUE}FROM{Fore.CYAN} {f.schema}.{f.name}{Style.RESET_ALL}\n"
+            if q.join_table:
+                for j in q.join_table:
+                    msg += f'{Fore.CYAN}                  ' \
+                           f". {Fore.BLUE}JOIN{Fore.CYAN} {j.schema}.{j.name}{Style.RESET_ALL}\n"
+
+            if q.target_columns:
+                msg += f". {Fore.BLUE}Columns --> {Fore.CYAN} {list(q.target_columns)}{Style.RESET_ALL}\n\n"
+
+    print(msg)
+
+
+def display(results: List[Procedure], color: bool) -> None:
+
+    b = Beautifier(color=color)
+    b.write(results)
+    b.summary()
+
+
+def measure(display: Callable[[], None]) -> Tuple[float, int]:
+
+    """
+    Times a display function, then runs it again under tracemalloc.
+
+    :return: tuple (seconds, peak memory allocated while displaying in bytes)
+    """
+
+    start = time.perf_counter()
+    display()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    display()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return elapsed, peak
+
+
+def main(statements: int = 50000) -> None:
+
+    """
+    Compares displaying results with the previous beautify and with the
+    Beautifier, output being redirected to /dev/null.
+
+    :param statements: number of statements displayed
+    """
+
+    procedures = results(statements)
+
+    with open(os.devnull, 'w') as devnull:
+        stdout = os.dup(1)
+        os.dup2(devnull.fileno(), 1)
+        try:
+            timings = [('previous beautify', measure(lambda: previous_beautify(procedures))),
+                       ('Beautifier, colours', measure(lambda: display(procedures, True))),
+                       ('Beautifier, no colours', measure(lambda: display(procedures, False)))]
+        finally:
+            os.dup2(stdout, 1)
+            os.close(stdout)
+
+    for label, (elapsed, peak) in timings:
+        print(f'{label:<24} {elapsed:6.2f}s | peak {peak / 2 ** 20:7.1f} MB')
+
+
+if __name__ == '__main__':
+
+    fire.Fire(main)
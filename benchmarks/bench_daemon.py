@@ -0,0 +1,82 @@
+import sys
+import time
+import fire
+import socket
+import statistics
+import subprocess
+import http.client
+
+PROCEDURE_PATH = './tests/_resources/clean/procedure.sql'
+SETTINGS = ['--pmode', 'procedure', '--dl', ';;', '--jobs', '1']
+
+
+def free_port() -> int:
+
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def request(port: int, route: str, body: str) -> int:
+
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    conn.request('POST', route, body)
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+
+    return response.status
+
+
+def main(n: int = 10, path: str = PROCEDURE_PATH, table: str = 'dwh.mytable') -> None:
+
+    """
+    Compares the latency of cold CLI calls, each paying interpreter start-up,
+    parser import and warm-up, with the latency of queries answered by a
+    running daemon, for parsing and for filtering the same file.
+
+    :param n: number of calls of each kind
+    :param path: .sql file or directory to query
+    :param table: table to filter on
+    """
+
+    cold = []
+    for _ in range(n):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, 'ezql.py', 'parse', '--i', path, '--tables', f"['{table}']"] + SETTINGS,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        cold.append(time.perf_counter() - start)
+
+    port = free_port()
+    daemon = subprocess.Popen([sys.executable, 'ezql.py', 'serve', '--port', str(port)] + SETTINGS,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        start = time.perf_counter()
+        while True:
+            try:
+                request(port, '/status', '')
+                break
+            except ConnectionRefusedError:
+                time.sleep(0.05)
+        print(f'daemon start-up:        {time.perf_counter() - start:7.3f}s')
+
+        timings = {'/parse': [], '/filter': []}
+        queries = {'/parse': f'{{"path": "{path}"}}',
+                   '/filter': f'{{"path": "{path}", "tables": ["{table}"]}}'}
+        for _ in range(n):
+            for route, timing in timings.items():
+                start = time.perf_counter()
+                assert request(port, route, queries[route]) == 200
+                timing.append(time.perf_counter() - start)
+    finally:
+        daemon.terminate()
+        daemon.wait()
+
+    print(f'cold CLI parse+filter:  {statistics.median(cold):7.3f}s median')
+    for route, timing in timings.items():
+        print(f'daemon {route:<15} {statistics.median(timing):7.3f}s median')
+
+
+if __name__ == '__main__':
+
+    fire.Fire(main)
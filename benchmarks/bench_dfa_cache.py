@@ -0,0 +1,63 @@
+import sys
+import time
+import fire
+import tempfile
+import subprocess
+
+# Parses the e2e fixtures in a fresh interpreter, loading the DFA cache first
+# if a cache directory is given, and prints the elapsed time to first result
+RUN = """
+import os, sys, time
+start = time.perf_counter()
+from parse.worker import Worker
+from parse.dfa_cache import load_dfa_cache, save_dfa_cache
+cache_dir = sys.argv[1] if len(sys.argv) > 1 else None
+if cache_dir:
+    load_dfa_cache(cache_dir)
+w = Worker('dwh', ';', 'ddl', 'simple')
+d = './tests/_resources/clean/'
+for f in sorted(os.listdir(d)):
+    w.parse_file(d + f)
+print(time.perf_counter() - start, file=sys.stderr)
+if cache_dir:
+    save_dfa_cache(cache_dir)
+"""
+
+
+def run(*args: str) -> float:
+
+    """
+    Runs the fixture parsing script in a new Python process.
+
+    :param args: extra script arguments
+    :return: elapsed time measured inside the process, in seconds
+    """
+
+    proc = subprocess.run([sys.executable, '-c', RUN, *args], stdout=subprocess.DEVNULL,
+                          stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    return float(proc.stderr.strip().splitlines()[-1])
+
+
+def main(repeat: int = 3) -> None:
+
+    """
+    Compares cold startups with startups loading a warmed DFA cache,
+    each parsing the e2e fixtures in a new process.
+
+    :param repeat: number of runs per mode
+    """
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+
+        # First run fills the cache
+        run(cache_dir)
+
+        cold = min(run() for _ in range(repeat))
+        warm = min(run(cache_dir) for _ in range(repeat))
+
+    print(f'cold start {cold:.3f}s | warm DFA cache {warm:.3f}s | speedup x{cold / warm:.1f}')
+
+
+if __name__ == '__main__':
+
+    fire.Fire(main)
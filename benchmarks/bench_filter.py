@@ -0,0 +1,44 @@
+import time
+import fire
+import random
+from parse.worker import Worker
+from parse.models import Table
+from benchmarks.bench_lineage import results
+
+
+def main(n: int = 20000, tables: int = 500, procedures: int = 100, runs: int = 5) -> None:
+
+    """
+    Measures simple tables filtering and procedures filtering times on
+    synthetic results of n statements, with long lists of tables and
+    procedures as generated from data catalogs.
+
+    :param n: number of statements
+    :param tables: number of tables to filter on
+    :param procedures: number of procedures to filter on
+    :param runs: number of filtering runs, the results index is built by the first one
+    """
+
+    rnd = random.Random(0)
+    parsed = results(n)
+    table_filter = [Table('dwh', f'table_{rnd.randrange(n)}') for _ in range(tables)]
+    procedure_filter = [Table('dwh', p.name) for p in rnd.sample(parsed, min(procedures, len(parsed)))]
+
+    worker = Worker('dwh', ';', 'procedure', 'simple')
+
+    for name, run in (('simple', lambda: worker.simple_filter(table_filter)),
+                      ('procedures', lambda: worker.procedures_filter(procedure_filter))):
+        timings = []
+        for _ in range(runs):
+            worker.results = parsed
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+        kept = sum(len(p.statements) for p in worker.results)
+        print(f'{name:<10} filter: first {timings[0]:7.3f}s | next {min(timings[1:] or timings):7.3f}s '
+              f'| {kept} statements kept')
+
+
+if __name__ == '__main__':
+
+    fire.Fire(main)
@@ -0,0 +1,67 @@
+import os
+import fire
+import time
+import shutil
+import tempfile
+from typing import List
+from output.graph import TableGraph
+from output.mermaid import Mermaid
+from parse.models import Table, Statement, Procedure
+
+
+def lineage(edges: int, sources: int = 10) -> List[Procedure]:
+
+    """
+    Builds results holding a given number of distinct data flows, each data
+    flow being written by two procedures.
+
+    :param edges: number of distinct data flows
+    :param sources: number of source tables per statement
+    :return: list of Procedure objects
+    """
+
+    statements = tuple(Statement('INSERT', Table('dwh', f'target_{i}'),
+                                 from_table=tuple(Table('staging', f'source_{i}_{j}') for j in range(sources)),
+                                 procedure='load')
+                       for i in range(edges // sources))
+
+    return [Procedure('dwh', f'load_{i}', f'load_{i}.sql', tuple(s._replace(procedure=f'load_{i}')
+                                                                  for s in statements)) for i in range(2)]
+
+
+def main(edges: List[int] = (10000, 100000, 1000000)) -> None:
+
+    """
+    Times building the tables data flows graph and writing it in each graph
+    format, next to the Mermaid HTML flowchart of the same results.
+
+    :param edges: numbers of distinct data flows
+    """
+
+    tmp = tempfile.mkdtemp()
+    try:
+        for n in edges:
+            results = lineage(n)
+
+            start = time.perf_counter()
+            graph = TableGraph(results)
+            timings = [f'build {time.perf_counter() - start:5.2f}s']
+
+            for fmt in ('dot', 'graphml', 'cyjs'):
+                path = os.path.join(tmp, f'graph.{fmt}')
+                start = time.perf_counter()
+                graph.save(path)
+                timings.append(f'{fmt} {time.perf_counter() - start:5.2f}s ({os.path.getsize(path) / 2 ** 20:.1f} MB)')
+
+            start = time.perf_counter()
+            Mermaid(results).tables_chart(os.path.join(tmp, 'chart.html'))
+            timings.append(f'mermaid html {time.perf_counter() - start:5.2f}s')
+
+            print(f'{n:>8} edges | ' + ' | '.join(timings))
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+
+    fire.Fire(main)
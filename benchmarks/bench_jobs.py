@@ -0,0 +1,55 @@
+import os
+import time
+import fire
+import shutil
+import tempfile
+from parse.worker import Worker
+from typing import Optional
+
+PROCEDURE_PATH = './tests/_resources/clean/procedure.sql'
+
+
+def main(n: int = 64, copies: int = 4, max_jobs: Optional[int] = None, chunksize: int = 4) -> None:
+
+    """
+    Measures directory parsing throughput with 1 to max_jobs processes, doubling
+    the number of processes each time, on n files holding the statements of
+    the test procedure repeated copies times. A first run warms the DFA cache
+    so that all runs start hot.
+
+    :param n: number of files to parse
+    :param copies: number of repetitions of the test procedure per file
+    :param max_jobs: maximum number of processes, defaults to the number of cores
+    :param chunksize: number of files per pool task
+    """
+
+    max_jobs = max_jobs or os.cpu_count()
+
+    with open(PROCEDURE_PATH, 'r') as file:
+        body = file.read() * copies
+
+    tmp = tempfile.mkdtemp()
+    try:
+        for i in range(n):
+            with open(os.path.join(tmp, f'file_{i}.sql'), 'w') as file:
+                file.write(body)
+
+        with Worker('dwh', ';', 'ddl', 'simple', jobs=1) as worker:
+            worker.parse_file(os.path.join(tmp, 'file_0.sql'))
+
+        jobs, baseline = 1, None
+        while jobs <= max_jobs:
+            with Worker('dwh', ';', 'ddl', 'simple', jobs=jobs, chunksize=chunksize) as worker:
+                start = time.perf_counter()
+                worker.run(tmp)
+                elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f'{jobs:>3} jobs: {elapsed:7.2f}s -> {n / elapsed:6.1f} files/sec | speedup x{baseline / elapsed:.2f}')
+            jobs *= 2
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+
+    fire.Fire(main)
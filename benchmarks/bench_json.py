@@ -0,0 +1,84 @@
+import os
+import fire
+import time
+import ujson
+import shutil
+import tempfile
+import tracemalloc
+from parse.worker import Worker
+from parse.models import Procedure
+from output.json import JsonWriter
+from typing import List, Callable, Tuple
+
+PROCEDURE_PATH = './tests/_resources/clean/procedure.sql'
+
+
+def dump_all(results: List[Procedure], path: str) -> None:
+
+    """Previous to_json: whole output dictionary built, then dumped at once"""
+
+    output = {x.path: [] for x in results}
+    for x in results:
+        output[x.path].append(x.to_dict())
+
+    with open(path, 'w') as file:
+        ujson.dump(output, file, indent=4)
+
+
+def stream(results: List[Procedure], path: str) -> None:
+
+    with JsonWriter(path) as writer:
+        for p in results:
+            writer.write(p)
+
+
+def measure(write: Callable[[List[Procedure], str], None], results: List[Procedure],
+            path: str) -> Tuple[float, int]:
+
+    """
+    :return: tuple (seconds, peak memory allocated while writing in bytes)
+    """
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    write(results, path)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return elapsed, peak
+
+
+def main(files: int = 2000, copies: int = 5) -> None:
+
+    """
+    Compares writing results with the previous to_json, building the whole
+    output dictionary before dumping it, and with the streaming JsonWriter,
+    to .json and .jsonl files. Results are copies of the test procedure
+    results, spread over several file paths.
+
+    :param files: number of file paths
+    :param copies: number of procedures per file path
+    """
+
+    with Worker('dwh', ';;', 'procedure', 'simple', jobs=1) as worker:
+        parsed = Procedure.from_dict(worker.parse_file(PROCEDURE_PATH)[0])
+
+    results = [parsed._replace(path=f'dir/file_{i}.sql') for i in range(files) for _ in range(copies)]
+
+    tmp = tempfile.mkdtemp()
+    try:
+        for label, write, name in (('to_json, whole dict', dump_all, 'all.json'),
+                                   ('JsonWriter, .json', stream, 'stream.json'),
+                                   ('JsonWriter, .jsonl', stream, 'stream.jsonl')):
+            path = os.path.join(tmp, name)
+            elapsed, peak = measure(write, results, path)
+            print(f'{label:<20} {elapsed:6.2f}s | peak {peak / 2 ** 20:7.1f} MB'
+                  f' | file {os.path.getsize(path) / 2 ** 20:6.1f} MB')
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+
+    fire.Fire(main)
@@ -0,0 +1,64 @@
+import time
+import fire
+import random
+from parse.worker import Worker
+from parse.models import Table, Procedure
+
+
+def table(i: int) -> dict:
+
+    return {'schema': 'dwh', 'name': f'table_{i}'}
+
+
+def results(n: int, per_procedure: int = 50, seed: int = 0) -> list:
+
+    """
+    Builds synthetic parsing results of n INSERT statements, each one writing
+    to a table and reading from two tables created by earlier statements, so
+    that lineage chains span the whole results.
+
+    :param n: number of statements
+    :param per_procedure: number of statements per procedure
+    :param seed: random seed
+    :return: list of Procedure objects
+    """
+
+    rnd = random.Random(seed)
+    procedures = []
+
+    for i in range(n):
+        if i % per_procedure == 0:
+            procedures.append({'schema': 'dwh', 'name': f'proc_{len(procedures)}',
+                               'path': 'bench.sql', 'statements': []})
+        procedures[-1]['statements'].append({
+            'operation': 'INSERT',
+            'target_table': table(i + 1),
+            'from_table': [table(rnd.randrange(i + 1))],
+            'join_table': [table(rnd.randrange(i + 1))],
+            'procedure': procedures[-1]['name']})
+
+    return [Procedure.from_dict(p) for p in procedures]
+
+
+def main(sizes: tuple = (1000, 5000, 20000)) -> None:
+
+    """
+    Measures recursive tables filtering time on synthetic results of growing
+    size, filtering on a table in the middle of the lineage chains.
+
+    :param sizes: numbers of statements
+    """
+
+    for n in sizes:
+        worker = Worker('dwh', ';', 'procedure', 'rec')
+        worker.results = results(n)
+        start = time.perf_counter()
+        worker.recursive_filter([Table.from_dict(table(n // 2))])
+        elapsed = time.perf_counter() - start
+        kept = sum(len(p.statements) for p in worker.results)
+        print(f'{n:>7} statements: {elapsed:8.3f}s | {kept} statements kept')
+
+
+if __name__ == '__main__':
+
+    fire.Fire(main)
@@ -0,0 +1,50 @@
+import time
+import fire
+import random
+from utils.processing import merge_results
+from parse.models import Table, Statement, Procedure
+
+
+def fragments(n: int, procedures: int, seed: int = 0) -> list:
+
+    """
+    Builds n procedure fragments as produced by recursive filtering, spread
+    over a number of procedures, each fragment holding a statement of its
+    procedure shared with another fragment half of the time.
+
+    :param n: number of fragments
+    :param procedures: number of distinct procedures
+    :param seed: random seed
+    :return: list of Procedure objects
+    """
+
+    rnd = random.Random(seed)
+    statements = [[Statement('INSERT', Table('dwh', f'table_{i}_{j}'))
+                   for j in range(n // procedures // 2 + 1)]
+                  for i in range(procedures)]
+
+    return [Procedure('dwh', f'proc_{i % procedures}', 'bench.sql', (rnd.choice(statements[i % procedures]),))
+            for i in range(n)]
+
+
+def main(sizes: tuple = (1000, 10000, 100000), procedures: int = 1000) -> None:
+
+    """
+    Measures merge_results time on growing numbers of fragments.
+
+    :param sizes: numbers of fragments
+    :param procedures: number of distinct procedures
+    """
+
+    for n in sizes:
+        results = fragments(n, procedures)
+        start = time.perf_counter()
+        merged = merge_results(results)
+        elapsed = time.perf_counter() - start
+        kept = sum(len(p.statements) for p in merged)
+        print(f'{n:>7} fragments: {elapsed:8.3f}s | {len(merged)} procedures, {kept} statements kept')
+
+
+if __name__ == '__main__':
+
+    fire.Fire(main)
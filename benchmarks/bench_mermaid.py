@@ -0,0 +1,125 @@
+import os
+import fire
+import time
+import shutil
+import tempfile
+from pathlib import Path
+from typing import List
+from output.mermaid import Mermaid, data_flow_ops, components
+from parse.models import Table, Statement, Procedure
+
+TEMPLATE = '''<html>
+<head>
+<script src="https://mermaidjs.github.io/mermaid-live-editor/src.ec178510.js"></script>
+</head>
+<body>
+<div class="mermaid"></div>
+</body>
+</html>'''
+
+
+def lineage(edges: int, sources: int = 10) -> List[Procedure]:
+
+    """
+    Builds results holding a given number of distinct arrows, each arrow
+    being found twice, in two procedures.
+
+    :param edges: number of distinct arrows
+    :param sources: number of source tables per statement
+    :return: list of Procedure objects
+    """
+
+    statements = tuple(Statement('INSERT', Table('dwh', f'target_{i}'),
+                                 from_table=tuple(Table('staging', f'source_{i}_{j}') for j in range(sources)),
+                                 procedure='load')
+                       for i in range(edges // sources))
+
+    return [Procedure('dwh', 'load', f'load_{i}.sql', statements) for i in range(2)]
+
+
+def previous_chart(results: List[Procedure], path: str) -> None:
+
+    """Previous Mermaid.tables_chart: list scan per arrow, chart set in the parsed template"""
+
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(TEMPLATE, features="html.parser")
+    tables_flow = []
+
+    for p in results:
+        for s in p.statements:
+            if s.operation in data_flow_ops:
+                for table in (s.from_table or ()) + (s.join_table or ()):
+                    arrow = f"{table.schema}.{table.name}-->|{s.procedure}|" \
+                            f"{s.target_table.schema}.{s.target_table.name};"
+                    if arrow not in tables_flow:
+                        tables_flow.append(arrow)
+
+    tables_flow.insert(0, "graph LR; \nlinkStyle default interpolate basis\n")
+    mermaid = soup.find("div", {"class": "mermaid"})
+    chart = soup.new_tag("div")
+    chart.attrs["class"] = "mermaid"
+    chart.string = '\n'.join(tables_flow)
+    mermaid.replace_with(chart)
+
+    with open(path, 'w') as outfile:
+        outfile.write(str(soup))
+
+
+def main(edges: List[int] = (10000, 100000, 1000000), previous_limit: int = 10000) -> None:
+
+    """
+    Times HTML flowchart generation by Mermaid.tables_chart, and by its
+    previous implementation (BeautifulSoup, list-based arrow deduplication),
+    as well as connected components detection and partitioned flowcharts
+    generation, 500 arrows per page.
+
+    :param edges: numbers of distinct arrows to chart
+    :param previous_limit: largest number of arrows charted with the previous
+    implementation, which is quadratic in the number of arrows. It needs
+    beautifulsoup4, no longer in requirements.txt
+    """
+
+    try:
+        import bs4
+    except ImportError:
+        previous_limit = 0
+
+    tmp = tempfile.mkdtemp()
+    try:
+        for n in edges:
+            results = lineage(n)
+
+            path = os.path.join(tmp, 'chart.html')
+            start = time.perf_counter()
+            Mermaid(results).tables_chart(path)
+            elapsed = time.perf_counter() - start
+            size = os.path.getsize(path)
+
+            flows = list(Mermaid(results).tables_flows())
+            start = time.perf_counter()
+            components(flows)
+            partitioning = time.perf_counter() - start
+
+            start = time.perf_counter()
+            pages = Mermaid(results).partitioned_chart(os.path.join(tmp, 'index.html'), 'components', 500)
+            partitioned = time.perf_counter() - start
+
+            if n <= previous_limit:
+                start = time.perf_counter()
+                previous_chart(results, os.path.join(tmp, 'previous.html'))
+                previous = f'{time.perf_counter() - start:8.2f}s'
+                assert Path(tmp, 'previous.html').read_text() == Path(path).read_text()
+            else:
+                previous = ' skipped'
+
+            print(f'{n:>8} arrows | tables_chart {elapsed:6.2f}s | previous {previous}'
+                  f' | file {size / 2 ** 20:6.1f} MB | components {partitioning:5.2f}s'
+                  f' | partitioned {partitioned:5.2f}s ({len(pages)} pages)')
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+
+    fire.Fire(main)
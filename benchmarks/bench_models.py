@@ -0,0 +1,43 @@
+import fire
+import ujson
+import tracemalloc
+from parse.worker import Worker
+from parse.models import Procedure
+
+PROCEDURE_PATH = './tests/_resources/clean/procedure.sql'
+
+
+def measure(build) -> float:
+
+    tracemalloc.start()
+    results = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return size / sum(len(p.statements if isinstance(p, Procedure) else p['statements']) for p in results)
+
+
+def main(copies: int = 2000) -> None:
+
+    """
+    Compares the memory used per statement by parsing results held as
+    dictionaries and as Procedure/Statement/Table objects, on copies of the
+    results of the test procedure, as read from the results cache.
+
+    :param copies: number of copies of the test procedure results
+    """
+
+    with Worker('dwh', ';;', 'procedure', 'simple', jobs=1) as worker:
+        parsed = worker.parse_file(PROCEDURE_PATH)
+
+    data = ujson.dumps(parsed)
+    dicts = measure(lambda: [p for _ in range(copies) for p in ujson.loads(data)])
+    objects = measure(lambda: [Procedure.from_dict(p) for _ in range(copies) for p in ujson.loads(data)])
+
+    print(f'dictionaries: {dicts:7.0f} bytes per statement')
+    print(f'objects:      {objects:7.0f} bytes per statement')
+
+
+if __name__ == '__main__':
+
+    fire.Fire(main)
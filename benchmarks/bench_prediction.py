@@ -0,0 +1,90 @@
+import os
+import time
+import fire
+import tempfile
+from parse.worker import Worker
+from typing import List
+
+FIXTURES_DIR = './tests/_resources/clean/'
+
+INSERT_SELECT = """INSERT INTO dwh.target_{i} (col_1, col_2, col_3, col_4, col_5)
+SELECT t1.id AS col_1,
+       t1.col_2,
+       COALESCE(t2.col_3, t3.col_3) AS col_3,
+       SUM(IFNULL(t3.col_4, 0)) AS col_4,
+       COUNT(DISTINCT t4.col_5) AS col_5
+FROM staging.src_{i} t1
+ JOIN staging.src_{j} t2 ON t2.id = t1.id AND t2.flag = 1
+ LEFT JOIN (SELECT id, col_3, col_4 FROM staging.sub_{i} WHERE col_4 > 0) t3
+  ON t3.id = t1.id
+ LEFT JOIN dwh.dim_{j} t4 USING (id)
+WHERE t1.col_2 IN (SELECT col_2 FROM dwh.filter_{j})
+GROUP BY 1, 2, 3;
+"""
+
+
+def synthetic_corpus(dir_path: str, n: int) -> str:
+
+    """
+    Writes a .sql file containing n large INSERT ... SELECT statements.
+
+    :param dir_path: directory to write the file into
+    :param n: number of statements
+    :return: path of the created file
+    """
+
+    path = os.path.join(dir_path, 'insert_select.sql')
+    with open(path, 'w') as file:
+        file.write('\n'.join(INSERT_SELECT.format(i=i, j=i + 1) for i in range(n)))
+
+    return path
+
+
+def time_files(paths: List[str], sll: bool) -> float:
+
+    """
+    Parses all files in ddl mode and returns the elapsed time.
+
+    :param paths: list of .sql file paths
+    :param sll: whether to use two-stage SLL/LL prediction
+    :return: elapsed time in seconds
+    """
+
+    worker = Worker('dwh', ';', 'ddl', 'simple', sll=sll)
+    start = time.perf_counter()
+    for path in paths:
+        worker.parse_file(path)
+
+    return time.perf_counter() - start
+
+
+def main(n: int = 20) -> None:
+
+    """
+    Compares full LL prediction with two-stage SLL/LL prediction on the
+    e2e fixtures and on a synthetic corpus of n large INSERT ... SELECT
+    statements. Each corpus is parsed once in each mode beforehand, so
+    that both modes are timed with a warm DFA cache.
+
+    :param n: number of synthetic INSERT ... SELECT statements
+    """
+
+    fixtures = sorted(os.path.join(FIXTURES_DIR, f) for f in os.listdir(FIXTURES_DIR)
+                      if f.endswith('.sql'))
+
+    with tempfile.TemporaryDirectory() as tmp:
+
+        corpora = (('e2e fixtures', fixtures),
+                   (f'{n} INSERT ... SELECT', [synthetic_corpus(tmp, n)]))
+
+        for label, paths in corpora:
+            time_files(paths, sll=False)
+            time_files(paths, sll=True)
+            ll = time_files(paths, sll=False)
+            sll = time_files(paths, sll=True)
+            print(f'{label:<24} LL {ll:.3f}s | SLL+LL {sll:.3f}s | speedup x{ll / sll:.1f}')
+
+
+if __name__ == '__main__':
+
+    fire.Fire(main)
@@ -0,0 +1,33 @@
+import time
+import fire
+from parse.preprocess import preprocess
+from tests.unit.test_preprocess import commented
+
+PROCEDURE_PATH = './tests/_resources/clean/procedure.sql'
+
+
+def main(mb: float = 1) -> None:
+
+    """
+    Compares the throughput of the sqlparse and fast preprocessors on the
+    commented test procedure repeated up to about mb megabytes.
+
+    :param mb: input size in megabytes
+    """
+
+    with open(PROCEDURE_PATH, 'r') as file:
+        body = commented(file.read())
+
+    text = body * max(1, int(mb * 1024 * 1024 / len(body)))
+    size = len(text) / 1024 / 1024
+
+    for preprocessor in ('sqlparse', 'fast'):
+        start = time.perf_counter()
+        preprocess(text, preprocessor)
+        elapsed = time.perf_counter() - start
+        print(f'{preprocessor:<9} {size:.1f} MB: {elapsed:.3f}s -> {size / elapsed:.2f} MB/s')
+
+
+if __name__ == '__main__':
+
+    fire.Fire(main)
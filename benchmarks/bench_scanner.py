@@ -0,0 +1,51 @@
+import re
+import time
+import fire
+from parse.mapper import Mapper
+from parse.preprocess import preprocess
+from parse.scanner import split_statements
+
+PROCEDURE_PATH = './tests/_resources/clean/procedure.sql'
+
+
+def regex_path(text: str, mapper: Mapper) -> int:
+
+    """Previous behavior: one findall sweep per statement type"""
+
+    return sum(len(re.findall(reg, text)) for reg in mapper.extract_regexes.values())
+
+
+def scanner_path(text: str, mapper: Mapper) -> int:
+
+    """Current behavior: single-pass splitter"""
+
+    return sum(1 for _ in split_statements(text, mapper.boundary_regex))
+
+
+def main(mb: float = 8) -> None:
+
+    """
+    Compares statement extraction throughput of the per-type regexes and
+    of the single-pass splitter on the test procedure body repeated up to
+    about mb megabytes.
+
+    :param mb: input size in megabytes
+    """
+
+    with open(PROCEDURE_PATH, 'r') as file:
+        body = preprocess(file.read())
+
+    text = body * max(1, int(mb * 1024 * 1024 / len(body)))
+    size = len(text) / 1024 / 1024
+    mapper = Mapper(';;', 'procedure')
+
+    for label, func in (('regex', regex_path), ('scanner', scanner_path)):
+        start = time.perf_counter()
+        n = func(text, mapper)
+        elapsed = time.perf_counter() - start
+        print(f'{label:<8} {n} statements in {size:.1f} MB: {elapsed:.3f}s -> {size / elapsed:.1f} MB/s')
+
+
+if __name__ == '__main__':
+
+    fire.Fire(main)
@@ -0,0 +1,81 @@
+import re
+import time
+import fire
+from antlr4 import CommonTokenStream
+from parse.lexer import MySqlLexer
+from parse.parser import MySqlParser
+from parse.mapper import Mapper
+from parse.preprocess import preprocess
+from parse.worker import Worker
+from parse.session import CaseInsensitiveInputStream
+from typing import List, Tuple
+
+PROCEDURE_PATH = './tests/_resources/clean/procedure.sql'
+
+
+def load_statements(n: int) -> List[Tuple[str, str]]:
+
+    """
+    Extracts all statements of the test procedure and repeats them n times.
+
+    :param n: number of repetitions of the test procedure
+    :return: list of (ddl_type, statement) tuples
+    """
+
+    with open(PROCEDURE_PATH, 'r') as file:
+        body = preprocess(file.read())
+
+    mapper = Mapper(';;', 'procedure')
+    statements = [(ddl_type, s) for ddl_type, reg in mapper.extract_regexes.items()
+                  for s in re.findall(reg, body)]
+
+    return statements * n
+
+
+def parse_rebuild(worker: Worker, statements: List[Tuple[str, str]]) -> None:
+
+    """Previous behavior: new lexer, parser and method map for every statement"""
+
+    for ddl_type, s in statements:
+        mapper = Mapper(worker.delimiter, worker.pmode)
+        lexer = MySqlLexer(CaseInsensitiveInputStream(s))
+        mapper.parser = MySqlParser(CommonTokenStream(lexer))
+        mapper.map_methods(worker)
+        tree = mapper.mapper[ddl_type]['parsermethod']()
+        mapper.mapper[ddl_type]['extractor'](tree, ddl_type)
+
+
+def parse_session(worker: Worker, statements: List[Tuple[str, str]]) -> None:
+
+    """Current behavior: one parser session per process, reset between statements"""
+
+    for ddl_type, s in statements:
+        worker.parse_statement(ddl_type, s, worker.mapper)
+
+
+def main(n: int = 5) -> None:
+
+    """
+    Compares statements/sec of per-statement parser construction with
+    the reusable parser session, on the test procedure repeated n times.
+
+    :param n: number of repetitions of the test procedure
+    """
+
+    statements = load_statements(n)
+    worker = Worker('dwh', ';;', 'procedure', 'simple', sll=False)
+
+    # Warm up the shared DFA cache so that both runs start hot
+    parse_session(worker, statements[:len(statements) // n])
+
+    for label, func in (('rebuild', parse_rebuild), ('session', parse_session)):
+        start = time.perf_counter()
+        func(worker, statements)
+        elapsed = time.perf_counter() - start
+        print(f'{label:<8} {len(statements)} statements in {elapsed:.3f}s '
+              f'-> {len(statements) / elapsed:.1f} statements/sec')
+
+
+if __name__ == '__main__':
+
+    fire.Fire(main)
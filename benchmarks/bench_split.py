@@ -0,0 +1,57 @@
+import os
+import time
+import fire
+import shutil
+import tempfile
+from parse.worker import Worker
+from typing import Optional
+
+PROCEDURE_PATH = './tests/_resources/clean/procedure.sql'
+
+
+def main(copies: int = 200, max_jobs: Optional[int] = None, statement_batch: int = 64) -> None:
+
+    """
+    Measures the parsing time of a single file holding the statements of the
+    test procedure repeated copies times, with 1 to max_jobs processes,
+    doubling the number of processes each time. A first run warms the DFA
+    cache so that all runs start hot.
+
+    :param copies: number of repetitions of the test procedure in the file
+    :param max_jobs: maximum number of processes, defaults to the number of cores
+    :param statement_batch: number of statements per pool task
+    """
+
+    max_jobs = max_jobs or os.cpu_count()
+
+    with open(PROCEDURE_PATH, 'r') as file:
+        body = file.read() * copies
+
+    tmp = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp, 'dump.sql')
+        with open(path, 'w') as file:
+            file.write(body)
+        size = len(body) / 1024 / 1024
+
+        with Worker('dwh', ';', 'ddl', 'simple', jobs=1) as worker:
+            worker.parse_file(path)
+
+        jobs, baseline = 1, None
+        while jobs <= max_jobs:
+            with Worker('dwh', ';', 'ddl', 'simple', jobs=jobs, split_file_mb=0,
+                        statement_batch=statement_batch) as worker:
+                start = time.perf_counter()
+                worker.run(path)
+                elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f'{jobs:>3} jobs: {size:.1f} MB in {elapsed:7.2f}s -> {size / elapsed:6.2f} MB/s | '
+                  f'speedup x{baseline / elapsed:.2f}')
+            jobs *= 2
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+
+    fire.Fire(main)
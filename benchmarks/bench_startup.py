@@ -0,0 +1,106 @@
+import re
+import sys
+import time
+import fire
+import statistics
+import subprocess
+from typing import List, Tuple
+
+PROCEDURE_PATH = './tests/_resources/clean/procedure.sql'
+SETTINGS = ['--pmode', 'procedure', '--dl', ';;', '--jobs', '1']
+
+importtime_regex = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def import_times(module: str) -> Tuple[int, List[Tuple[str, int]]]:
+
+    """
+    Imports a module in a fresh interpreter with -X importtime.
+
+    :param module: module name
+    :return: tuple (cumulative import time of the module in us, list of
+    (module name, cumulative import time in us) tuples of its direct imports,
+    slowest first)
+    """
+
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            stderr=subprocess.PIPE, check=True, universal_newlines=True).stderr
+
+    # Imports are reported once complete, children before their parent
+    total, children = 0, []
+    for line in stderr.splitlines():
+        m = importtime_regex.match(line)
+        if not m:
+            continue
+        name, us, depth = m.group(4), int(m.group(2)), len(m.group(3))
+        if depth == 1 and name == module:
+            total = us
+            break
+        elif depth == 1:
+            children = []
+        elif depth == 3:
+            children.append((name, us))
+
+    return total, sorted(children, key=lambda t: -t[1])
+
+
+def first_output(args: List[str], marker: str = '') -> Tuple[float, float]:
+
+    """
+    Runs a CLI command in a fresh interpreter.
+
+    :param args: ezql.py arguments
+    :param marker: text of the first output line to wait for, any line by default
+    :return: tuple (seconds until the first line holding marker is printed on
+    stdout, total seconds)
+    """
+
+    start = time.perf_counter()
+    with subprocess.Popen([sys.executable, 'ezql.py'] + args, stdout=subprocess.PIPE,
+                          stderr=subprocess.DEVNULL, universal_newlines=True) as proc:
+        for line in proc.stdout:
+            if marker in line:
+                break
+        first = time.perf_counter() - start
+        proc.stdout.read()
+    if proc.returncode:
+        raise RuntimeError(f'ezql.py {" ".join(args)} exited with code {proc.returncode}')
+
+    return first, time.perf_counter() - start
+
+
+def main(n: int = 5, path: str = PROCEDURE_PATH, top: int = 8) -> None:
+
+    """
+    Measures CLI start-up: import time of the entry point and its slowest
+    direct imports, as reported by python -X importtime, then the time to
+    first output of cold CLI runs: help, and the first result printed for a
+    small file, with and without the results cache.
+
+    :param n: number of runs of each command
+    :param path: small .sql file to parse
+    :param top: number of slowest imports to display
+    """
+
+    total, children = import_times('ezql')
+    print(f'import ezql: {total / 1e6:.3f}s')
+    for name, us in children[:top]:
+        print(f'  {name:<40} {us / 1e6:.3f}s')
+
+    # Fill the results cache first
+    first_output(['parse', '--i', path] + SETTINGS)
+
+    # Results are printed under a header holding their file path
+    commands = {'--help': (['--help'], ''),
+                'parse, cached': (['parse', '--i', path] + SETTINGS, f'({path})'),
+                'parse, --nocache': (['parse', '--i', path, '--nocache'] + SETTINGS, f'({path})')}
+
+    for label, (args, marker) in commands.items():
+        timings = [first_output(args, marker) for _ in range(n)]
+        print(f'{label:<18} first output {statistics.median(t[0] for t in timings):6.3f}s median'
+              f' | total {statistics.median(t[1] for t in timings):6.3f}s median')
+
+
+if __name__ == '__main__':
+
+    fire.Fire(main)
@@ -0,0 +1,78 @@
+import os
+import sys
+import fire
+import shutil
+import tempfile
+import subprocess
+
+DDL_PATH = './tests/_resources/clean/procedure.sql'
+
+# Parses a directory in a fresh interpreter, either collecting all results
+# with Worker.run or consuming them one by one with Worker.iter_parse, and
+# prints the time to first result, total time and peak memory allocated by
+# the parent while parsing
+RUN = """
+import sys, time, tracemalloc
+from parse.worker import Worker
+mode, path, chunksize = sys.argv[1], sys.argv[2], int(sys.argv[3])
+with Worker('dwh', ';', 'ddl', 'simple', chunksize=chunksize) as w:
+    tracemalloc.start()
+    start = time.perf_counter()
+    first = None
+    if mode == 'batch':
+        w.run(path)
+        first = time.perf_counter()
+    else:
+        for p in w.iter_parse(path):
+            if first is None:
+                first = time.perf_counter()
+    end = time.perf_counter()
+    peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+print(first - start, end - start, peak, file=sys.stderr)
+"""
+
+
+def run(mode: str, path: str, chunksize: int):
+
+    proc = subprocess.run([sys.executable, '-c', RUN, mode, path, str(chunksize)],
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                          universal_newlines=True, check=True)
+    return [float(x) for x in proc.stderr.strip().splitlines()[-1].split()]
+
+
+def main(sizes: tuple = (25, 100, 400), copies: int = 4, chunksize: int = 4) -> None:
+
+    """
+    Compares batch and streaming directory parsing on directories of growing
+    size, each file holding the statements of the test procedure repeated
+    copies times.
+
+    :param sizes: numbers of files to parse
+    :param copies: number of repetitions of the test procedure per file
+    :param chunksize: number of files per pool task
+    """
+
+    with open(DDL_PATH, 'r') as file:
+        body = file.read() * copies
+
+    for n in sizes:
+
+        tmp = tempfile.mkdtemp()
+        try:
+            for i in range(n):
+                sub = os.path.join(tmp, f'dir_{i % 10}')
+                os.makedirs(sub, exist_ok=True)
+                with open(os.path.join(sub, f'file_{i}.sql'), 'w') as file:
+                    file.write(body)
+
+            for mode in ('batch', 'stream'):
+                first, total, peak = run(mode, tmp, chunksize)
+                print(f'{n:>5} files {mode:<7} first result {first:7.2f}s | '
+                      f'total {total:7.2f}s | parent peak memory {peak:7.2f} MB')
+        finally:
+            shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+
+    fire.Fire(main)
@@ -1,23 +1,64 @@
+import os
 import fire
 from configparser import ConfigParser
-from utils.processing import str_to_sql_dict
+from contextlib import ExitStack
+from utils.processing import str_to_tables
 from utils.validation import *
 from utils.logging import *
 from parse.worker import Worker
-from output.cmd import beautify
-from output.mermaid import Mermaid
-from output.json import to_json
-from typing import Optional, List
+from parse.models import Procedure
+from parse.result_cache import ResultCache
+from parse.watcher import Watcher
+from output.cmd import Beautifier
+from typing import Optional, List, Tuple
 from pathlib import Path
 
 
 class MyEzQl(object):
 
+    def _config(self) -> ConfigParser:
+
+        cfg = ConfigParser()
+        cfg.read(f'{Path(__file__).parent}/config.ini')
+        return cfg
+
+    def _worker(self, cfg: ConfigParser, ds: str, dl: str, pmode: str, fmode: str,
+                sll: bool, cache: bool, jobs: int) -> Tuple[Worker, ResultCache]:
+
+        """
+        Builds the Worker used by commands, and its results cache.
+
+        :return: tuple (Worker, ResultCache)
+        """
+
+        preprocessor = cfg['parser_config'].get('preprocessor', 'fast')
+        validate_preprocessor(preprocessor)
+
+        # Cache directory is relative to config.ini
+        cache_dir = Path(__file__).parent / cfg['cache_config']['cache_dir']
+        dfa_cache = str(cache_dir) if cfg['cache_config'].getboolean('dfa_cache') else None
+
+        result_cache = ResultCache(str(cache_dir), cfg['cache_config'].getfloat('result_cache_max_mb'),
+                                   default_schema=ds, delimiter=dl, pmode=pmode,
+                                   preprocessor=preprocessor)
+
+        worker = Worker(default_schema=ds, delimiter=dl, pmode=pmode, fmode=fmode, sll=sll,
+                        dfa_cache=dfa_cache, result_cache=result_cache if cache else None,
+                        preprocessor=preprocessor, chunksize=cfg['pool_config'].getint('chunksize'),
+                        jobs=jobs or None, split_file_mb=cfg['pool_config'].getfloat('split_file_mb'),
+                        statement_batch=cfg['pool_config'].getint('statement_batch'))
+
+        return worker, result_cache
+
     def parse(self, i: str, ds: Optional[str]=None, dl: Optional[str]=None,
               pmode: Optional[str]=None, chart: Optional[str]=None,
-              json: Optional[str]=None, tables: Optional[List[str]]=None,
-              procedures: Optional[List[str]]=None,
-              fmode: Optional[str]=None, v: Optional[str]=None) -> None:
+              json: Optional[str]=None, graph: Optional[str]=None,
+              tables: Optional[List[str]]=None, procedures: Optional[List[str]]=None,
+              fmode: Optional[str]=None, v: Optional[str]=None,
+              sll: Optional[bool]=None, cache: Optional[bool]=None,
+              clear_cache: bool=False, cache_stats: bool=False,
+              jobs: Optional[int]=None, watch: bool=False, partition: Optional[str]=None,
+              quiet: bool=False, limit: int=0) -> None:
 
         """
         Core function parsing input file or directory and pretty-printing results
@@ -35,8 +76,15 @@ class MyEzQl(object):
         :param chart: path to output .html flowchart, defaults to '', in which case
         no output file is created
 
-        :param json: path to output .json file, defaults to '', in which case
-        no output file is created
+        :param json: path to output .json file, or .jsonl file (JSON Lines, one
+        procedure/file per line), defaults to '', in which case no output file
+        is created
+
+        :param graph: path to output graph file of tables data flows, for tools
+        rendering large graphs, defaults to '', in which case no output file is
+        created. The format is given by the file extension: .dot or .gv
+        (Graphviz DOT), .graphml (GraphML) or .cyjs (Cytoscape.js JSON). Edges
+        are weighted by the number of procedures writing the data flow
 
         :param tables: list of table names to filter on, only the parents
         and children of these table(s) will be kept in the outputs.
@@ -51,11 +99,42 @@ class MyEzQl(object):
         :param v: verbosity level, which will ultimately set the DEBUG output level.
         Must be one of ('v', 'vv', 'vvv', 'vvvv'), defaults to None, resulting in
         logging.INFO logger level
+
+        :param sll: two-stage parsing, trying fast SLL prediction first and
+        falling back to full LL prediction only for statements failing in SLL.
+        Defaults to config value, use --nosll to parse in LL mode only
+
+        :param cache: results cache, unchanged .sql files are not parsed again
+        and their results are read from the cache directory instead.
+        Defaults to config value, use --nocache to disable it
+
+        :param clear_cache: removes all cached results before parsing
+
+        :param cache_stats: displays results cache hit rate after parsing
+
+        :param jobs: number of parsing processes used for directories and large files, 0 uses all
+        available cores. Defaults to config value
+
+        :param partition: splits the .html flowchart into one page per partition of
+        the tables graph, 'components' (connected components) or 'schema' (schema of
+        target tables), and saves an index page linking them at the chart path.
+        Pages are split further beyond the page_size config value. Defaults to config
+        value, in which case a single flowchart is created if not set
+
+        :param quiet: only displays the number of procedures/files and statements
+        parsed in the terminal, instead of the results themselves
+
+        :param limit: maximum number of procedures/files displayed in the terminal,
+        the others being only counted in a summary, defaults to 0 (no limit)
+
+        :param watch: keeps results in memory after parsing and polls the input
+        path for changes, parsing again only added or modified files, and
+        updating filtered results and output files after each change.
+        Stops on Ctrl+C
         """
 
         # Read config
-        cfg = ConfigParser()
-        cfg.read(f'{Path(__file__).parent}/config.ini')
+        cfg = self._config()
 
         # Set default schema to config value if not provided
         ds = cfg['parser_config']['default_schema'] if not ds else ds
@@ -67,8 +146,16 @@ class MyEzQl(object):
         pmode = cfg['parser_config']['default_parsing_mode'] if not pmode else pmode
         fmode = cfg['parser_config']['default_filter_mode'] if not fmode else fmode
         v = cfg['parser_config']['default_verbosity'] if not v else v
+        sll = cfg['parser_config'].getboolean('sll_prediction') if sll is None else sll
+        jobs = cfg['pool_config'].getint('jobs') if jobs is None else jobs
+        cache = cfg['cache_config'].getboolean('result_cache') if cache is None else cache
+        partition = cfg['chart_config']['partition'] if partition is None else partition
+        page_size = cfg['chart_config'].getint('page_size')
 
-        validate_args(i, chart, json, tables, procedures, pmode, fmode, v)
+        validate_args(i, chart, json, graph, tables, procedures, pmode, fmode, v)
+        validate_jobs(jobs)
+        validate_partition(partition)
+        validate_limit(limit)
 
         set_verbosity(v)
 
@@ -76,38 +163,217 @@ class MyEzQl(object):
                        f'\n\n  default schema --> {ds}'
                        f'\n  delimiter      --> {dl}'
                        f'\n  parsing mode   --> {pmode}'
+                       f"\n  prediction     --> {'SLL, LL fallback' if sll else 'LL'}"
+                       f"\n  jobs           --> {jobs or os.cpu_count()}"
                        f"\n  filter mode    --> {fmode if tables or procedures else 'off'} "
                        f"\n{'    -> on procedure(s) ' + str(procedures) if procedures else ''}"
                        f"\n{'    -> on table(s) ' + str(tables) if tables else ''}")
 
-        # Configure and run parser
-        worker = Worker(default_schema=ds, delimiter=dl, pmode=pmode, fmode=fmode)
-        worker.run(i)
+        worker, result_cache = self._worker(cfg, ds, dl, pmode, fmode, sll, cache, jobs)
+        beautifier = Beautifier(quiet=quiet, limit=limit)
+        if clear_cache:
+            result_cache.clear()
+
+        # Run parser, the process pool is shut down on exit
+        with worker:
+
+            if watch:
+                self._watch(worker, i, cfg['watch_config'].getfloat('interval'),
+                            procedures, tables, chart, json, graph, partition, page_size, beautifier)
+                return
+
+            if procedures or tables:
+
+                worker.run(i)
 
-        # If procedure filter defined, apply filtering to results
-        if procedures:
-            procedures = str_to_sql_dict(procedures)
-            worker.procedures_filter(procedures)
+                # If procedure filter defined, apply filtering to results
+                if procedures:
+                    procedures = str_to_tables(procedures)
+                    worker.procedures_filter(procedures)
 
-        # If tables filter defined, apply filtering to results
-        if tables:
-            tables = str_to_sql_dict(tables)
-            worker.tables_filter(tables)
+                # If tables filter defined, apply filtering to results
+                if tables:
+                    tables = str_to_tables(tables)
+                    worker.tables_filter(tables)
 
-        # Pretty print results in terminal
-        beautify(worker.results)
+                # Pretty print results in terminal
+                beautifier.write(worker.results)
+
+            else:
+
+                # Without filters, results are printed, written to the JSON file and added
+                # to the graph as soon as they are parsed, and only kept in memory if needed
+                # for the flowchart. JSON write errors are logged, and parsing goes on
+                with ExitStack() as stack:
+                    if json:
+                        from output.json import JsonWriter
+                        writer = stack.enter_context(JsonWriter(json))
+                    if graph:
+                        from output.graph import TableGraph
+                        table_graph = TableGraph()
+                    for p in worker.iter_parse(i):
+                        beautifier.write([p])
+                        if json:
+                            writer.write(p)
+                        if graph:
+                            table_graph.add(p)
+                        if chart:
+                            worker.results.append(p)
+
+        beautifier.summary()
+
+        if cache and cache_stats:
+            print(f'\nResults cache: {result_cache.stats()}')
 
         # Print errored files if existing
         worker.execution_warnings()
 
+        # Output writers are only imported when needed
+        if chart or json:
+            from output.mermaid import to_chart
+            from output.json import to_json
+
         # If .html flowchart output required, create it
         if chart:
-            m = Mermaid(worker.results)
-            m.tables_chart(chart)
+            to_chart(worker.results, chart, partition, page_size)
 
-        if json:
+        if json and (procedures or tables):
             to_json(worker.results, json)
 
+        if graph:
+            if procedures or tables:
+                from output.graph import to_graph
+                to_graph(worker.results, graph)
+            else:
+                table_graph.save(graph)
+
+    def _watch(self, worker: Worker, i: str, interval: float, procedures: Optional[List[str]],
+               tables: Optional[List[str]], chart: Optional[str], json: Optional[str],
+               graph: Optional[str], partition: Optional[str], page_size: int,
+               beautifier: Beautifier) -> None:
+
+        """
+        Parses the input path, then watches it and updates results and output
+        files after each change, until interrupted. Without filters, outputs
+        are only updated from the results of changed and deleted files. With
+        filters, all results may be filtered differently after a change, so
+        outputs are built again from the filtered results.
+        """
+
+        from output.files import OutputFiles
+
+        watcher = Watcher(worker, i, interval)
+        procedures = str_to_tables(procedures) if procedures else None
+        tables = str_to_tables(tables) if tables else None
+        outputs = OutputFiles(chart, json, graph, partition, page_size)
+
+        def report(removed: List[Procedure], parsed: List[Procedure]) -> None:
+
+            nonlocal outputs
+
+            if procedures or tables:
+                worker.results = watcher.procedures()
+                if procedures:
+                    worker.procedures_filter(procedures)
+                if tables:
+                    worker.tables_filter(tables)
+                outputs = OutputFiles(chart, json, graph, partition, page_size)
+                removed, parsed = [], worker.results
+
+            # With filters, all filtered results are printed again, otherwise
+            # only results of the files parsed
+            beautifier.write(parsed)
+            beautifier.summary()
+            worker.execution_warnings()
+
+            outputs.update(removed, parsed)
+            outputs.save()
+
+        report([], watcher.load())
+
+        try:
+            for _ in watcher.watch():
+                report(watcher.removed, watcher.parsed)
+        except KeyboardInterrupt:
+            pass
+
+    def serve(self, i: Optional[str]=None, host: Optional[str]=None, port: Optional[int]=None,
+              socket: Optional[str]=None, ds: Optional[str]=None, dl: Optional[str]=None,
+              pmode: Optional[str]=None, fmode: Optional[str]=None, v: Optional[str]=None,
+              sll: Optional[bool]=None, cache: Optional[bool]=None, jobs: Optional[int]=None) -> None:
+
+        """
+        Runs a long-lived daemon keeping a warm parser and parsed results in
+        memory, and answering JSON queries over localhost HTTP or a Unix socket:
+
+        POST /parse   {"path": ...} parses a file/directory again
+        POST /filter  {"path": ..., "tables": [...], "procedures": [...], "fmode": ...}
+        POST /lineage {"path": ..., "tables": [...], "direction": "up"|"down"|"both"}
+        GET  /status
+
+        Parsing settings are the same as for the parse command, and apply to
+        all queries.
+
+        :param i: path to a .sql file or directory to parse at startup
+
+        :param host: HTTP host, defaults to config value
+
+        :param port: HTTP port, defaults to config value
+
+        :param socket: Unix socket path, replaces host and port if set.
+        Defaults to config value
+
+        :param ds: default schema, defaults to config value
+
+        :param dl: delimiter, defaults to config value
+
+        :param pmode: parsing mode, can be 'procedure' or 'ddl'
+
+        :param fmode: default filtering mode of /filter queries, can be 'simple' or 'rec'
+
+        :param v: verbosity level, must be one of ('v', 'vv', 'vvv', 'vvvv')
+
+        :param sll: two-stage SLL/LL parsing, use --nosll to parse in LL mode only
+
+        :param cache: results cache, use --nocache to disable it
+
+        :param jobs: number of parsing processes, 0 uses all available cores
+        """
+
+        cfg = self._config()
+
+        ds = cfg['parser_config']['default_schema'] if not ds else ds
+        dl = cfg['parser_config']['delimiter'] if not dl else dl
+        pmode = cfg['parser_config']['default_parsing_mode'] if not pmode else pmode
+        fmode = cfg['parser_config']['default_filter_mode'] if not fmode else fmode
+        v = cfg['parser_config']['default_verbosity'] if not v else v
+        sll = cfg['parser_config'].getboolean('sll_prediction') if sll is None else sll
+        jobs = cfg['pool_config'].getint('jobs') if jobs is None else jobs
+        cache = cfg['cache_config'].getboolean('result_cache') if cache is None else cache
+        host = cfg['server_config']['host'] if not host else host
+        port = cfg['server_config'].getint('port') if port is None else port
+        socket = cfg['server_config'].get('socket') or None if not socket else socket
+
+        if i:
+            validate_input_path(i)
+        validate_parsing_mode(pmode)
+        validate_filter_mode(fmode)
+        validate_verbosity(v)
+        validate_jobs(jobs)
+
+        set_verbosity(v)
+
+        # The daemon warms the parser up at start-up, it is imported with it
+        from server.daemon import LineageDaemon, serve
+
+        worker, result_cache = self._worker(cfg, ds, dl, pmode, fmode, sll, cache, jobs)
+
+        with worker:
+            daemon = LineageDaemon(worker)
+            if i:
+                daemon.load(i)
+            serve(daemon, host, port, socket)
+
 
 if __name__ == '__main__':
 
@@ -1,39 +1,124 @@
 from colorama import Fore, Style
-from typing import List, Dict
+from typing import List, Optional, TextIO, Tuple
+from parse.models import Procedure
 import sys
 
+# Colour codes used in reports (green, blue, cyan, reset), blank when colours are disabled
+COLORS = (Fore.GREEN, Fore.BLUE, Fore.CYAN, Style.RESET_ALL)
+NO_COLORS = ('', '', '', '')
 
-def beautify(results: List[Dict]) -> None:
+
+def render(p: Procedure, colors: Tuple[str, str, str, str] = COLORS) -> str:
 
     """
-    Convenience function displaying the parsing results in a colored and human-readable format using
-    colorama (as it works on all platforms)
-    :param results: results list containing all procedures
-    :return: None, only displays the results
+    Builds the human-readable report of a parsed procedure/file.
+
+    :param p: Procedure object
+    :param colors: colour codes (green, blue, cyan, reset), COLORS or NO_COLORS
+    :return: report text
     """
 
-    msg = f''
+    green, blue, cyan, reset = colors
+
+    title = f"| {p.schema}.{p.name} ({p.path}) |"
+    line = '-' * len(title)
+    parts = [f'\n{green}{line}\n{green}{title}\n{green}{line}\n{reset}']
+
+    for q in p.statements:
+        parts.append(f"|\n|--- {blue}{q.operation}{reset} "
+                     f"----> {cyan}{q.target_table.schema}.{q.target_table.name}\n{reset}")
+
+        if q.from_table:
+            for f in q.from_table:
+                parts.append(f'{cyan}                  '
+                             f". {blue}FROM{cyan} {f.schema}.{f.name}{reset}\n")
+        if q.join_table:
+            for j in q.join_table:
+                parts.append(f'{cyan}                  '
+                             f". {blue}JOIN{cyan} {j.schema}.{j.name}{reset}\n")
+
+        if q.target_columns:
+            parts.append(f". {blue}Columns --> {cyan} {list(q.target_columns)}{reset}\n\n")
+
+    return ''.join(parts)
+
+
+class Beautifier:
+
+    """Displays parsing results in the terminal as they are produced, one
+    procedure/file at a time, rather than building the whole report first.
+    Colour codes are left out when the output is not a terminal. In quiet
+    mode, only a summary is displayed, and with a limit, procedures/files
+    beyond the limit are only counted in the summary"""
+
+    def __init__(self, file: Optional[TextIO] = None, quiet: bool = False, limit: int = 0,
+                 color: Optional[bool] = None) -> None:
+
+        self.file = file or sys.stdout
+        self.quiet = quiet
+        self.limit = limit
+        color = self.file.isatty() if color is None else color
+        self.colors = COLORS if color else NO_COLORS
+        self.procedures = 0
+        self.statements = 0
+        self.displayed = 0
+
+    def write(self, results: List[Procedure]) -> None:
 
-    for p in results:
+        """
+        Displays results after the ones already displayed. Output is only
+        flushed by summary().
 
-        title_len = len(f"| {p['schema']}.{p['name']} ({p['path']} |") + 1
-        msg += f'\n{Fore.GREEN}{"".join(["-" for x in range(title_len)])}\n'
-        msg += f"{Fore.GREEN}| {p['schema']}.{p['name']} ({p['path']}) |\n"
-        msg += f'{Fore.GREEN}{"".join(["-" for x in range(title_len)])}\n{Style.RESET_ALL}'
-        for q in p['statements']:
-            msg += f"|\n|--- {Fore.BLUE}{q['operation']}{Style.RESET_ALL} " \
-                   f"----> {Fore.CYAN}{q['target_table']['schema']}.{q['target_table']['name']}\n{Style.RESET_ALL}"
+        :param results: results list containing procedures
+        """
 
-            if q.get('from_table'):
-                for f in q['from_table']:
-                    msg += f'{Fore.CYAN}                  ' \
-                           f". {Fore.BLUE}FROM{Fore.CYAN} {f['schema']}.{f['name']}{Style.RESET_ALL}\n"
-            if q.get('join_table'):
-                for j in q['join_table']:
-                    msg += f'{Fore.CYAN}                  ' \
-                           f". {Fore.BLUE}JOIN{Fore.CYAN} {j['schema']}.{j['name']}{Style.RESET_ALL}\n"
+        write = self.file.write
 
-            if q.get('target_columns'):
-                msg += f". {Fore.BLUE}Columns --> {Fore.CYAN} {q['target_columns']}{Style.RESET_ALL}\n\n"
+        for p in results:
+            if not self.quiet and not (self.limit and self.displayed >= self.limit):
+                write(render(p, self.colors))
+                self.displayed += 1
+            self.procedures += 1
+            self.statements += len(p.statements)
+
+    def summary(self) -> None:
+
+        """
+        Ends the results displayed so far with a blank line, then displays
+        the number of procedures/files and statements in these results, and
+        how many were left out, in quiet mode or when the limit is exceeded.
+        Counting then starts again.
+        """
+
+        hidden = self.procedures - self.displayed
+
+        if self.displayed:
+            self.file.write('\n')
+
+        if self.quiet or hidden:
+            green, _, _, reset = self.colors
+            msg = f'{green}{self.procedures} procedures/files, {self.statements} statements'
+            if hidden and not self.quiet:
+                msg += f' ({hidden} procedures/files not displayed, beyond the limit of {self.limit})'
+            self.file.write(f'{msg}{reset}\n')
+
+        self.file.flush()
+
+        self.procedures = 0
+        self.statements = 0
+        self.displayed = 0
+
+
+def beautify(results: List[Procedure], file: Optional[TextIO] = None) -> None:
+
+    """
+    Convenience function displaying the parsing results in a colored and human-readable format using
+    colorama (as it works on all platforms)
+    :param results: results list containing all procedures
+    :param file: text output, defaults to sys.stdout
+    :return: None, only displays the results
+    """
 
-    print(msg)
+    b = Beautifier(file)
+    b.write(results)
+    b.summary()
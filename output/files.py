@@ -0,0 +1,70 @@
+from typing import Iterable, Optional
+from parse.models import Procedure
+from output.mermaid import Mermaid
+from output.graph import TableGraph
+from output.json import JsonWriter, procedure_json
+
+
+class OutputFiles:
+
+    """Flowchart, JSON and graph output files of results kept in memory, as
+    in watch mode. Outputs are updated from the procedures/files of changed
+    and deleted files only: flowchart arrows and graph edges are added and
+    removed, and only new procedures/files are serialized to JSON. Each
+    output file is then written again from the updated outputs"""
+
+    def __init__(self, chart: Optional[str], json: Optional[str], graph: Optional[str],
+                 partition: Optional[str] = None, page_size: int = 0) -> None:
+
+        self.chart = chart
+        self.json = json
+        self.lines = bool(json) and json.endswith('.jsonl')
+        self.graph = graph
+        self.partition = partition
+        self.page_size = page_size
+
+        self.mermaid = Mermaid()
+        self.table_graph = TableGraph()
+        # {file path: list of tuples (procedure/file, JSON text)}
+        self.texts = {}
+
+    def update(self, removed: Iterable[Procedure], added: Iterable[Procedure]) -> None:
+
+        """
+        Updates outputs with the results of changed and deleted files.
+
+        :param removed: procedures/files previously added, of the changed and deleted files
+        :param added: procedures/files of the changed files
+        """
+
+        for p in removed:
+            if self.chart:
+                self.mermaid.remove(p)
+            if self.graph:
+                self.table_graph.remove(p)
+            if self.json:
+                self.texts.pop(p.path, None)
+
+        for p in added:
+            if self.chart:
+                self.mermaid.add(p)
+            if self.graph:
+                self.table_graph.add(p)
+            if self.json:
+                self.texts.setdefault(p.path, []).append((p, procedure_json(p, self.lines)))
+
+    def save(self) -> None:
+
+        """Writes the output files, JSON results being written in file path order"""
+
+        if self.chart:
+            self.mermaid.save(self.chart, self.partition, self.page_size)
+
+        if self.json:
+            with JsonWriter(self.json) as writer:
+                for path in sorted(self.texts):
+                    for p, text in self.texts[path]:
+                        writer.write(p, text)
+
+        if self.graph:
+            self.table_graph.save(self.graph)
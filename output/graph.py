@@ -0,0 +1,217 @@
+import os
+import ujson
+from collections import Counter
+from html import escape
+from typing import Iterable, List, Optional, TextIO, Tuple
+from colorama import Fore, Style
+from utils.logging import logger
+from parse.models import Table, Procedure
+from output.mermaid import data_flow_ops
+
+# Output file extensions of graph exporters
+supported_graph_formats = ('dot', 'gv', 'graphml', 'cyjs')
+
+
+class TableGraph:
+
+    """Tables data flows graph, built from the same statements as Mermaid
+    flowcharts. Nodes are tables, identified by their case-insensitive key,
+    and edges go from source to target tables, weighted by the number of
+    distinct procedures, compared on their schema and name, writing the data
+    flow. Results can be added and removed one by one as they are parsed,
+    only the graph is kept in memory. Nodes keep their index once removed
+    results no longer reference them, but are not written"""
+
+    def __init__(self, results: Iterable[Procedure] = ()) -> None:
+
+        # {table key: node index}, nodes are numbered in order of first appearance
+        self.nodes = {}
+        self.tables = []
+        # Number of data flow statements referencing each node
+        self.refs = []
+        # {(source node index, target node index): Counter {procedure key: number of statements}}
+        self.edges = {}
+
+        for p in results:
+            self.add(p)
+
+    def node(self, table: Table) -> int:
+
+        """
+        Returns the node index of a table, adding it to the graph if needed.
+
+        :param table: Table object
+        :return: node index
+        """
+
+        key = table.key()
+        index = self.nodes.get(key)
+        if index is None:
+            index = self.nodes[key] = len(self.tables)
+            self.tables.append(table)
+            self.refs.append(0)
+
+        return index
+
+    def add(self, p: Procedure) -> None:
+
+        """
+        Adds the data flows of a procedure/file to the graph.
+
+        :param p: Procedure object
+        """
+
+        for s in p.statements:
+            if s.operation in data_flow_ops:
+                target = self.node(s.target_table)
+                self.refs[target] += 1
+                for table in s.tables():
+                    source = self.node(table)
+                    self.refs[source] += 1
+                    self.edges.setdefault((source, target), Counter())[p.key()] += 1
+
+    def remove(self, p: Procedure) -> None:
+
+        """
+        Removes the data flows of a procedure/file previously added to the graph.
+
+        :param p: Procedure object
+        """
+
+        for s in p.statements:
+            if s.operation in data_flow_ops:
+                target = self.nodes[s.target_table.key()]
+                self.refs[target] -= 1
+                for table in s.tables():
+                    source = self.nodes[table.key()]
+                    self.refs[source] -= 1
+                    procedures = self.edges[(source, target)]
+                    procedures[p.key()] -= 1
+                    if not procedures[p.key()]:
+                        del procedures[p.key()]
+                        if not procedures:
+                            del self.edges[(source, target)]
+
+    def table_nodes(self) -> Iterable[Tuple[int, Table]]:
+
+        """
+        :return: iterator of tuples (node index, table) of the nodes referenced by results
+        """
+
+        return ((i, t) for i, t in enumerate(self.tables) if self.refs[i])
+
+    def weighted_edges(self) -> Iterable[Tuple[int, int, int]]:
+
+        """
+        :return: iterator of tuples (source node index, target node index, weight)
+        """
+
+        return ((source, target, len(procedures)) for (source, target), procedures in self.edges.items())
+
+    def write_dot(self, file: TextIO) -> None:
+
+        """
+        Writes the graph in Graphviz DOT format.
+
+        :param file: text file object
+        """
+
+        file.write('digraph lineage {\n    rankdir=LR;\n')
+        for i, t in self.table_nodes():
+            label = f'{t.schema}.{t.name}'.replace('\\', '\\\\').replace('"', '\\"')
+            file.write(f'    n{i} [label="{label}"];\n')
+        for source, target, weight in self.weighted_edges():
+            file.write(f'    n{source} -> n{target} [weight={weight}];\n')
+        file.write('}\n')
+
+    def write_graphml(self, file: TextIO) -> None:
+
+        """
+        Writes the graph in GraphML format.
+
+        :param file: text file object
+        """
+
+        file.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                   '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+                   '  <key id="label" for="node" attr.name="label" attr.type="string"/>\n'
+                   '  <key id="schema" for="node" attr.name="schema" attr.type="string"/>\n'
+                   '  <key id="weight" for="edge" attr.name="weight" attr.type="int"/>\n'
+                   '  <graph id="lineage" edgedefault="directed">\n')
+        for i, t in self.table_nodes():
+            file.write(f'    <node id="n{i}"><data key="label">{escape(f"{t.schema}.{t.name}")}</data>'
+                       f'<data key="schema">{escape(t.schema)}</data></node>\n')
+        for i, (source, target, weight) in enumerate(self.weighted_edges()):
+            file.write(f'    <edge id="e{i}" source="n{source}" target="n{target}">'
+                       f'<data key="weight">{weight}</data></edge>\n')
+        file.write('  </graph>\n</graphml>\n')
+
+    def write_cytoscape(self, file: TextIO) -> None:
+
+        """
+        Writes the graph in Cytoscape.js JSON format: {"elements": {"nodes":
+        [...], "edges": [...]}}, each element holding its attributes in a
+        "data" object.
+
+        :param file: text file object
+        """
+
+        file.write('{"elements": {"nodes": [')
+        for n, (i, t) in enumerate(self.table_nodes()):
+            node = {'id': f'n{i}', 'label': f'{t.schema}.{t.name}', 'schema': t.schema}
+            file.write(f'{"," if n else ""}\n{ujson.dumps({"data": node})}')
+        file.write('\n], "edges": [')
+        for i, (source, target, weight) in enumerate(self.weighted_edges()):
+            edge = {'id': f'e{i}', 'source': f'n{source}', 'target': f'n{target}', 'weight': weight}
+            file.write(f'{"," if i else ""}\n{ujson.dumps({"data": edge})}')
+        file.write('\n]}}\n')
+
+    def save(self, path: str) -> None:
+
+        """
+        Saves the graph in the format given by the file extension, one of
+        supported_graph_formats.
+
+        :param path: output file path
+        """
+
+        writers = {'dot': self.write_dot, 'gv': self.write_dot,
+                   'graphml': self.write_graphml, 'cyjs': self.write_cytoscape}
+
+        try:
+            with open(path, 'w') as file:
+                writers[graph_format(path)](file)
+
+            print(f'{Fore.GREEN}{path} successfully saved{Style.RESET_ALL}')
+
+        except Exception as e:
+            logger.error(f'{Fore.RED}Could not save graph at {path}: {e}{Style.RESET_ALL}')
+
+
+def graph_format(path: str) -> str:
+
+    """
+    :param path: output graph file path
+    :return: file extension, without leading dot
+    """
+
+    return os.path.splitext(path)[1][1:]
+
+
+def to_graph(results: List[Procedure], path: Optional[str]) -> TableGraph:
+
+    """
+    Builds the tables data flows graph of results, and saves it as .dot, .gv,
+    .graphml or .cyjs file.
+
+    :param results: results from Worker object
+    :param path: path to save the graph file at, the graph is only returned if not set
+
+    :return: TableGraph object
+    """
+
+    graph = TableGraph(results)
+    if path:
+        graph.save(path)
+
+    return graph
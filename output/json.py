@@ -1,32 +1,186 @@
+import os
 import ujson
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterable
 from colorama import Fore, Style
 from utils.logging import logger
+from parse.models import Procedure
 
-def to_json(results: List[Dict], path: Optional[str]) -> Optional[Dict]:
+
+class JsonWriter:
+
+    """Writes results to a file as they are produced, without holding them in
+    memory. In .json files, procedures/files are grouped by file path in a
+    single object {file path: [procedures/files]}, and must be written in
+    file path groups, as Worker.iter_parse yields them. In .jsonl files
+    (JSON Lines), each procedure/file is written on its own line. If the file
+    cannot be written, the error is logged, the incomplete file removed and
+    later results ignored, so that parsing goes on"""
+
+    def __init__(self, path: str) -> None:
+
+        self.path = path
+        self.lines = path.endswith('.jsonl')
+        self.file = None
+        self.failed = False
+        self.current = None
+        self.paths = set()
+        self.count = 0
+
+    def __enter__(self) -> 'JsonWriter':
+
+        try:
+            self.file = open(self.path, 'w')
+            if not self.lines:
+                self.file.write('{')
+        except Exception as e:
+            self.fail(e)
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+
+        # Results are incomplete if parsing stopped, hence not saved
+        if exc_type is not None:
+            self.discard()
+            return
+
+        try:
+            self.close()
+        except Exception as e:
+            self.fail(e)
+
+        if not self.failed:
+            print(f'{Fore.GREEN}{self.path} successfully saved{Style.RESET_ALL}')
+
+    def write(self, p: Procedure, text: Optional[str] = None) -> None:
+
+        """
+        Writes a procedure/file at the end of the output file.
+
+        :param p: Procedure object
+        :param text: procedure/file serialized by procedure_json for the
+        output format, serialized here if not set
+        """
+
+        if self.failed:
+            return
+
+        if not self.lines and p.path != self.current and p.path in self.paths:
+            raise ValueError(f'Results of {p.path} must be written consecutively')
+
+        try:
+            self.write_procedure(p, text if text is not None else procedure_json(p, self.lines))
+        except Exception as e:
+            self.fail(e)
+
+    def write_procedure(self, p: Procedure, text: str) -> None:
+
+        if not self.lines:
+            if p.path != self.current:
+                # Close the previous file path group and open a new one
+                self.file.write('\n    ],\n' if self.current is not None else '\n')
+                self.file.write(f'    {ujson.dumps(p.path)}: [\n')
+                self.current = p.path
+                self.paths.add(p.path)
+            else:
+                self.file.write(',\n')
+
+        self.file.write(text)
+        self.count += 1
+
+    def close(self) -> None:
+
+        if self.file is None:
+            return
+
+        if not self.lines:
+            self.file.write('\n    ]\n}\n' if self.current is not None else '}\n')
+
+        self.file.close()
+        self.file = None
+
+    def fail(self, e: Exception) -> None:
+
+        """
+        Logs a write error, and removes the incomplete file.
+
+        :param e: write error
+        """
+
+        logger.error(f'{Fore.RED}Could not save JSON file at {self.path}: {e}{Style.RESET_ALL}')
+        self.failed = True
+        self.discard()
+
+    def discard(self) -> None:
+
+        """Closes and removes the output file, if opened"""
+
+        if self.file is None:
+            return
+
+        try:
+            self.file.close()
+        except OSError:
+            pass
+        self.file = None
+
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def procedure_json(p: Procedure, lines: bool = False) -> str:
 
     """
-    Transform and save results as .json file.
+    Serializes a procedure/file as written in output files.
 
-    :param results: results from Worker object
-    :param path: path to save JSON file at
+    :param p: Procedure object
+    :param lines: True for .jsonl files, False for .json files
+    :return: JSON text
+    """
+
+    if lines:
+        return ujson.dumps(p.to_dict()) + '\n'
+
+    # Procedures are indented as if dumped with the whole output, indent=4
+    return '        ' + ujson.dumps(p.to_dict(), indent=4).replace('\n', '\n        ')
+
+
+def group_by_path(results: Iterable[Procedure]) -> Dict[str, List[Procedure]]:
 
-    :return: dictionary output for easier testing
     """
+    Groups results by file path, in order of first appearance.
+
+    :param results: list of Procedure objects
+    :return: dictionary {file path: list of Procedure objects}
+    """
+
+    grouped = {}
+    for p in results:
+        grouped.setdefault(p.path, []).append(p)
 
-    try:
+    return grouped
 
-        output = {x['path']: [] for x in results}
-        for x in results:
-            output[x['path']].append(x)
 
-        if path:
-            with open(path, 'w') as file:
-                ujson.dump(output, file, indent=4)
+def to_json(results: List[Procedure], path: Optional[str]) -> Optional[Dict]:
+
+    """
+    Save results as .json or .jsonl file, streaming them to the file.
+
+    :param results: results from Worker object
+    :param path: path to save the JSON file at
+
+    :return: dictionary output if path is not set, for easier testing
+    """
 
-        print(f'{Fore.GREEN}{path} successfully saved{Style.RESET_ALL}')
-        return output
+    grouped = group_by_path(results)
 
-    except Exception as e:
-        logger.error(f'{Fore.RED}Could not save JSON file at {path}{Style.RESET_ALL}')
+    if not path:
+        return {k: [p.to_dict() for p in v] for k, v in grouped.items()}
 
+    # Write errors are logged by the writer
+    with JsonWriter(path) as writer:
+        for procedures in grouped.values():
+            for p in procedures:
+                writer.write(p)
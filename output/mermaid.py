@@ -1,84 +1,321 @@
-from typing import List, Dict, Optional
-from bs4 import BeautifulSoup
+import io
+import os
+from html import escape
+from typing import List, Optional, Iterator, Iterable, TextIO, Tuple
 from pathlib import Path
+from functools import lru_cache
 from utils.logging import logger
 from colorama import Fore, Style
+from parse.models import Table, Procedure
 
 data_flow_ops = ['INSERT', 'REPLACE', 'UPDATE', 'CREATE TABLE QUERY']
 
+# Partitioning modes of flowcharts split across several pages
+supported_partitions = ('components', 'schema')
+
+
+@lru_cache(maxsize=None)
+def template(name: str = 'template.html', placeholder: str = '{chart}') -> Tuple[str, str]:
+
+    """
+    Reads an HTML template, split around its placeholder.
+
+    :param name: template file name, in the resources directory
+    :param placeholder: placeholder of the generated HTML code
+    :return: tuple (HTML code before the placeholder, HTML code after the placeholder)
+    """
+
+    with open(f'{Path(__file__).parent}/resources/{name}', 'r') as file:
+        head, _, tail = file.read().partition(placeholder)
+
+    return head, tail
+
+
+def components(flows: List[Tuple[Table, Table, str]]) -> List[Tuple[str, str]]:
+
+    """
+    Finds the connected components of the tables graph with a union-find
+    over the data flows, with path halving and union by size, which runs in
+    near-linear time in the number of data flows. Tables are compared on
+    their case-insensitive key.
+
+    :param flows: list of tuples (source table, target table, arrow)
+    :return: list of the component representative table key of each data flow
+    """
+
+    parent = {}
+    size = {}
+
+    def find(k: Tuple[str, str]) -> Tuple[str, str]:
+        while parent[k] != k:
+            parent[k] = parent[parent[k]]
+            k = parent[k]
+        return k
+
+    for source, target, _ in flows:
+        for k in (source.key(), target.key()):
+            if k not in parent:
+                parent[k] = k
+                size[k] = 1
+
+        a, b = find(source.key()), find(target.key())
+        if a != b:
+            if size[a] < size[b]:
+                a, b = b, a
+            parent[b] = a
+            size[a] += size[b]
+
+    return [find(source.key()) for source, _, _ in flows]
+
 
 class Mermaid:
 
-    def __init__(self, results: List[Dict]):
+    """Flowchart of tables data flows, drawn with mermaid.js. Arrows go from
+    source to target tables, labelled with the procedure writing the data
+    flow. Tables are compared on their case-insensitive key and spelled as
+    first met. Results can be added and removed one by one: arrows are
+    counted, and only dropped with the last statement drawing them"""
+
+    def __init__(self, results: Iterable[Procedure] = ()):
 
         self.graph_type = "graph LR; \nlinkStyle default interpolate basis\n"
-        self.tables_flow = []
         self.functions_flow = []
-        self.input = results
-        self.output = ''
-        with open(f'{Path(__file__).parent}/resources/template.html', 'r') as template:
-            self.soup = BeautifulSoup(template.read(), features="html.parser")
+        # {table key: first spelling met}, so that a table spelled with different
+        # casings is drawn as a single node
+        self.names = {}
+        # {arrow key: [source table, target table, arrow, number of statements drawing it]},
+        # in order of first appearance
+        self.flows = {}
 
-    def arrow(self, statement: Dict, statement_part: str) -> None:
+        for p in results:
+            self.add(p)
 
+    def canonical(self, table: Table) -> Table:
+
+        """
+        :param table: Table object
+        :return: first spelling met of the table, tables being compared on
+        their case-insensitive key
         """
-        Generate Markdown code representing mermaid.js arrows and adds them to results
 
-        :param statement: statement dictionary
-        :param statement_part: statement key to get tables from, should be
-        from_table or join_table.
+        return self.names.setdefault(table.key(), table)
+
+    def arrows(self, p: Procedure) -> Iterator[Tuple[Tuple, Table, Table, str]]:
+
         """
+        Generate Markdown code representing mermaid.js arrows of the data flow
+        statements of a procedure/file.
 
-        if statement.get(statement_part):
-            for table in statement.get(statement_part):
+        :param p: Procedure object
+        :return: iterator of tuples (arrow key, source table, target table,
+        arrow), tables being spelled as first met
+        """
 
-                arrow = f"{table['schema']}.{table['name']}" \
-                        f"-->|{statement['procedure']}|" \
-                        f"{statement['target_table']['schema']}" \
-                        f".{statement['target_table']['name']};"
+        for s in p.statements:
+            if s.operation in data_flow_ops:
+                target = self.canonical(s.target_table)
+                for table in s.tables():
+                    source = self.canonical(table)
+                    yield (source.key(), s.procedure, target.key()), source, target, \
+                        f"{source.schema}.{source.name}-->|{s.procedure}|{target.schema}.{target.name};"
 
-                # If arrow not already existing, add it to the chart
-                if arrow not in self.tables_flow:
-                    self.tables_flow.append(arrow)
+    def add(self, p: Procedure) -> None:
 
-    def tables_chart(self, path: Optional[str]) -> BeautifulSoup:
+        """
+        Adds the data flows of a procedure/file to the chart.
+
+        :param p: Procedure object
+        """
+
+        for key, source, target, arrow in self.arrows(p):
+            flow = self.flows.get(key)
+            if flow is None:
+                self.flows[key] = [source, target, arrow, 1]
+            else:
+                flow[3] += 1
+
+    def remove(self, p: Procedure) -> None:
+
+        """
+        Removes the data flows of a procedure/file previously added to the chart.
+
+        :param p: Procedure object
+        """
+
+        for key, _, _, _ in self.arrows(p):
+            flow = self.flows[key]
+            flow[3] -= 1
+            if not flow[3]:
+                del self.flows[key]
+
+    def tables_flows(self) -> Iterator[Tuple[Table, Table, str]]:
+
+        """
+        :return: iterator of tuples (source table, target table, arrow) of
+        the distinct arrows of results, in order of first appearance
+        """
+
+        return ((source, target, arrow) for source, target, arrow, _ in self.flows.values())
+
+    def write_tables_chart(self, file: TextIO, arrows: Optional[Iterable[str]] = None) -> None:
+
+        """
+        Writes the HTML flowchart of tables data flows to a file object.
+
+        :param file: text file object
+        :param arrows: arrows to chart, defaults to all arrows of results
+        """
+
+        if arrows is None:
+            arrows = (arrow for _, _, arrow in self.tables_flows())
+
+        head, tail = template()
+        file.write(head)
+        file.write(escape(self.graph_type, quote=False))
+
+        for arrow in arrows:
+            file.write('\n')
+            file.write(escape(arrow, quote=False))
+
+        file.write(tail)
+
+    def tables_chart(self, path: Optional[str]) -> Optional[str]:
 
         """
         Creates HTML flowchart file (using mermaid.js) representing tables data flows
         and saves it at specified path.
 
         :param path: output HTML file destination
+
+        :return: HTML code if path is not set, for easier testing
         """
 
+        if not path:
+            output = io.StringIO()
+            self.write_tables_chart(output)
+            return output.getvalue()
+
         try:
 
-            # Creating mermaid markdown arrows' list
-            for p in self.input:
-                # For all statements in parsed procedure/file
-                for s in p['statements']:
-                    if s['operation'] in data_flow_ops:
-                        self.arrow(s, 'from_table')
-                        self.arrow(s, 'join_table')
-
-            # Generate markdown string from the list of arrows
-            self.tables_flow.insert(0, self.graph_type)
-            self.output = '\n'.join(self.tables_flow)
-
-            # Update <div class="mermaid"> in HTML template code with our Mermaid markdown
-            mermaid = self.soup.find("div", {"class": "mermaid"})
-            chart = self.soup.new_tag("div")
-            chart.attrs["class"] = "mermaid"
-            chart.string = self.output
-            mermaid.replace_with(chart)
-
-            if path:
-                # Save HTML file at specified path
-                with open(path, 'w') as outfile:
-                    outfile.write(str(self.soup))
+            with open(path, 'w') as outfile:
+                self.write_tables_chart(outfile)
 
             print(f'{Fore.GREEN}{path} successfully saved{Style.RESET_ALL}')
 
         except Exception as e:
-            logger.error(f'{Fore.RED}Could not save HTML chart at {path}{Style.RESET_ALL}')
+            logger.error(f'{Fore.RED}Could not save HTML chart at {path}: {e}{Style.RESET_ALL}')
+
+    def save(self, path: str, partition: Optional[str] = None, page_size: int = 0) -> None:
+
+        """
+        Saves the HTML flowchart, or the partitioned flowcharts with their
+        index page if a partitioning mode is set.
+
+        :param path: path to save the HTML file at
+        :param partition: partitioning mode, one of supported_partitions, or
+        None for a single flowchart
+        :param page_size: maximum number of arrows per partitioned flowchart page, 0 for no limit
+        """
+
+        if partition:
+            self.partitioned_chart(path, partition, page_size)
+        else:
+            self.tables_chart(path)
+
+    def partitions(self, partition: str) -> List[Tuple[str, int, List[str]]]:
+
+        """
+        Splits the tables data flows graph into connected components, largest
+        first, or into schemas, each data flow belonging to the schema of its
+        target table.
+
+        :param partition: partitioning mode, one of supported_partitions
+        :return: list of tuples (partition title, number of tables, list of arrows)
+        """
+
+        flows = list(self.tables_flows())
+        if partition == 'components':
+            keys = components(flows)
+        else:
+            keys = [target.key()[0] for _, target, _ in flows]
+            # Schemas are titled as first spelled
+            schemas = {}
+            for key, (_, target, _) in zip(keys, flows):
+                schemas.setdefault(key, target.schema)
+
+        # {partition key: (set of table keys, list of arrows)}
+        groups = {}
+        for key, (source, target, arrow) in zip(keys, flows):
+            tables, arrows = groups.setdefault(key, (set(), []))
+            tables.update((source.key(), target.key()))
+            arrows.append(arrow)
+
+        if partition == 'components':
+            ordered = sorted(groups.values(), key=lambda g: len(g[1]), reverse=True)
+            return [(f'Component {i}', len(tables), arrows) for i, (tables, arrows) in enumerate(ordered, 1)]
+
+        return [(f'Schema {schemas[key]}', len(groups[key][0]), groups[key][1]) for key in sorted(groups)]
+
+    def partitioned_chart(self, path: str, partition: str, page_size: int = 0) -> List[str]:
+
+        """
+        Creates one HTML flowchart file per partition of the tables data flows
+        graph, and an index page linking them at specified path. Partitions
+        holding more than page_size arrows are split across several pages.
+        Flowchart pages are saved next to the index page, as
+        {index name}_{page number}.html
+
+        :param path: output HTML index file destination
+        :param partition: partitioning mode, one of supported_partitions
+        :param page_size: maximum number of arrows per page, 0 for no limit
+
+        :return: list of the flowchart pages paths
+        """
+
+        stem, _ = os.path.splitext(path)
+        pages = []
+        links = []
+
+        try:
+
+            for title, tables, arrows in self.partitions(partition):
+                size = page_size or len(arrows)
+                count = -(-len(arrows) // size)
+
+                for n in range(count):
+                    pages.append(f'{stem}_{len(pages) + 1}.html')
+                    with open(pages[-1], 'w') as outfile:
+                        self.write_tables_chart(outfile, arrows[n * size:(n + 1) * size])
+
+                    part = f' (page {n + 1} of {count})' if count > 1 else ''
+                    links.append(f'<li><a href="{escape(os.path.basename(pages[-1]))}">{escape(title)}{part}</a>'
+                                 f' - {tables} tables, {len(arrows)} arrows</li>')
+
+            head, tail = template('index.html', '{links}')
+            with open(path, 'w') as outfile:
+                outfile.write(head)
+                outfile.write('\n'.join(links))
+                outfile.write(tail)
+
+            print(f'{Fore.GREEN}{path} successfully saved, with {len(pages)} chart pages{Style.RESET_ALL}')
+
+        except Exception as e:
+            logger.error(f'{Fore.RED}Could not save HTML charts at {path}: {e}{Style.RESET_ALL}')
+
+        return pages
+
+
+def to_chart(results: List[Procedure], path: str, partition: Optional[str] = None, page_size: int = 0) -> None:
+
+    """
+    Saves results as HTML flowchart, or as partitioned flowcharts with their
+    index page if a partitioning mode is set.
+
+    :param results: results from Worker object
+    :param path: path to save the HTML file at
+    :param partition: partitioning mode, one of supported_partitions, or None
+    for a single flowchart
+    :param page_size: maximum number of arrows per partitioned flowchart page, 0 for no limit
+    """
 
-        return self.soup
+    Mermaid(results).save(path, partition, page_size)
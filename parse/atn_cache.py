@@ -0,0 +1,152 @@
+import os
+import re
+import sys
+import marshal
+import hashlib
+import tempfile
+from antlr4.atn.ATN import ATN
+from antlr4.atn.ATNDeserializer import ATNDeserializer
+from typing import Callable, List
+
+# Derived files, kept next to the bytecode of the generated modules
+ATN_CACHE_DIR = os.path.join(os.path.dirname(__file__), '__pycache__')
+
+
+class CachedATNDeserializer(ATNDeserializer):
+
+    """Deserializes an ATN from its decoded form, as stored in the ATN cache:
+    serializedATN() strings are decoded to integers character by character,
+    and the ATN was already verified when the cache was written"""
+
+    def reset(self, data: List[int]) -> None:
+
+        self.data = data
+        self.pos = 0
+
+    def verifyATN(self, atn: ATN) -> None:
+
+        pass
+
+
+def atn_key(serialized: str) -> str:
+
+    """
+    Computes the ATN cache key of a serialized ATN, written as the ATN_KEY
+    constant of the generated module by the build step, so that imports
+    neither build nor hash the serialized ATN string.
+
+    :param serialized: serialized ATN string
+    :return: hexadecimal digest of the serialized ATN
+    """
+
+    return hashlib.sha1(serialized.encode()).hexdigest()[:16]
+
+
+def atn_cache_path(name: str, key: str) -> str:
+
+    """
+    Returns the ATN cache file path of a generated recognizer. The marshal
+    format depends on the Python version, hence its cache tag in the name.
+
+    :param name: 'lexer' or 'parser'
+    :param key: ATN cache key of the generated module
+    :return: ATN cache file path
+    """
+
+    return os.path.join(ATN_CACHE_DIR, f'atn-{name}-{key}.{sys.implementation.cache_tag}.marshal')
+
+
+def save_atn_cache(name: str, key: str, data: List[int]) -> bool:
+
+    """
+    Saves the decoded ATN of a generated recognizer, atomically.
+
+    :param name: 'lexer' or 'parser'
+    :param key: ATN cache key of the generated module
+    :param data: decoded ATN integers
+    :return: True if the cache file was written
+    """
+
+    try:
+        os.makedirs(ATN_CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=ATN_CACHE_DIR, suffix='.tmp')
+    except OSError:
+        return False
+
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            marshal.dump(data, file)
+        os.replace(tmp_path, atn_cache_path(name, key))
+    except OSError:
+        os.remove(tmp_path)
+        return False
+
+    return True
+
+
+def load_atn(name: str, key: str, serialized_atn: Callable[[], str]) -> ATN:
+
+    """
+    Builds the ATN of a generated recognizer, from the ATN cache if found.
+    Otherwise, the ATN is deserialized from serializedATN() and verified, and
+    its decoded form saved for the next imports, on a best effort basis as the
+    package directory may be read-only.
+
+    :param name: 'lexer' or 'parser'
+    :param key: ATN cache key of the generated module, its ATN_KEY constant
+    :param serialized_atn: serializedATN function of the generated module
+    :return: ATN object
+    """
+
+    try:
+        # Reading the whole file first is much faster than unmarshalling from a buffered file
+        with open(atn_cache_path(name, key), 'rb') as file:
+            return CachedATNDeserializer().deserialize(marshal.loads(file.read()))
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    deserializer = ATNDeserializer()
+    atn = deserializer.deserialize(serialized_atn())
+    save_atn_cache(name, key, deserializer.data)
+
+    return atn
+
+
+def write_atn_key(path: str, key: str) -> bool:
+
+    """
+    Writes the ATN cache key of a generated module as its ATN_KEY constant.
+
+    :param path: generated module path
+    :param key: ATN cache key of the module serialized ATN
+    :return: True if the constant was changed
+    """
+
+    with open(path, 'r') as file:
+        source = file.read()
+
+    updated, count = re.subn(r"^ATN_KEY = '\w*'$", f"ATN_KEY = '{key}'", source, count=1, flags=re.M)
+    if not count:
+        raise ValueError(f'No ATN_KEY constant in {path}')
+    if updated == source:
+        return False
+
+    with open(path, 'w') as file:
+        file.write(updated)
+
+    return True
+
+
+if __name__ == '__main__':
+
+    # Build step, writes the ATN cache key and the ATN cache of both recognizers
+    from parse import lexer, parser
+    for n, m in (('lexer', lexer), ('parser', parser)):
+        serialized = m.serializedATN()
+        key = atn_key(serialized)
+        if write_atn_key(m.__file__, key):
+            print(f'Updated ATN_KEY of {m.__file__}')
+        deserializer = ATNDeserializer()
+        deserializer.deserialize(serialized)
+        if save_atn_cache(n, key, deserializer.data):
+            print(f'Saved {atn_cache_path(n, key)}')
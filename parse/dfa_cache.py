@@ -0,0 +1,285 @@
+import os
+import sys
+import pickle
+import tempfile
+from antlr4.PredictionContext import PredictionContext
+from antlr4.atn.ATNState import ATNState
+from antlr4.atn.ATNSimulator import ATNSimulator
+from antlr4.atn.LexerATNSimulator import LexerATNSimulator
+from antlr4.atn.SemanticContext import SemanticContext
+from antlr4.dfa.DFA import DFA
+from antlr4.dfa.DFAState import DFAState
+from parse.grammar import grammar_version
+from parse.lexer import MySqlLexer
+from parse.parser import MySqlParser
+from typing import Dict, Optional
+from utils.logging import logger
+
+# Bump when the layout of the pickled DFA data changes
+CACHE_FORMAT = 1
+
+# DFAState edges pointing to the simulators' ERROR states are stored as this index
+ERROR_EDGE = -2
+NO_EDGE = -1
+
+_recognizers = {'parser': MySqlParser, 'lexer': MySqlLexer}
+_loaded = set()
+
+
+def dfa_cache_path(cache_dir: str) -> str:
+
+    """
+    Returns the DFA cache file path for the current grammar inside cache_dir.
+
+    :param cache_dir: cache directory
+    :return: DFA cache file path
+    """
+
+    return os.path.join(cache_dir, f'dfa-{CACHE_FORMAT}-{grammar_version()}.pickle')
+
+
+def dfa_size() -> int:
+
+    """
+    Counts DFA states currently held by the lexer and parser, used to
+    decide whether the in-memory DFA is warmer than the one on disk.
+
+    :return: total number of DFA states
+    """
+
+    return sum(len(dfa._states) for r in _recognizers.values() for dfa in r.decisionsToDFA)
+
+
+class _DFAPickler(pickle.Pickler):
+
+    """Pickler storing ATN states and runtime singletons by reference, as
+    they already exist in the generated lexer/parser of the loading process"""
+
+    def persistent_id(self, obj):
+
+        if isinstance(obj, ATNState):
+            kind = 'lexer' if obj.atn is MySqlLexer.atn else 'parser'
+            return 'state', kind, obj.stateNumber
+        elif obj is PredictionContext.EMPTY:
+            return 'empty',
+        elif obj is SemanticContext.NONE:
+            return 'none',
+        elif obj is not None and getattr(type(obj), 'INSTANCE', None) is obj:
+            return 'instance', type(obj).__module__, type(obj).__qualname__
+
+        return None
+
+
+class _DFAUnpickler(pickle.Unpickler):
+
+    def persistent_load(self, pid):
+
+        if pid[0] == 'state':
+            return _recognizers[pid[1]].atn.states[pid[2]]
+        elif pid[0] == 'empty':
+            return PredictionContext.EMPTY
+        elif pid[0] == 'none':
+            return SemanticContext.NONE
+        elif pid[0] == 'instance':
+            module = sys.modules[pid[1]]
+            return getattr(module, pid[2]).INSTANCE
+
+        raise pickle.UnpicklingError(f'Unknown persistent id {pid}')
+
+
+def _flatten_dfa(dfa: DFA, error: DFAState) -> Dict:
+
+    """
+    Flattens a DFA into a list of states, with edges stored as state indexes.
+    This keeps the pickle shallow: nested edges would otherwise be pickled
+    recursively, state after state.
+
+    :param dfa: lexer or parser DFA
+    :param error: ERROR state of the simulator owning the DFA
+    :return: dictionary holding the flattened DFA
+    """
+
+    index = {}
+    states = []
+
+    def visit(s: DFAState) -> None:
+        if s is not None and s is not error and id(s) not in index:
+            index[id(s)] = len(states)
+            states.append(s)
+
+    visit(dfa.s0)
+    for s in dfa._states.values():
+        visit(s)
+    # Edge targets are also registered in _states, except precedence start states
+    i = 0
+    while i < len(states):
+        for t in states[i].edges or []:
+            visit(t)
+        i += 1
+
+    def edge(t: Optional[DFAState]) -> int:
+        if t is None:
+            return NO_EDGE
+        elif t is error:
+            return ERROR_EDGE
+        return index[id(t)]
+
+    return {
+        'decision': dfa.decision,
+        's0': index[id(dfa.s0)] if dfa.s0 is not None else None,
+        'registered': [index[id(s)] for s in dfa._states.values()],
+        'states': [(s.stateNumber, s.configs, s.isAcceptState, s.prediction,
+                    s.lexerActionExecutor, s.requiresFullContext, s.predicates)
+                   for s in states],
+        'edges': [[edge(t) for t in s.edges] if s.edges is not None else None
+                  for s in states]
+    }
+
+
+def _restore_dfa(dfa: DFA, data: Dict, error: DFAState) -> None:
+
+    """
+    Rebuilds the states of a flattened DFA into the given DFA object.
+
+    :param dfa: lexer or parser DFA to restore states into
+    :param data: dictionary created by _flatten_dfa
+    :param error: ERROR state of the simulator owning the DFA
+    """
+
+    states = []
+    for number, configs, accept, prediction, executor, full_ctx, predicates in data['states']:
+        # Cached hashes may rely on per-process string hashing
+        configs.cachedHashCode = -1
+        for c in configs:
+            if getattr(c, 'lexerActionExecutor', None) is not None:
+                _rehash(c.lexerActionExecutor)
+        if executor is not None:
+            _rehash(executor)
+        s = DFAState(number, configs)
+        s.isAcceptState = accept
+        s.prediction = prediction
+        s.lexerActionExecutor = executor
+        s.requiresFullContext = full_ctx
+        s.predicates = predicates
+        states.append(s)
+
+    for s, edges in zip(states, data['edges']):
+        if edges is not None:
+            s.edges = [None if e == NO_EDGE else error if e == ERROR_EDGE else states[e]
+                       for e in edges]
+
+    dfa._states = {states[i]: states[i] for i in data['registered']}
+    if data['s0'] is not None:
+        dfa.s0 = states[data['s0']]
+
+
+def _rehash(executor) -> None:
+
+    executor.hashCode = hash("".join([str(la) for la in executor.lexerActions]))
+
+
+def save_dfa_cache(cache_dir: str) -> bool:
+
+    """
+    Serializes the warmed lexer and parser DFAs and the parser prediction
+    context cache into cache_dir. The file is only replaced if the current
+    process holds more DFA states than the cached file, so that concurrent
+    processes keep the warmest DFA.
+
+    :param cache_dir: cache directory
+    :return: True if the cache file was written
+    """
+
+    path = dfa_cache_path(cache_dir)
+    size = dfa_size()
+
+    if size <= cached_dfa_size(path):
+        return False
+
+    data = {
+        'lexer': [_flatten_dfa(d, LexerATNSimulator.ERROR) for d in MySqlLexer.decisionsToDFA],
+        'parser': [_flatten_dfa(d, ATNSimulator.ERROR) for d in MySqlParser.decisionsToDFA],
+        'contexts': list(MySqlParser.sharedContextCache.cache.values())
+    }
+
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            pickle.dump({'size': size}, file, pickle.HIGHEST_PROTOCOL)
+            _DFAPickler(file, pickle.HIGHEST_PROTOCOL).dump(data)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.info(f'\nCould not save DFA cache at {path}: {e}')
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+    logger.info(f'\nSaved {size} DFA states to {path}')
+    return True
+
+
+def cached_dfa_size(path: str) -> int:
+
+    """
+    Reads the number of DFA states stored in a DFA cache file header.
+
+    :param path: DFA cache file path
+    :return: number of DFA states, 0 if the file does not exist or is unreadable
+    """
+
+    try:
+        with open(path, 'rb') as file:
+            return pickle.load(file)['size']
+    except Exception:
+        return 0
+
+
+def load_dfa_cache(cache_dir: str) -> bool:
+
+    """
+    Loads the DFA cache of the current grammar from cache_dir into the lexer
+    and parser DFAs. Must run before any parsing happens in the process;
+    does nothing if the cache was already loaded or if DFAs are already warm.
+
+    :param cache_dir: cache directory
+    :return: True if the cache was loaded
+    """
+
+    path = dfa_cache_path(cache_dir)
+
+    if path in _loaded or dfa_size() or not os.path.isfile(path):
+        return False
+
+    try:
+        with open(path, 'rb') as file:
+            pickle.load(file)
+            data = _DFAUnpickler(file).load()
+
+        for dfas, saved, error in ((MySqlLexer.decisionsToDFA, data['lexer'], LexerATNSimulator.ERROR),
+                                   (MySqlParser.decisionsToDFA, data['parser'], ATNSimulator.ERROR)):
+            for dfa, d in zip(dfas, saved):
+                _restore_dfa(dfa, d, error)
+
+        for ctx in data['contexts']:
+            MySqlParser.sharedContextCache.add(ctx)
+
+    except Exception as e:
+        logger.info(f'\nCould not load DFA cache from {path}: {e}')
+        reset_dfa()
+        return False
+
+    _loaded.add(path)
+    logger.info(f'\nLoaded {dfa_size()} DFA states from {path}')
+    return True
+
+
+def reset_dfa() -> None:
+
+    """Drops all DFA states of the lexer and parser, leaving them cold"""
+
+    for r in _recognizers.values():
+        r.decisionsToDFA[:] = [DFA(r.atn.getDecisionState(i), i)
+                            for i, _ in enumerate(r.atn.decisionToState)]
+    MySqlParser.sharedContextCache.cache.clear()
@@ -0,0 +1,26 @@
+import os
+import sys
+import hashlib
+from functools import lru_cache
+
+# Generated lexer and parser modules, hashed as files so that their version
+# is known without importing them
+GRAMMAR_FILES = [os.path.join(os.path.dirname(__file__), f) for f in ('lexer.py', 'parser.py')]
+
+
+@lru_cache(maxsize=1)
+def grammar_version() -> str:
+
+    """
+    Computes a version key for the generated lexer and parser, so that
+    caches are never loaded against another grammar. The generated modules
+    are read as text rather than imported, as building their ATNs is slow.
+
+    :return: hexadecimal digest of both generated modules
+    """
+
+    h = hashlib.sha1(f'{sys.version_info[:2]}'.encode())
+    for path in GRAMMAR_FILES:
+        with open(path, 'rb') as file:
+            h.update(file.read())
+    return h.hexdigest()[:16]
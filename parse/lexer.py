@@ -3,6 +3,7 @@ from antlr4 import *
 from io import StringIO
 from typing.io import TextIO
 import sys
+from parse.atn_cache import load_atn
 
 
 def serializedATN():
@@ -5410,9 +5411,13 @@ def serializedATN():
         return buf.getvalue()
 
 
+# ATN cache key, written by python -m parse.atn_cache
+ATN_KEY = '6a754167df1d4c43'
+
+
 class MySqlLexer(Lexer):
 
-    atn = ATNDeserializer().deserialize(serializedATN())
+    atn = load_atn('lexer', ATN_KEY, serializedATN)
 
     decisionsToDFA = [ DFA(ds, i) for i, ds in enumerate(atn.decisionToState) ]
 
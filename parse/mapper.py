@@ -26,12 +26,24 @@ class Mapper:
              'DROP TABLE': DROP_TABLE_REGEX,
              'TRUNCATE': TRUNCATE_REGEX}
 
+        # Single-pass splitter regex, finding delimiters and literals
+        self.boundary_regex = self.reg(delimiter, mode, boundary_regex)
+
         self.methods = None
         self.parser = None
         self.extractors = None
         self.parsermethods = None
         self.mapper = None
 
+    def __getstate__(self):
+
+        # Parser methods are bound to the parser session of the current
+        # process and must be mapped again after unpickling
+        state = self.__dict__.copy()
+        state['parser'] = None
+        state['mapper'] = None
+        return state
+
     def reg(self, delimiter, mode, reg_func):
 
         """
@@ -0,0 +1,134 @@
+import sys
+from typing import NamedTuple, Optional, Tuple, Dict
+
+
+class Table(NamedTuple):
+
+    """Immutable table (or procedure) reference, with interned schema and
+    name strings shared by all references to the same table"""
+
+    schema: str
+    name: str
+
+    @classmethod
+    def from_dict(cls, t: Dict) -> 'Table':
+
+        return cls(sys.intern(t['schema']), sys.intern(t['name']))
+
+    def key(self) -> Tuple[str, str]:
+
+        """
+        Builds a case-insensitive key of the table, as parsed identifiers
+        keep their original casing.
+
+        :return: tuple (lower case schema, lower case name)
+        """
+
+        return self.schema.lower(), self.name.lower()
+
+    def to_dict(self) -> Dict:
+
+        return {'schema': self.schema, 'name': self.name}
+
+
+class Statement(NamedTuple):
+
+    """Immutable parsed statement. Fields which do not apply to the
+    statement operation are None, and left out of its dictionary form"""
+
+    operation: str
+    target_table: Table
+    from_table: Optional[Tuple[Table, ...]] = None
+    join_table: Optional[Tuple[Table, ...]] = None
+    target_columns: Optional[Tuple[str, ...]] = None
+    procedure: Optional[str] = None
+    start: Optional[int] = None
+    end: Optional[int] = None
+    start_line: Optional[int] = None
+    end_line: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, s: Dict) -> 'Statement':
+
+        """
+        Builds a statement from a valid statement dictionary, as extracted by
+        the Worker parsing methods.
+
+        :param s: statement dictionary
+        :return: Statement object
+        """
+
+        fields = dict(s)
+        fields['operation'] = sys.intern(s['operation'])
+        fields['target_table'] = Table.from_dict(s['target_table'])
+
+        for k in ('from_table', 'join_table'):
+            if s.get(k) is not None:
+                fields[k] = tuple(Table.from_dict(t) for t in s[k])
+        if s.get('target_columns') is not None:
+            fields['target_columns'] = tuple(s['target_columns'])
+        if s.get('procedure') is not None:
+            fields['procedure'] = sys.intern(s['procedure'])
+
+        return cls(**fields)
+
+    def tables(self) -> Tuple[Table, ...]:
+
+        """
+        Gets the source tables of the statement.
+
+        :return: tuple of FROM and JOIN tables
+        """
+
+        return (self.from_table or ()) + (self.join_table or ())
+
+    def to_dict(self) -> Dict:
+
+        """
+        Serializes the statement to the dictionary format of parsing results.
+
+        :return: statement dictionary
+        """
+
+        d = {}
+
+        for k, v in zip(self._fields, self):
+            if v is None:
+                continue
+            if k == 'target_table':
+                v = v.to_dict()
+            elif k in ('from_table', 'join_table'):
+                v = [t.to_dict() for t in v]
+            elif k == 'target_columns':
+                v = list(v)
+            d[k] = v
+
+        return d
+
+
+class Procedure(NamedTuple):
+
+    """Immutable procedure (or file in DDL parsing mode) holding its parsed
+    statements in source order"""
+
+    schema: str
+    name: str
+    path: str
+    statements: Tuple[Statement, ...]
+
+    @classmethod
+    def from_dict(cls, p: Dict) -> 'Procedure':
+
+        return cls(sys.intern(p['schema']), sys.intern(p['name']), p['path'],
+                   tuple(Statement.from_dict(s) for s in p['statements']))
+
+    def key(self) -> Tuple[str, str]:
+
+        return self.schema.lower(), self.name.lower()
+
+    def to_dict(self) -> Dict:
+
+        return {'schema': self.schema,
+                'name': self.name,
+                'path': self.path,
+                'statements': [s.to_dict() for s in self.statements]}
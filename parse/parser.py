@@ -4,6 +4,7 @@ from antlr4 import *
 from io import StringIO
 from typing.io import TextIO
 import sys
+from parse.atn_cache import load_atn
 
 def serializedATN():
     with StringIO() as buf:
@@ -3709,11 +3710,15 @@ def serializedATN():
         return buf.getvalue()
 
 
+# ATN cache key, written by python -m parse.atn_cache
+ATN_KEY = 'd214598efda3af6e'
+
+
 class MySqlParser ( Parser ):
 
     grammarFileName = "MySqlParser.g4"
 
-    atn = ATNDeserializer().deserialize(serializedATN())
+    atn = load_atn('parser', ATN_KEY, serializedATN)
 
     decisionsToDFA = [ DFA(ds, i) for i, ds in enumerate(atn.decisionToState) ]
 
@@ -0,0 +1,63 @@
+import re
+from typing import Match
+
+# Literals and quoted names are matched as a whole so that comment markers
+# inside of them are left untouched. Comments follow sqlparse conventions:
+# '--' and '# ' line comments, optimizer hints ('/*+ */', '--+') are kept
+comment_regex = re.compile(r"""
+      (?P<literal>'(?:[^'\\]|\\.)*(?:'|\Z)
+                 |"(?:[^"\\]|\\.)*(?:"|\Z)
+                 |/\*\+.*?(?:\*/|\Z))
+    | `(?P<name>[^`]*)(?:`|\Z)
+    | (?P<block>/\*.*?(?:\*/|\Z))
+    | (?P<line>(?:--|\#[ ])(?!\+)[^\r\n]*)
+""", re.DOTALL | re.VERBOSE)
+
+supported_preprocessors = ('fast', 'sqlparse')
+
+
+def _replace(m: Match) -> str:
+
+    kind = m.lastgroup
+    if kind == 'literal':
+        return m.group()
+    elif kind == 'name':
+        return m.group('name')
+    elif kind == 'block':
+        return ' '
+
+    return ''
+
+
+def strip_comments(text: str) -> str:
+
+    """
+    Removes comments and backticks from SQL code in a single pass, leaving
+    string literals untouched. Block comments are replaced by a space so
+    that surrounding tokens are not merged.
+
+    :param text: SQL code
+    :return: SQL code without comments nor backticks
+    """
+
+    return comment_regex.sub(_replace, text)
+
+
+def preprocess(text: str, preprocessor: str = 'fast') -> str:
+
+    """
+    Prepares the content of a .sql file for statement extraction and parsing.
+    Input is not upper cased, the parser session folds case on the fly.
+
+    :param text: .sql file content
+    :param preprocessor: 'fast' for the dedicated comment stripper, or
+    'sqlparse' for sqlparse.format, much slower on large files
+    :return: SQL code without comments nor backticks
+    """
+
+    if preprocessor == 'sqlparse':
+        # Only imported when selected, as it is slow to import
+        from sqlparse import format as fmt
+        return fmt(text.replace('`', ''), strip_comments=True).strip()
+
+    return strip_comments(text).strip()
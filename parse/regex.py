@@ -36,3 +36,24 @@ def truncate_regex(delimiter):
 proc_name_regex = re.compile(
         r'(?<=CREATE\sPROCEDURE\s)(?:IF\sNOT\sEXISTS\s)?([A-Za-z0-9._-]+)',
         re.IGNORECASE)
+
+
+def boundary_regex(delimiter):
+    return re.compile(r"""['"`]|{}""".format(re.escape(delimiter)))
+
+
+statement_head_regex = re.compile(
+        r'(?=[IRUDCT])(?:'
+        r'(?P<insert>\bINSERT\s+?INTO\s+?[A-Za-z0-9._-]+\s)'
+        r'|(?P<replace>\bREPLACE\s+?INTO\s+?[A-Za-z0-9._-]+\s)'
+        r'|(?P<update>\bUPDATE\s+?[A-Za-z0-9._-]+\s)'
+        r'|(?P<delete>\bDELETE\s+?FROM)'
+        r'|(?P<create_table>\bCREATE\s(?:TEMPORARY)?\s?TABLE\s)'
+        r'|(?P<drop_table>\bDROP\s(?:TEMPORARY)?\s?TABLE\s)'
+        r'|(?P<truncate>\bTRUNCATE\s+TABLE\s+?[A-Za-z0-9._-]+))',
+        re.IGNORECASE)
+
+literal_regexes = {
+        "'": re.compile(r"'(?:[^'\\]|\\.)*'", re.DOTALL),
+        '"': re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL),
+        '`': re.compile(r'`[^`]*`')}
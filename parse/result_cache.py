@@ -0,0 +1,132 @@
+import os
+import ujson
+import shutil
+import hashlib
+import tempfile
+from parse.grammar import grammar_version
+from typing import List, Dict, Optional
+from utils.logging import logger
+
+# Bump when the structure of parse_file results changes
+CACHE_FORMAT = 4
+
+
+class ResultCache:
+
+    """On-disk cache of Worker.parse_file results, keyed on file content and
+    parser settings. Entries are evicted in least recently used order once
+    the cache grows over its size limit"""
+
+    def __init__(self, cache_dir: str, max_size_mb: float, default_schema: str,
+                 delimiter: str, pmode: str, preprocessor: str = 'fast') -> None:
+
+        self.dir = os.path.join(cache_dir, 'results')
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self.settings = f'{CACHE_FORMAT}\0{grammar_version()}\0{default_schema}\0{delimiter}\0{pmode}\0{preprocessor}'
+
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def key(self, path: str) -> str:
+
+        """
+        Computes the cache key of a .sql file. The path is part of the key as
+        it is stored in the results.
+
+        :param path: .sql file path
+        :return: hexadecimal cache key
+        """
+
+        h = hashlib.sha256(f'{self.settings}\0{path}\0'.encode())
+        with open(path, 'rb') as file:
+            h.update(file.read())
+
+        return h.hexdigest()
+
+    def entry_path(self, key: str) -> str:
+
+        return os.path.join(self.dir, key[:2], f'{key}.json')
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+
+        """
+        Returns cached results for a key and marks the entry as recently used.
+
+        :param key: cache key
+        :return: list of procedure/file dictionaries, None on cache miss
+        """
+
+        path = self.entry_path(key)
+
+        try:
+            with open(path, 'r') as file:
+                results = ujson.load(file)
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return results
+
+    def put(self, key: str, results: List[Dict]) -> None:
+
+        """
+        Stores results for a key, written atomically.
+
+        :param key: cache key
+        :param results: list of procedure/file dictionaries
+        """
+
+        path = self.entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+
+        try:
+            with os.fdopen(fd, 'w') as file:
+                ujson.dump(results, file)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, OverflowError) as e:
+            logger.info(f'\nCould not cache results at {path}: {e}')
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def prune(self) -> None:
+
+        """Evicts least recently used entries until the cache fits its size limit"""
+
+        entries = []
+        if os.path.isdir(self.dir):
+            for sub in os.scandir(self.dir):
+                if sub.is_dir():
+                    entries.extend((e.stat().st_mtime, e.stat().st_size, e.path)
+                                   for e in os.scandir(sub.path) if e.name.endswith('.json'))
+
+        size = sum(e[1] for e in entries)
+        for mtime, entry_size, path in sorted(entries):
+            if size <= self.max_size:
+                break
+            os.remove(path)
+            size -= entry_size
+            self.evicted += 1
+
+    def clear(self) -> None:
+
+        """Removes all cached results"""
+
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def stats(self) -> str:
+
+        """
+        Formats cache statistics of the current run.
+
+        :return: statistics string
+        """
+
+        total = self.hits + self.misses
+        rate = 100 * self.hits / total if total else 0
+
+        return f'{self.hits}/{total} files served from cache ({rate:.1f}% hit rate), ' \
+               f'{self.evicted} entries evicted'
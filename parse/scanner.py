@@ -0,0 +1,81 @@
+import re
+from parse.regex import statement_head_regex, literal_regexes
+from typing import Iterator, Tuple, Pattern
+
+# Statement head regex group names mapped to DDL types
+DDL_TYPES = {'insert': 'INSERT',
+             'replace': 'REPLACE',
+             'update': 'UPDATE',
+             'delete': 'DELETE',
+             'create_table': 'CREATE TABLE',
+             'drop_table': 'DROP TABLE',
+             'truncate': 'TRUNCATE'}
+
+update_set_regex = re.compile(r'\sSET\s', re.IGNORECASE)
+
+
+def split_statements(text: str, boundary: Pattern) -> Iterator[Tuple[str, str, int]]:
+
+    """
+    Walks a procedure/file body once, splitting it on the delimiter while
+    skipping string literals, and classifies each statement by the first
+    statement keyword found outside of literals. Statements without any
+    supported keyword are skipped.
+
+    :param text: procedure/file body string
+    :param boundary: compiled boundary regex, see parse.regex.boundary_regex
+    :return: iterator of (ddl_type, statement string, statement start) tuples
+    in source order, statement strings starting at their keyword and ending
+    with the delimiter
+    """
+
+    pos = 0
+    # Start of the code segment (outside of literals) not searched for keywords yet
+    segment = 0
+    head = None
+
+    while True:
+
+        m = boundary.search(text, pos)
+        if m is None:
+            return
+
+        # Statement keywords never span literals, only look for them in code
+        if head is None:
+            head = statement_head_regex.search(text, segment, m.start())
+
+        quote = m.group()
+
+        if quote in literal_regexes:
+            literal = literal_regexes[quote].match(text, m.start())
+            pos = segment = literal.end() if literal else m.end()
+
+        else:
+            if head is not None:
+                ddl_type = DDL_TYPES[head.lastgroup]
+                s = text[head.start():m.end()]
+                if is_complete(ddl_type, s, m.start() - head.start()):
+                    yield ddl_type, s, head.start()
+            pos = segment = m.end()
+            head = None
+
+
+def is_complete(ddl_type: str, s: str, body_end: int) -> bool:
+
+    """
+    Checks the statement-specific requirements which cannot be checked on the
+    statement keyword alone: UPDATE statements need a SET clause, TRUNCATE
+    statements must end right after the table name.
+
+    :param ddl_type: DDL statement type
+    :param s: statement string, including the delimiter
+    :param body_end: statement length without the delimiter
+    :return: True if the statement can be parsed
+    """
+
+    if ddl_type == 'UPDATE':
+        return update_set_regex.search(s, 0, body_end) is not None
+    elif ddl_type == 'TRUNCATE':
+        return len(s[:body_end].split()) == 3
+
+    return True
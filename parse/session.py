@@ -0,0 +1,127 @@
+from antlr4 import InputStream, CommonTokenStream, ParserRuleContext
+from antlr4.atn.PredictionMode import PredictionMode
+from antlr4.error.ErrorListener import ConsoleErrorListener
+from antlr4.error.ErrorStrategy import BailErrorStrategy, DefaultErrorStrategy
+from antlr4.error.Errors import ParseCancellationException
+from parse.lexer import MySqlLexer
+from parse.parser import MySqlParser
+from typing import Optional, Callable
+
+
+class CaseInsensitiveInputStream(InputStream):
+
+    """InputStream feeding upper cased code points to the lexer, as the grammar
+    is case-sensitive, while token texts are still read from the original
+    string so that identifiers keep their casing"""
+
+    def _loadString(self) -> None:
+
+        self._index = 0
+        upper = self.strdata.upper()
+        # Upper casing a few characters changes the string length, fold them one by one
+        if len(upper) != len(self.strdata):
+            upper = ''.join(c if len(c.upper()) != 1 else c.upper() for c in self.strdata)
+        self.data = [ord(c) for c in upper]
+        self._size = len(self.data)
+
+
+class ParserSession:
+
+    """Holds one MySqlLexer/MySqlParser pair per process. The pair is reset and
+    fed each new statement instead of being rebuilt for every statement, so
+    that parser methods bound once by the Mapper stay valid between statements"""
+
+    def __init__(self) -> None:
+
+        self.lexer = MySqlLexer(CaseInsensitiveInputStream(''))
+        self.token_stream = CommonTokenStream(self.lexer)
+        self.parser = MySqlParser(self.token_stream)
+
+        self.bail_strategy = BailErrorStrategy()
+        self.default_strategy = DefaultErrorStrategy()
+
+    def load(self, s: str) -> MySqlParser:
+
+        """
+        Resets the lexer, token stream and parser on a new statement string.
+        The parser is left in full LL prediction mode with default error
+        recovery.
+
+        :param s: statement string to parse
+        :return: the session parser, ready to parse the statement
+        """
+
+        self.set_prediction_mode(PredictionMode.LL)
+        self.lexer.inputStream = CaseInsensitiveInputStream(s)
+        self.token_stream.setTokenSource(self.lexer)
+        self.parser.setTokenStream(self.token_stream)
+
+        return self.parser
+
+    def set_prediction_mode(self, mode: int) -> None:
+
+        """
+        Switches the parser prediction mode. SLL mode bails out on the first
+        syntax error without reporting it, LL mode recovers from errors and
+        reports them on the console as usual.
+
+        :param mode: PredictionMode.SLL or PredictionMode.LL
+        """
+
+        self.parser._interp.predictionMode = mode
+        self.parser.removeErrorListeners()
+
+        if mode == PredictionMode.SLL:
+            self.parser._errHandler = self.bail_strategy
+        else:
+            self.parser._errHandler = self.default_strategy
+            self.parser.addErrorListener(ConsoleErrorListener.INSTANCE)
+
+    def parse(self, s: str, rule: Callable[[], ParserRuleContext],
+              sll: bool = True) -> ParserRuleContext:
+
+        """
+        Parses a statement string with the given parser rule. In two-stage
+        mode, the statement is first parsed with the faster SLL prediction,
+        and only parsed again with full LL prediction if SLL fails. Tokens
+        lexed during the first stage are reused by the second one.
+
+        :param s: statement string to parse
+        :param rule: parser method bound to the session parser
+        :param sll: whether to try SLL prediction before LL
+        :return: AST object parsed
+        """
+
+        self.load(s)
+
+        if not sll:
+            return rule()
+
+        self.set_prediction_mode(PredictionMode.SLL)
+        self.bail_strategy.reset(self.parser)
+
+        try:
+            return rule()
+        except ParseCancellationException:
+            self.set_prediction_mode(PredictionMode.LL)
+            self.parser.reset()
+            return rule()
+
+
+_session: Optional[ParserSession] = None
+
+
+def get_session() -> ParserSession:
+
+    """
+    Returns the parser session of the current process, creating it on first use.
+
+    :return: ParserSession object
+    """
+
+    global _session
+
+    if _session is None:
+        _session = ParserSession()
+
+    return _session
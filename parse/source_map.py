@@ -0,0 +1,153 @@
+import re
+from bisect import bisect_right
+from typing import Dict, List, Tuple
+
+line_end_regex = re.compile('\n')
+
+
+class SourceMap:
+
+    """Maps positions in the preprocessed text of a file (without comments nor
+    backticks) back to the original file, as byte offsets and line numbers"""
+
+    def __init__(self, original: str, processed: str, encoding: str = 'utf-8') -> None:
+
+        self.original = original
+        self.encoding = encoding
+        self.processed_starts, self.original_starts = align(original, processed)
+
+        self.line_starts = [0] + [m.end() for m in line_end_regex.finditer(original)]
+        # Byte offset of each line start, only needed for non-ASCII files
+        self.line_bytes = None
+        if len(original.encode(encoding)) != len(original):
+            self.line_bytes = [0]
+            for start, end in zip(self.line_starts, self.line_starts[1:]):
+                self.line_bytes.append(self.line_bytes[-1] + len(original[start:end].encode(encoding)))
+
+    def position(self, pos: int) -> int:
+
+        """
+        Converts a position in the preprocessed text into a character position
+        in the original text.
+
+        :param pos: character position in the preprocessed text
+        :return: character position in the original text
+        """
+
+        k = bisect_right(self.processed_starts, pos) - 1
+        if k < 0:
+            return 0
+        return min(self.original_starts[k] + pos - self.processed_starts[k], len(self.original))
+
+    def line(self, pos: int) -> int:
+
+        """
+        :param pos: character position in the original text
+        :return: 1-based line number of the position
+        """
+
+        return bisect_right(self.line_starts, pos)
+
+    def byte(self, pos: int) -> int:
+
+        """
+        :param pos: character position in the original text
+        :return: byte offset of the position in the original file
+        """
+
+        if self.line_bytes is None:
+            return pos
+
+        k = bisect_right(self.line_starts, pos) - 1
+        return self.line_bytes[k] + len(self.original[self.line_starts[k]:pos].encode(self.encoding))
+
+    def span(self, start: int, end: int) -> Dict:
+
+        """
+        Locates a statement of the preprocessed text in the original file.
+
+        :param start: statement start in the preprocessed text
+        :param end: statement end (exclusive) in the preprocessed text
+        :return: dictionary holding the start and end (exclusive) byte offsets
+        and the first and last line numbers of the statement
+        """
+
+        start = self.position(start)
+        last = self.position(end - 1)
+
+        return {'start': self.byte(start),
+                'end': self.byte(last + 1),
+                'start_line': self.line(start),
+                'end_line': self.line(last)}
+
+
+def align(original: str, processed: str) -> Tuple[List[int], List[int]]:
+
+    """
+    Aligns a preprocessed text with its original text in linear time. The
+    preprocessed text only differs from the original by removed comments,
+    backticks and whitespace, so both texts are walked together,
+    matching runs of identical characters and skipping what was removed.
+
+    :param original: original text
+    :param processed: preprocessed text
+    :return: tuple (run starts in the preprocessed text, matching run starts
+    in the original text)
+    """
+
+    processed_starts, original_starts = [], []
+    i = j = 0
+    n, m = len(original), len(processed)
+
+    while i < n and j < m:
+
+        k = common_length(original, i, processed, j)
+        if k:
+            processed_starts.append(j)
+            original_starts.append(i)
+            i += k
+            j += k
+            continue
+
+        c = original[i]
+        if original.startswith('/*', i):
+            end = original.find('*/', i + 2)
+            i = end + 2 if end != -1 else n
+        elif original.startswith('--', i) or original.startswith('# ', i):
+            end = original.find('\n', i)
+            i = end if end != -1 else n
+        elif c == '`' or c.isspace():
+            i += 1
+        elif processed[j].isspace():
+            j += 1
+        else:
+            # Characters are only ever removed from the original text
+            i += 1
+
+    return processed_starts, original_starts
+
+
+def common_length(a: str, i: int, b: str, j: int) -> int:
+
+    """
+    Computes the length of the common prefix of a[i:] and b[j:], comparing
+    slices of exponentially growing size before bisecting.
+
+    :return: length of the common prefix
+    """
+
+    limit = min(len(a) - i, len(b) - j)
+    lo, hi = 0, 1
+
+    while hi <= limit and a[i:i + hi] == b[j:j + hi]:
+        lo, hi = hi, hi * 2
+
+    hi = min(hi, limit + 1)
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if a[i:i + mid] == b[j:j + mid]:
+            lo = mid
+        else:
+            hi = mid
+
+    return lo
@@ -0,0 +1,136 @@
+import os
+import time
+from colorama import Fore, Style
+from parse.worker import Worker, iter_sql_files
+from parse.models import Procedure
+from utils.logging import logger
+from typing import List, Dict, Tuple, Iterator
+
+
+def snapshot(path: str) -> Dict[str, Tuple[int, int]]:
+
+    """
+    Gets the modification time and size of a .sql file, or of all .sql files
+    found in a directory.
+
+    :param path: path to the file/directory
+    :return: dictionary {file path: (modification time in ns, size)}
+    """
+
+    paths = iter_sql_files(path) if os.path.isdir(path) else [path]
+    files = {}
+
+    for p in paths:
+        try:
+            stat = os.stat(p)
+        except OSError:
+            continue
+        files[p] = (stat.st_mtime_ns, stat.st_size)
+
+    return files
+
+
+class Watcher:
+
+    """Keeps the results of a file/directory in memory, grouped by file, and
+    polls it for changes: only added or modified .sql files are parsed again,
+    and results of deleted files are dropped"""
+
+    def __init__(self, worker: Worker, path: str, interval: float = 1) -> None:
+
+        self.worker = worker
+        self.path = path
+        self.interval = interval
+        self.files = {}
+        self.results = {}
+        # Results of the changed and deleted files before the last poll, and
+        # results parsed by the last poll
+        self.removed = []
+        self.parsed = []
+
+    def load(self) -> List[Procedure]:
+
+        """
+        Parses the whole file/directory.
+
+        :return: list of Procedure objects
+        """
+
+        self.files = snapshot(self.path)
+        self.results = {p: [] for p in self.files}
+        self.update(list(self.files))
+
+        return self.procedures()
+
+    def procedures(self) -> List[Procedure]:
+
+        """
+        Gets current results, in file path order.
+
+        :return: list of Procedure objects
+        """
+
+        return [p for path in sorted(self.results) for p in self.results[path]]
+
+    def update(self, paths: List[str]) -> List[Procedure]:
+
+        """
+        Parses files again and replaces their results.
+
+        :param paths: list of .sql file paths
+        :return: list of Procedure objects of these files
+        """
+
+        self.worker.reset_warnings()
+        for path in paths:
+            self.results[path] = []
+
+        parsed = []
+        for p in self.worker.iter_parse_files(paths):
+            self.results[p.path].append(p)
+            parsed.append(p)
+
+        return parsed
+
+    def poll(self) -> Tuple[List[str], List[str]]:
+
+        """
+        Compares the file/directory with its last snapshot, parses added and
+        modified files, and drops results of deleted files. Previous results
+        of these files are kept in self.removed, and new ones in self.parsed.
+
+        :return: tuple (list of added or modified paths, list of deleted paths)
+        """
+
+        # Snapshot before parsing, so that files changed while parsing are seen on next poll
+        files = snapshot(self.path)
+        changed = sorted(p for p, stat in files.items() if self.files.get(p) != stat)
+        deleted = sorted(p for p in self.files if p not in files)
+        self.files = files
+
+        self.removed = [p for path in changed + deleted for p in self.results.get(path, ())]
+
+        for path in deleted:
+            del self.results[path]
+            logger.warning(f'\n{Fore.YELLOW}Removed {path}{Style.RESET_ALL}')
+
+        self.parsed = self.update(changed) if changed else []
+
+        return changed, deleted
+
+    def watch(self) -> Iterator[Tuple[List[str], List[str]]]:
+
+        """
+        Polls the file/directory every self.interval seconds, until interrupted.
+
+        :return: iterator of (changed paths, deleted paths) tuples, yielded
+        after each change once results are up to date
+        """
+
+        logger.warning(f'\n{Fore.GREEN}Watching {self.path} for changes...{Style.RESET_ALL}')
+
+        while True:
+            time.sleep(self.interval)
+            changed, deleted = self.poll()
+            if changed or deleted:
+                yield changed, deleted
@@ -1,25 +1,158 @@
 import os
 import re
+import logging
+import queue
+import weakref
 import multiprocessing as mp
+from multiprocessing.util import Finalize
 from parse.regex import procedure_regex, proc_name_regex
 from colorama import Fore, Style
-from sqlparse import format as fmt
-from antlr4 import ParserRuleContext, TerminalNode, ErrorNode, \
-    InputStream, CommonTokenStream
-from parse.lexer import MySqlLexer
-from parse.parser import MySqlParser
 from parse.mapper import Mapper
-from typing import List, Tuple, Optional, Dict
-from utils.processing import flatten, merge_results
+from parse.scanner import split_statements
+from parse.source_map import SourceMap
+from parse.preprocess import preprocess
+from parse.result_cache import ResultCache
+from typing import List, Tuple, Optional, Dict, Iterator, Iterable, TYPE_CHECKING
+from parse.models import Table, Procedure
+from utils.processing import merge_results
+from utils.lineage import LineageGraph
 from utils.logging import *
-from copy import deepcopy
+from collections import Counter
+from itertools import chain
+
+if TYPE_CHECKING:
+    from antlr4 import ParserRuleContext
+
+# Worker of the current pool process, built once by init_pool_process
+_process_worker = None
+
+# Generated parser and its helpers, imported by load_parser on first parse
+MySqlParser = None
+TerminalNode = ErrorNode = None
+get_session = load_dfa_cache = save_dfa_cache = None
+
+
+def load_parser() -> None:
+
+    """
+    Imports the generated parser and the modules depending on it, once per
+    process. Building the parser ATNs at import takes most of the start-up
+    time, so runs only reading results from the cache never pay for it.
+    """
+
+    global MySqlParser, TerminalNode, ErrorNode, get_session, load_dfa_cache, save_dfa_cache
+
+    if MySqlParser is None:
+        from antlr4 import TerminalNode, ErrorNode
+        from parse.session import get_session
+        from parse.dfa_cache import load_dfa_cache, save_dfa_cache
+        from parse.parser import MySqlParser
+
+
+def shutdown_pool(pool: mp.Pool) -> None:
+
+    """
+    Closes a process pool, letting processes exit normally so that they save their DFA.
+
+    :param pool: multiprocessing Pool
+    """
+
+    pool.close()
+    pool.join()
+
+
+def init_pool_process(settings: Dict, dfa_cache: Optional[str]) -> None:
+
+    """
+    Pool processes initializer: loads the DFA cache if not inherited from the
+    parent process, builds the process Worker and parser session once, and
+    saves the warmed DFA when the process exits.
+
+    :param settings: Worker parameters, see Worker.settings
+    :param dfa_cache: DFA cache directory, None if disabled
+    """
+
+    global _process_worker
+
+    load_parser()
+    if dfa_cache:
+        load_dfa_cache(dfa_cache)
+        Finalize(None, save_dfa_cache, args=(dfa_cache,), exitpriority=0)
+
+    _process_worker = Worker(**settings)
+    _process_worker.mapper.parser = get_session().parser
+    _process_worker.mapper.map_methods(_process_worker)
+
+
+def parse_files_task(paths: List[str]) -> List[Tuple[str, List[Dict], bool]]:
+
+    """
+    Pool task parsing a chunk of SQL files with the Worker of the current process.
+
+    :param paths: list of file paths
+    :return: list of parse_file_task results, in chunk order
+    """
+
+    return [_process_worker.parse_file_task(path) for path in paths]
+
+
+def parse_statements_task(batch: List[Tuple[str, str]]) -> List[Optional[Dict]]:
+
+    """
+    Pool task parsing a batch of statements of a large file with the Worker
+    of the current process.
+
+    :param batch: list of tuples (DDL type, statement string)
+    :return: list of statement dictionaries, in batch order
+    """
+
+    return [_process_worker.parse_statement(ddl_type, s, _process_worker.mapper) for ddl_type, s in batch]
+
+
+def iter_ready(results: Iterator) -> Iterator:
+
+    """
+    Yields the results of a pool iterator which are already available,
+    without waiting for the others.
+
+    :param results: iterator returned by Pool.imap_unordered, without chunksize
+    :return: iterator of available results
+    """
+
+    while True:
+        try:
+            yield results.next(timeout=0)
+        except (mp.TimeoutError, StopIteration):
+            return
+
+
+def iter_sql_files(dir_path: str) -> Iterator[str]:
+
+    """
+    Lazily walks through a directory tree and yields .sql file paths as they
+    are found.
+
+    :param dir_path: path to the target directory
+    :return: iterator of .sql file paths
+    """
+
+    with os.scandir(dir_path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_sql_files(entry.path)
+            elif entry.name.endswith('.sql') and entry.is_file():
+                yield entry.path
 
 
 class Worker:
 
     """Core object managing all the parsing operations using ANTLR4-generated parser"""
 
-    def __init__(self, default_schema: str, delimiter: str, pmode: str, fmode: str) -> None:
+    def __init__(self, default_schema: str, delimiter: str, pmode: str, fmode: str,
+                 sll: bool = True, dfa_cache: Optional[str] = None,
+                 result_cache: Optional[ResultCache] = None, preprocessor: str = 'fast',
+                 chunksize: int = 1, jobs: Optional[int] = None, split_file_mb: float = 8,
+                 statement_batch: int = 64) -> None:
 
         self.results = []
 
@@ -32,15 +165,136 @@ class Worker:
         self.default_schema = default_schema
         self.pmode = pmode
         self.fmode = fmode
+        self.sll = sll
+        self.dfa_cache = dfa_cache
+        self.result_cache = result_cache
+        self.preprocessor = preprocessor
+        self.chunksize = chunksize
+        self.jobs = jobs
+        self.split_size = split_file_mb * 1024 * 1024
+        self.statement_batch = statement_batch
+        self.pool = None
+        self.pool_finalizer = None
+        self.graph = None
+        self.mapper = Mapper(self.delimiter, self.pmode)
+
+    def __enter__(self) -> 'Worker':
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
+
+    def settings(self) -> Dict:
+
+        """
+        Returns the parameters needed to build an equivalent Worker in pool
+        processes. Caches and large files splitting are handled by the parent
+        process, pool processes always parse in-process.
+
+        :return: dictionary of Worker parameters
+        """
+
+        return {'default_schema': self.default_schema,
+                'delimiter': self.delimiter,
+                'pmode': self.pmode,
+                'fmode': self.fmode,
+                'sll': self.sll,
+                'preprocessor': self.preprocessor,
+                'jobs': 1}
+
+    def get_pool(self) -> mp.Pool:
+
+        """
+        Returns the process pool of the Worker, creating it on first use.
+        The pool is reused by subsequent runs until the Worker is closed, or
+        garbage collected when not used in a with statement.
+
+        :return: multiprocessing Pool of self.jobs processes
+        """
+
+        if self.pool is None:
+            self.pool = mp.Pool(self.jobs, initializer=init_pool_process,
+                                initargs=(self.settings(), self.dfa_cache))
+            # Also called at interpreter exit, if the Worker is still alive
+            self.pool_finalizer = weakref.finalize(self, shutdown_pool, self.pool)
+
+        return self.pool
+
+    def close(self) -> None:
+
+        """Shuts the process pool down, letting processes exit normally so that they save their DFA"""
+
+        if self.pool is not None:
+            self.pool_finalizer()
+            self.pool = None
+
+    def terminate(self) -> None:
+
+        """Stops the process pool immediately, dropping pending tasks"""
+
+        if self.pool is not None:
+            self.pool_finalizer.detach()
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
 
     def run(self, path):
 
+        self.results = list(self.iter_parse(path))
+
+    def iter_parse(self, path: str) -> Iterator[Procedure]:
+
+        """
+        Parses a SQL file or directory and yields valid procedures/files as
+        soon as each file is parsed, so that results can be consumed without
+        keeping all of them in memory.
+
+        :param path: path to the file/directory to parse
+        :return: iterator of Procedure objects
+        """
+
         if os.path.isdir(path):
-            self.parse_dir(path)
-        elif os.path.isfile(path):
-            self.results = self.parse_file(path)
+            return self.iter_parse_files(iter_sql_files(path))
+
+        return self.iter_parse_files([path] if os.path.isfile(path) else [])
+
+    def iter_parse_files(self, paths: Iterable[str]) -> Iterator[Procedure]:
+
+        """
+        Parses SQL files and yields valid procedures/files as soon as each
+        file is parsed.
+
+        :param paths: iterable of .sql file paths
+        :return: iterator of Procedure objects
+        """
 
-        self.remove_invalid_objects()
+        for p in self.iter_files(paths):
+            p = self.remove_invalid_objects(p)
+            if p is not None:
+                yield Procedure.from_dict(p)
+
+        # The parser is only loaded if some file was not found in the results cache
+        if self.dfa_cache and MySqlParser is not None:
+            save_dfa_cache(self.dfa_cache)
+
+        if self.result_cache:
+            self.result_cache.prune()
+
+        logger.info(f"\nRemoved {len(self.empty_procedures)} empty procedures from results: {self.empty_procedures}")
+        logger.info(f"\nRemoved {len(self.invalid_statements)} invalid statements from results")
+
+    def reset_warnings(self) -> None:
+
+        """Forgets errored files, empty procedures and invalid statements of previous runs"""
+
+        self.errored_files = []
+        self.empty_procedures = []
+        self.invalid_statements = []
 
     def execution_warnings(self) -> None:
 
@@ -58,71 +312,241 @@ class Worker:
                            f"found invalid and were deleted from results: "
                            f"{self.invalid_statements}{Style.RESET_ALL}")
 
-    def remove_invalid_objects(self):
+    def remove_invalid_objects(self, p: Dict) -> Optional[Dict]:
 
         """
-        Remove empty procedures and invalid statements from results and log
-        filtering stats.
+        Removes invalid statements from a procedure/file dictionary, and keeps
+        track of invalid statements and empty procedures for filtering stats.
+
+        :param p: procedure/file dictionary
+        :return: the procedure/file dictionary, None if it has no statements
         """
 
-        self.empty_procedures = [p['name'] for p in self.results if not p['statements']]
-        self.results = [p for p in self.results if p['statements']]
-        logger.info(f"\nRemoved {len(self.empty_procedures)} empty procedures from results: {self.empty_procedures}")
+        if not p['statements']:
+            self.empty_procedures.append(p['name'])
+            return None
 
-        for p in self.results:
-            self.invalid_statements.extend([x for x in p['statements'] if any(x[k] is None for k in x.keys())])
-            p['statements'] = [x for x in p['statements'] if not any(x[k] is None for k in x.keys())]
+        self.invalid_statements.extend([x for x in p['statements'] if any(x[k] is None for k in x.keys())])
+        p['statements'] = [x for x in p['statements'] if not any(x[k] is None for k in x.keys())]
 
-        logger.info(f"\nRemoved {len(self.invalid_statements)} invalid statements from results")
+        return p
 
     def parse_dir(self, dir_path: str) -> None:
 
         """
-        Walks through a given directory, parses SQL procedures in all SQL
-        files found, appends Procedure objects to self.results.
+        Parses SQL procedures in all SQL files found in a directory, and
+        stores the procedures/files in self.results.
 
         :param dir_path: path to the target directory
         """
 
-        # Create multiprocessing pool
-        pool = mp.Pool()
-        sql_files = []
-        # Walk through directory
-        for root, dirs, files in os.walk(dir_path, topdown=False):
-            # Loop on .sql files
-            for name in files:
-                if name.endswith('.sql'):
-                    sql_files.append(f'{root}/{name}'.replace('//', '/'))
-        results = pool.map(self.parse_file, sql_files)
-        self.results = [p for file in results for p in file]
+        self.results = [Procedure.from_dict(p) for p in self.iter_dir(dir_path)]
+
+    def iter_dir(self, dir_path: str) -> Iterator[Dict]:
+
+        """
+        Walks through a given directory and yields procedure/file dictionaries
+        of all SQL files found, in completion order.
+
+        :param dir_path: path to the target directory
+        :return: iterator of procedure/file dictionaries
+        """
+
+        return self.iter_files(iter_sql_files(dir_path))
+
+    def iter_files(self, sql_files: Iterable[str]) -> Iterator[Dict]:
+
+        """
+        Parses SQL files and yields their procedure/file dictionaries, in
+        completion order. Files are walked lazily: results found in the
+        results cache are yielded as soon as each file is looked up, other
+        files are dispatched to the pool in chunks of self.chunksize files as
+        they are walked, or parsed in the current process if self.jobs is 1
+        or if there is a single file to parse. Large files are kept aside and
+        parsed last, their statements being spread over the whole pool.
+
+        :param sql_files: iterable of .sql file paths
+        :return: iterator of procedure/file dictionaries
+        """
+
+        keys = {}
+        loaded = False
+        # First file to parse, held until a second one is found to start the pool
+        pending = None
+        parsed = None
+        misses = queue.Queue()
+        large_files = []
+
+        def feed() -> Iterator[List[str]]:
+
+            # Consumed by the pool task handler thread, until the None sentinel. Files are
+            # chunked here rather than by the pool, so that results of each chunk can be polled.
+            # Files are filtered lazily, large_files is complete once parsed is exhausted
+            chunk = []
+            for path in iter(misses.get, None):
+                if self.is_large(path):
+                    large_files.append(path)
+                    continue
+                chunk.append(path)
+                if len(chunk) == self.chunksize:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+
+        try:
+            for path in sql_files:
+                cached = self.cached_results(path, keys)
+                if cached is not None:
+                    yield from cached
+                    continue
+
+                # Load parser and warmed DFA before any parsing, so that pool processes inherit them
+                if not loaded:
+                    self.prepare_parser()
+                    loaded = True
+
+                if self.jobs == 1:
+                    yield from self.store_results([self.parse_file_task(path)], keys)
+                elif parsed is None and pending is None:
+                    pending = path
+                else:
+                    if parsed is None:
+                        parsed = self.get_pool().imap_unordered(parse_files_task, feed())
+                        misses.put(pending)
+                    misses.put(path)
+
+                # Files parsed by the pool so far are yielded while walking goes on
+                if parsed is not None:
+                    yield from self.store_results(chain.from_iterable(iter_ready(parsed)), keys)
+
+            misses.put(None)
+
+            if parsed is None:
+                parsed = [self.parse_file_task(pending)] if pending is not None else []
+            else:
+                parsed = chain(chain.from_iterable(parsed), (self.parse_file_task(p) for p in large_files))
+
+            yield from self.store_results(parsed, keys)
+
+        except BaseException:
+            # The pool task handler thread may be waiting for files to parse
+            misses.put(None)
+            self.terminate()
+            raise
+
+    def prepare_parser(self) -> None:
+
+        """Loads the parser, and the warmed DFA if enabled"""
+
+        load_parser()
+        if self.dfa_cache:
+            load_dfa_cache(self.dfa_cache)
+
+    def cached_results(self, path: str, keys: Dict[str, str]) -> Optional[List[Dict]]:
+
+        """
+        Looks a file up in the results cache, if enabled.
+
+        :param path: file path
+        :param keys: dictionary {file path: cache key}, where the key of the
+        file is recorded to store its results once parsed
+        :return: list of procedure/file dictionaries, None if not cached
+        """
+
+        if not self.result_cache:
+            return None
+
+        keys[path] = self.result_cache.key(path)
+        cached = self.result_cache.get(keys[path])
+        if cached is not None:
+            logger.warning(f'\n{Fore.GREEN}Loaded {path} from cache{Style.RESET_ALL}')
+
+        return cached
+
+    def store_results(self, parsed: Iterable[Tuple[str, List[Dict], bool]],
+                      keys: Dict[str, str]) -> Iterator[Dict]:
+
+        """
+        Records errored files and stores results of other files in the results
+        cache, if enabled.
+
+        :param parsed: iterable of parse_file_task results
+        :param keys: dictionary {file path: cache key}
+        :return: iterator of procedure/file dictionaries
+        """
+
+        for path, file_results, errored in parsed:
+            if errored:
+                self.errored_files.append(path)
+            elif self.result_cache:
+                self.result_cache.put(keys[path], file_results)
+            yield from file_results
+
+    def parse_file_task(self, path: str) -> Tuple[str, List[Dict], bool]:
+
+        """
+        Parses a SQL file and reports whether an error occurred, as errors
+        caught in pool processes are not visible in the parent Worker.
+
+        :param path: file path
+        :return: tuple (file path, list of procedure/file dictionaries, error flag)
+        """
+
+        errors = len(self.errored_files)
+        results = self.parse_file(path)
+        errored = len(self.errored_files) > errors
+
+        # Errors are recorded by the caller, in the parent process
+        del self.errored_files[errors:]
+
+        return path, results, errored
+
+    def is_large(self, path: str) -> bool:
+
+        """
+        Tells whether a file is large enough to have its statements parsed in
+        parallel by the pool rather than as a single pool task.
+
+        :param path: file path
+        :return: True if the file size reaches split_file_mb
+        """
+
+        return os.path.getsize(path) >= self.split_size
 
     def parse_file(self, path: str) -> List[Dict]:
 
         """
-        Finds and parses all procedures in SQL file.
+        Finds and parses all procedures in SQL file. Large files are split in
+        batches of self.statement_batch statements parsed by the pool, unless
+        self.jobs is 1.
 
         :param path: file path
         """
 
         results = []
 
-        with open(path, 'r') as file:
+        # Keep line endings as is so that offsets match the file bytes
+        with open(path, 'r', newline='') as file:
 
             logger.warning(f'\n{Fore.LIGHTYELLOW_EX}Parsing {path} ...{Style.RESET_ALL}')
 
             try:
 
-                # Grammar is case-sensitive. Input has to be converted
-                # to upper case before parsing
-                file_input = fmt(file.read().upper().replace('`', ''), strip_comments=True).strip()
+                raw = file.read()
+                file_input = preprocess(raw, self.preprocessor)
+                source = SourceMap(raw, file_input, file.encoding)
 
                 # Parsing modes switch
                 if self.pmode == 'procedure':
-                    procedures = re.findall(self.proc_regex, file_input)
-                    for proc in procedures:
-                        results.append(self.parse_str(path, proc))
-                elif self.pmode == 'ddl':
-                    results.append(self.parse_str(path, file_input))
+                    parts = ((proc.group(), proc.start()) for proc in re.finditer(self.proc_regex, file_input))
+                else:
+                    parts = [(file_input, 0)]
+
+                if self.jobs != 1 and self.is_large(path):
+                    results = self.parse_parts(path, parts, source)
+                else:
+                    results = [self.parse_str(path, p, source, offset) for p, offset in parts]
 
                 logger.warning(f'\n{Fore.GREEN}Successfully parsed {path}{Style.RESET_ALL}')
 
@@ -132,16 +556,65 @@ class Worker:
 
         return results
 
-    def parse_str(self, path: str, p: str) -> Dict:
+    def parse_str(self, path: str, p: str, source: Optional[SourceMap] = None,
+                  offset: int = 0) -> Dict:
 
         """
-        Gets all configured DDL statements inside a procedure/file,
-        parses them, stores results in dictionary objects, and appends
-        these objects to self.results.
+        Gets all configured DDL statements inside a procedure/file in a
+        single pass, parses them, stores results in dictionary objects in
+        source order, and appends these objects to self.results.
+        If a SourceMap is given, each statement also gets its start/end byte
+        offsets and line numbers in the original file.
 
         :param path: file/procedure path
         :param p: file/procedure body string
-        :param pmode: parsing mode, can be "procedure" or "ddl"
+        :param source: SourceMap of the preprocessed file containing p
+        :param offset: position of p in the preprocessed file
+        """
+
+        proc, statements = self.split_str(path, p)
+        parsed = (self.parse_statement(ddl_type, s, self.mapper) for ddl_type, s, start in statements)
+
+        return self.add_statements(proc, statements, parsed, source, offset)
+
+    def parse_parts(self, path: str, parts: Iterator[Tuple[str, int]],
+                    source: Optional[SourceMap] = None) -> List[Dict]:
+
+        """
+        Parses procedures/files of a large file with the pool: statements of
+        all parts are sent to pool processes in ordered batches of
+        self.statement_batch statements, then reassembled into their
+        procedure/file dictionaries in source order.
+
+        :param path: file path
+        :param parts: iterator of tuples (procedure/file body string, position in the preprocessed file)
+        :param source: SourceMap of the preprocessed file
+        :return: list of procedure/file dictionaries
+        """
+
+        split = [self.split_str(path, p) + (offset,) for p, offset in parts]
+        statements = [(ddl_type, s) for proc, proc_statements, offset in split
+                      for ddl_type, s, start in proc_statements]
+        batches = [statements[i:i + self.statement_batch]
+                   for i in range(0, len(statements), self.statement_batch)]
+
+        logger.info(f'\nDispatching {len(statements)} statements of {path} in {len(batches)} batches')
+
+        # Ordered results, consumed part after part by add_statements
+        parsed = chain.from_iterable(self.get_pool().imap(parse_statements_task, batches))
+
+        return [self.add_statements(proc, proc_statements, parsed, source, offset)
+                for proc, proc_statements, offset in split]
+
+    def split_str(self, path: str, p: str) -> Tuple[Dict, List[Tuple[str, str, int]]]:
+
+        """
+        Creates the dictionary of a procedure/file and finds its configured
+        DDL statements.
+
+        :param path: file/procedure path
+        :param p: file/procedure body string
+        :return: tuple (procedure/file dictionary, list of tuples (DDL type, statement string, position in p))
         """
 
         if self.pmode == 'procedure':
@@ -154,16 +627,36 @@ class Worker:
                 'path': path,
                 'statements': []}
 
-        mapper = Mapper(self.delimiter, self.pmode)
+        statements = list(split_statements(p, self.mapper.boundary_regex))
+
+        counts = Counter(ddl_type for ddl_type, s, start in statements)
+        for ddl_type in self.mapper.extract_regexes.keys():
+            logger.info(f"\n{counts[ddl_type]} {ddl_type} statements found in {name}")
+
+        return proc, statements
+
+    def add_statements(self, proc: Dict, statements: List[Tuple[str, str, int]],
+                       parsed: Iterator[Optional[Dict]], source: Optional[SourceMap] = None,
+                       offset: int = 0) -> Dict:
+
+        """
+        Appends parsed statements to their procedure/file dictionary, with
+        their location in the original file if a SourceMap is given.
+
+        :param proc: procedure/file dictionary
+        :param statements: list of tuples (DDL type, statement string, position in the procedure/file)
+        :param parsed: iterator of statement dictionaries, consumed for each statement only
+        :param source: SourceMap of the preprocessed file containing the procedure/file
+        :param offset: position of the procedure/file in the preprocessed file
+        :return: the procedure/file dictionary
+        """
 
-        for ddl_type in mapper.extract_regexes.keys():
-            statements = re.findall(mapper.extract_regexes[ddl_type], p)
-            logger.info(f"\n{len(statements)} {ddl_type} statements found in {name}")
-            for s in statements:
-                q = self.parse_statement(ddl_type, s, mapper)
-                if q:
-                    q['procedure'] = name
-                    proc['statements'].append(q)
+        for (ddl_type, s, start), q in zip(statements, parsed):
+            if q:
+                q['procedure'] = proc['name']
+                if source is not None:
+                    q.update(source.span(offset + start, offset + start + len(s)))
+                proc['statements'].append(q)
 
         return proc
 
@@ -176,7 +669,7 @@ class Worker:
         :return: tuple (schema_string, name_string)
         """
 
-        name = re.search(proc_name_regex, p).group(1).lower()
+        name = re.search(proc_name_regex, p).group(1)
         schema, name = self.parse_object_name(name)
         return schema, name
 
@@ -202,8 +695,10 @@ class Worker:
     def parse_statement(self, ddl_type: str, s: str, mapper: Mapper) -> Dict:
 
         """
-        Cleans DDL statement, creates parsing objects, and returns a
-        Query object.
+        Feeds DDL statement to the process parser session, and returns a
+        Query object. Parser methods are only mapped again when the mapper
+        is not yet bound to the session parser. If self.sll is set, SLL
+        prediction is tried first and LL only used for failing statements.
 
         :param ddl_type: type of DDL statement being parsed
         :param s: DDL statement string
@@ -211,20 +706,20 @@ class Worker:
         :return: Query object containing the statement information
         """
 
-        input_stream = InputStream(s)
-        lexer = MySqlLexer(input_stream)
-        token_stream = CommonTokenStream(lexer)
-        parser = MySqlParser(token_stream)
-        mapper.parser = parser
-        mapper.map_methods(self)
-        tree = mapper.mapper[ddl_type]['parsermethod']()
+        load_parser()
+        session = get_session()
+        if mapper.parser is not session.parser:
+            mapper.parser = session.parser
+            mapper.map_methods(self)
+
+        tree = session.parse(s, mapper.mapper[ddl_type]['parsermethod'], self.sll)
         statement = mapper.mapper[ddl_type]['extractor'](tree, ddl_type)
 
         logger.info(f"\nExtracted: {statement}")
 
         return statement
 
-    def get_updated_columns(self, tree: ParserRuleContext) -> List[str]:
+    def get_updated_columns(self, tree: 'ParserRuleContext') -> List[str]:
 
         """
         Loops recursively over AST children and gathers all the updated
@@ -238,13 +733,13 @@ class Worker:
         for c in tree.getChildren():
 
             if isinstance(c, MySqlParser.UpdatedElementContext):
-                cols.append(c.getText().lower())
+                cols.append(c.getText())
             elif not isinstance(c, TerminalNode):
                 cols.extend(self.get_updated_columns(c))
 
         return cols
 
-    def get_inserted_columns(self, tree: ParserRuleContext) -> List[str]:
+    def get_inserted_columns(self, tree: 'ParserRuleContext') -> List[str]:
 
         """
         Loops recursively over AST children and gathers all the inserted
@@ -256,13 +751,13 @@ class Worker:
 
         for child in tree.getChildren():
             if isinstance(child, MySqlParser.UidListContext):
-                target_columns = child.getText().lower().split(',')
+                target_columns = child.getText().split(',')
                 return target_columns
 
         target_columns = []
         return target_columns
 
-    def parse_create_table(self, tree: ParserRuleContext, ddl_type: str) \
+    def parse_create_table(self, tree: 'ParserRuleContext', ddl_type: str) \
             -> Dict:
 
         """
@@ -291,19 +786,19 @@ class Worker:
                 query = tree.selectStatement().querySpecification()
             except AttributeError as e:
                 query = tree.selectStatement().queryExpression().querySpecification()
-            q['target_columns'] = query.selectElements().getText().lower().split(',')
+            q['target_columns'] = query.selectElements().getText().split(',')
 
         # Parse create table like statements
         elif isinstance(tree, MySqlParser.CopyCreateTableContext):
             q['operation'] = f'{ddl_type} LIKE'
-            target = self.parse_object_name(tree.tableName(0).getText().lower())
+            target = self.parse_object_name(tree.tableName(0).getText())
             q['target_table'] = {'schema': target[0], 'name': target[1]}
-            source = self.parse_object_name(tree.tableName(1).getText().lower())
+            source = self.parse_object_name(tree.tableName(1).getText())
             q['from_table'] = [{'schema': source[0], 'name': source[1]}]
 
         return q
 
-    def get_create_table_columns(self, tree: ParserRuleContext) -> List[str]:
+    def get_create_table_columns(self, tree: 'ParserRuleContext') -> List[str]:
 
         """
         Get columns definition in CREATE TABLE "columns" statement.
@@ -316,13 +811,13 @@ class Worker:
         for c in tree.getChildren():
 
             if isinstance(c, MySqlParser.ColumnDeclarationContext):
-                columns.append(c.uid().getText().lower())
+                columns.append(c.uid().getText())
             elif not (isinstance(c, TerminalNode) or isinstance(c, ErrorNode)):
                 columns.extend(self.get_create_table_columns(c))
 
         return columns
 
-    def parse_truncate(self, tree: ParserRuleContext, ddl_type: str) -> Dict:
+    def parse_truncate(self, tree: 'ParserRuleContext', ddl_type: str) -> Dict:
 
         """
         Parse target table from TRUNCATE statement.
@@ -337,7 +832,7 @@ class Worker:
              'target_table': self.get_target_table(tree)}
         return q
 
-    def parse_drop_table(self, tree: ParserRuleContext, ddl_type: str) -> Dict:
+    def parse_drop_table(self, tree: 'ParserRuleContext', ddl_type: str) -> Dict:
 
         """
         Parse target table from DROP TABLE statement.
@@ -349,11 +844,11 @@ class Worker:
         """
 
         q = {'operation': ddl_type}
-        target = self.parse_object_name(tree.tables().getText().lower())
+        target = self.parse_object_name(tree.tables().getText())
         q['target_table'] = {'name': target[1], 'schema': target[0]}
         return q
 
-    def parse_update(self, tree: ParserRuleContext, ddl_type: str) \
+    def parse_update(self, tree: 'ParserRuleContext', ddl_type: str) \
             -> Optional[Dict]:
 
         """
@@ -373,7 +868,7 @@ class Worker:
 
         return q
 
-    def get_inserted_tables(self, tree: ParserRuleContext) \
+    def get_inserted_tables(self, tree: 'ParserRuleContext') \
             -> Tuple[Optional[List[Dict]], Optional[List[Dict]]]:
 
         """
@@ -391,7 +886,7 @@ class Worker:
 
         return None, None
 
-    def parse_insert(self, tree: ParserRuleContext, ddl_type: str) -> Dict:
+    def parse_insert(self, tree: 'ParserRuleContext', ddl_type: str) -> Dict:
 
         """
         Parses target table, source table(s) and target columns from
@@ -411,7 +906,7 @@ class Worker:
 
         return q
 
-    def get_delete_table(self, tree: ParserRuleContext) \
+    def get_delete_table(self, tree: 'ParserRuleContext') \
             -> Optional[List[Dict]]:
 
         """
@@ -425,7 +920,7 @@ class Worker:
             if isinstance(child, MySqlParser.DeleteStatementValueContext):
                 return self.get_source_tables_insert(child, 'from')
 
-    def parse_delete(self, tree: ParserRuleContext, ddl_type: str) -> Dict:
+    def parse_delete(self, tree: 'ParserRuleContext', ddl_type: str) -> Dict:
 
         """
         Parses target table name from a DELETE statement.
@@ -440,7 +935,7 @@ class Worker:
 
         return q
 
-    def get_source_tables_update(self, tree: ParserRuleContext) \
+    def get_source_tables_update(self, tree: 'ParserRuleContext') \
             -> List[Dict]:
 
         """
@@ -461,7 +956,7 @@ class Worker:
 
         return tables
 
-    def get_source_tables_insert(self, tree: ParserRuleContext, clause: str) \
+    def get_source_tables_insert(self, tree: 'ParserRuleContext', clause: str) \
             -> List[Dict]:
 
         """
@@ -493,7 +988,7 @@ class Worker:
                 tables.extend(self.get_source_tables_insert(c, clause))
         return tables
 
-    def get_target_table(self, tree: ParserRuleContext) -> Dict:
+    def get_target_table(self, tree: 'ParserRuleContext') -> Dict:
 
         """
         Walks recursively to the first table name found in a statement AST
@@ -506,13 +1001,13 @@ class Worker:
         for c in tree.getChildren():
 
             if isinstance(c, MySqlParser.TableNameContext):
-                schema, name = self.parse_object_name(c.getText().lower())
+                schema, name = self.parse_object_name(c.getText())
                 t = {'schema': schema, 'name': name}
                 return t
             elif not (isinstance(c, TerminalNode) or isinstance(c, ErrorNode)):
                 return self.get_target_table(c)
 
-    def get_tables_names(self, tree: ParserRuleContext) -> List[Dict]:
+    def get_tables_names(self, tree: 'ParserRuleContext') -> List[Dict]:
 
         """
         Gets all table names inside a tree, appends them to a list of
@@ -525,7 +1020,7 @@ class Worker:
         tables = []
         for c in tree.getChildren():
             if isinstance(c, MySqlParser.TableNameContext):
-                schema, name = self.parse_object_name(c.getText().lower())
+                schema, name = self.parse_object_name(c.getText())
                 t = {'schema': schema, 'name': name}
                 tables.append(t)
             elif isinstance(c, MySqlParser.QueryExpressionContext):
@@ -535,26 +1030,27 @@ class Worker:
                 tables.extend(self.get_tables_names(c))
         return tables
 
-    def procedures_filter(self, procedures: List[Dict]) -> None:
+    def procedures_filter(self, procedures: List[Table]) -> None:
 
         """
         Filters results to keep only procedures names given in list argument.
         Has precedence on tables_filter function at runtime.
 
-        :param procedures: list of procedure names
+        :param procedures: list of procedure names, as Table objects
         """
 
-        logger.info(f"\nResults before procedure filtering "
-                    f"on {procedures}:\n{self.results}")
+        # Results are only formatted if logged, as they can be large
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"\nResults before procedure filtering "
+                        f"on {procedures}:\n{self.results}")
 
-        self.results = [x for x in self.results if any(p['schema'] == x['schema']
-                                                       and p['name'] == x['name']
-                                                       for p in procedures)]
+        self.results = self.lineage().select_procedures(procedures)
 
-        logger.info(f"\nResults after procedure filtering "
-                    f"on {procedures}:\n{self.results}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"\nResults after procedure filtering "
+                        f"on {procedures}:\n{self.results}")
 
-    def tables_filter(self, tables: List[Dict]) -> None:
+    def tables_filter(self, tables: List[Table]) -> None:
 
         """
         Filters statements based on list of tables and filtering mode set for
@@ -564,124 +1060,56 @@ class Worker:
         :param tables: list of tables to filter on
         """
 
-        logger.info(f"Results before {self.fmode} tables filtering "
-                    f"on {tables}:\n{self.results}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"Results before {self.fmode} tables filtering "
+                        f"on {tables}:\n{self.results}")
 
         if self.fmode == 'simple':
             self.simple_filter(tables)
         elif self.fmode == 'rec':
             self.recursive_filter(tables)
 
-        logger.info(f"Results after {self.fmode} tables filtering "
-                    f"on {tables}:\n{self.results}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"Results after {self.fmode} tables filtering "
+                        f"on {tables}:\n{self.results}")
 
-    def simple_filter(self, tables: List[Dict]) -> None:
+    def lineage(self) -> LineageGraph:
 
         """
-        Filters statements based on a list of tables: only statements containing
-        direct parents/children of the selected tables will be kept in results.
+        Returns the lineage graph of the current results, indexing statements
+        by table and procedures by name. It is built on first use and only
+        built again once filtering has replaced the results.
 
-        :param tables: list of table dictionaries with keys "schema" and "name"
+        :return: LineageGraph of self.results
         """
 
-        for p in self.results:
-            p['statements'] = [s for s in p['statements']
-                               if any(t in s['from_table'] for t in tables if s.get('from_table'))
-                               or any(t in s['join_table'] for t in tables if s.get('join_table'))
-                               or any(t == s['target_table'] for t in tables)]
+        if self.graph is None or self.graph.results is not self.results:
+            self.graph = LineageGraph(self.results)
 
-    def recursive_filter_parents(self, tables: List[Dict], parents_done: List[Dict]=None) -> List[Dict]:
+        return self.graph
 
-        """
-        Recursively filters statements containing all parent tables relating to the list
-        of specified tables.
+    def simple_filter(self, tables: List[Table]) -> None:
 
-        :param tables: list of tables which parents have to be filtered
-        :param parents_done: list of parent tables already fetched, to avoid infinite recursion
-        :return: filtered list of procedure/file dictionaries
         """
+        Filters statements based on a list of tables: only statements containing
+        direct parents/children of the selected tables will be kept in results.
 
-        filtered_results = []
-        results = deepcopy(self.results)
-
-        # For all procedures/files in results
-        for p in results:
-
-            # Filter only statements which contain one of the filtered tables as target
-            p['statements'] = [s for s in p['statements']
-                               if any(t == s['target_table'] for t in tables)]
-
-            # Add this filtered procedure/file to results
-            filtered_results.append(p)
-
-            # Get parent (source) tables in these statements
-            parents = [s['from_table'] for s in p['statements'] if s.get('from_table')]
-            parents.extend([s['join_table'] for s in p['statements'] if s.get('join_table')])
-            parents = flatten(parents)
-
-            if parents_done:
-                parents = [x for x in parents if x not in parents_done]
-            else:
-                parents_done = []
-
-            parents_done.extend(parents)
-
-            # Repeat the operation for the parent tables if any
-            if parents:
-                filtered_results.extend(self.recursive_filter_parents(parents, parents_done))
-
-        return filtered_results
-
-    def recursive_filter_children(self, tables: List[Dict], children_done: List[Dict]=None) -> List[Dict]:
-
-        """
-        Recursively filters statements containing all child tables relating to the list
-        of specified tables.
-
-        :param tables: list of tables which parents have to be filtered
-        :param children_done: list of child tables already fetched, to avoid infinite recursion
-        :return: filtered list of procedure/file dictionaries
+        :param tables: list of Table objects
         """
 
-        filtered_results = []
-        results = deepcopy(self.results)
-
-        # For all procedures/files in results
-        for p in results:
-
-            # Filter only statements which contain one of the filtered tables as source
-            p['statements'] = [s for s in p['statements']
-                               if any(t in s['from_table'] for t in tables if s.get('from_table'))
-                               or any(t in s['join_table'] for t in tables if s.get('join_table'))]
-
-            # Add this filtered procedure/file to results
-            filtered_results.append(p)
-
-            # Get children (target) tables in these statements
-            children = [s['target_table'] for s in p['statements']]
-
-            if children_done:
-                children = [x for x in children if x not in children_done]
-            else:
-                children_done = []
-
-            children_done.extend(children)
-
-            # Repeat the operation for the parent tables if any
-            if children:
-                filtered_results.extend(self.recursive_filter_children(children, children_done))
-
-        return filtered_results
+        self.results = self.lineage().direct(tables)
 
-    def recursive_filter(self, tables: List[Dict]) -> None:
+    def recursive_filter(self, tables: List[Table]) -> None:
 
         """
         Recursively filters parent and children tables relating to a
-        list of specified tables.
+        list of specified tables, using a lineage graph built once from the
+        results: statements writing to the tables or their direct and indirect
+        parents, and statements reading from the tables or their direct and
+        indirect children are kept.
 
-        :param tables: list of table dictionaries to filter on
+        :param tables: list of Table objects to filter on
         """
 
-        results = self.recursive_filter_parents(tables)
-        results += self.recursive_filter_children(tables)
-        self.results = merge_results(results)
+        graph = self.lineage()
+        self.results = merge_results(graph.upstream(tables) + graph.downstream(tables))
@@ -0,0 +1,273 @@
+import os
+import sys
+import ujson
+import signal
+import socketserver
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from colorama import Fore, Style
+from parse.worker import Worker
+from parse.session import get_session
+from parse.dfa_cache import load_dfa_cache
+from parse.models import Procedure
+from utils.processing import str_to_tables, merge_results
+from utils.validation import validate_input_path, validate_sql_object_names, validate_filter_mode
+from utils.logging import logger
+from typing import List, Dict, Optional
+
+
+class LineageDaemon:
+
+    """Keeps a warm Worker and the parsed results of each requested path in
+    memory, and answers parse, filter and lineage queries on them"""
+
+    def __init__(self, worker: Worker) -> None:
+
+        self.worker = worker
+        self.loaded = {}
+        self.routes = {
+            '/parse': self.parse,
+            '/filter': self.filter,
+            '/lineage': self.lineage,
+            '/status': self.status,
+        }
+
+        # Warm up before the first query: DFA cache and parser session
+        if worker.dfa_cache:
+            load_dfa_cache(worker.dfa_cache)
+        get_session()
+
+    def load(self, path: str, refresh: bool = False) -> List[Procedure]:
+
+        """
+        Gets the results of a file/directory, parsing it unless already loaded.
+        Unchanged files are read from the results cache when parsed again.
+
+        :param path: path to the file/directory
+        :param refresh: parses the path again even if already loaded
+        :return: list of Procedure objects
+        """
+
+        if refresh or path not in self.loaded:
+            validate_input_path(path)
+            self.worker.reset_warnings()
+            self.loaded[path] = list(self.worker.iter_parse(path))
+
+        return self.loaded[path]
+
+    def handle(self, route: str, query: Dict) -> Dict:
+
+        """
+        Answers a query.
+
+        :param route: query route, one of self.routes keys
+        :param query: query parameters
+        :return: JSON serializable response
+        """
+
+        if route not in self.routes:
+            raise KeyError(f'Unknown route {route}, must be one of {list(self.routes)}')
+
+        return self.routes[route](query)
+
+    def parse(self, query: Dict) -> Dict:
+
+        """
+        Parses a file/directory again and returns its results.
+
+        :param query: dictionary with key path
+        :return: dictionary with keys results and errored_files
+        """
+
+        results = self.load(query['path'], refresh=True)
+
+        return {'results': [p.to_dict() for p in results],
+                'errored_files': self.worker.errored_files}
+
+    def filter(self, query: Dict) -> Dict:
+
+        """
+        Filters the results of a file/directory as the parse command does.
+
+        :param query: dictionary with keys path, procedures and/or tables,
+        optional fmode (defaults to the Worker filter mode) and refresh
+        :return: dictionary with key results
+        """
+
+        procedures, tables = query.get('procedures'), query.get('tables')
+        validate_sql_object_names(procedures)
+        validate_sql_object_names(tables)
+        validate_filter_mode(query.get('fmode'))
+
+        self.worker.results = self.load(query['path'], query.get('refresh', False))
+
+        if procedures:
+            self.worker.procedures_filter(str_to_tables(procedures))
+
+        if tables:
+            tables = str_to_tables(tables)
+            if query.get('fmode', self.worker.fmode) == 'rec':
+                self.worker.recursive_filter(tables)
+            else:
+                self.worker.simple_filter(tables)
+
+        return {'results': [p.to_dict() for p in self.worker.results]}
+
+    def lineage(self, query: Dict) -> Dict:
+
+        """
+        Gets the tables and statements upstream and/or downstream of a list
+        of tables.
+
+        :param query: dictionary with keys path and tables, optional direction
+        (up, down or both, the default) and refresh
+        :return: dictionary with keys upstream and downstream table names, and
+        results holding the statements linking them
+        """
+
+        direction = query.get('direction', 'both')
+        if direction not in ('up', 'down', 'both'):
+            raise ValueError('Lineage direction must be one of the following values: (up, down, both)')
+
+        validate_sql_object_names(query.get('tables'))
+        tables = str_to_tables(query.get('tables') or [])
+
+        self.worker.results = self.load(query['path'], query.get('refresh', False))
+        graph = self.worker.lineage()
+
+        response = {'upstream': [], 'downstream': []}
+        results = []
+
+        if direction in ('up', 'both'):
+            response['upstream'] = [f'{t.schema}.{t.name}' for t in graph.ancestors(tables)]
+            results += graph.upstream(tables)
+        if direction in ('down', 'both'):
+            response['downstream'] = [f'{t.schema}.{t.name}' for t in graph.descendants(tables)]
+            results += graph.downstream(tables)
+
+        response['results'] = [p.to_dict() for p in merge_results(results)]
+        return response
+
+    def status(self, query: Dict) -> Dict:
+
+        """
+        Describes the daemon state.
+
+        :param query: unused
+        :return: dictionary with loaded paths and their number of statements
+        """
+
+        return {'loaded': {path: sum(len(p.statements) for p in results)
+                           for path, results in self.loaded.items()},
+                'cache': self.worker.result_cache.stats() if self.worker.result_cache else None}
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+
+    """Answers JSON queries: POST requests carry query parameters as a JSON
+    object in their body, GET requests take no parameters"""
+
+    def do_GET(self) -> None:
+
+        self.respond({})
+
+    def do_POST(self) -> None:
+
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            query = ujson.loads(self.rfile.read(length) or '{}')
+        except ValueError as e:
+            return self.send_json(400, {'error': f'Invalid JSON body: {e}'})
+
+        self.respond(query)
+
+    def respond(self, query: Dict) -> None:
+
+        if self.path not in self.server.daemon.routes:
+            return self.send_json(404, {'error': f'Unknown route {self.path}'})
+
+        try:
+            self.send_json(200, self.server.daemon.handle(self.path, query))
+        except KeyError as e:
+            self.send_json(400, {'error': f'Missing parameter: {e}'})
+        except ValueError as e:
+            self.send_json(400, {'error': str(e)})
+        except Exception as e:
+            logger.error(f'\n{Fore.RED}Error while answering {self.path}: {e}{Style.RESET_ALL}')
+            self.send_json(500, {'error': str(e)})
+
+    def send_json(self, status: int, body: Dict) -> None:
+
+        data = ujson.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args) -> None:
+
+        logger.info(f'\n{self.command} {self.path} {format % args}')
+
+
+class UnixHTTPServer(socketserver.UnixStreamServer):
+
+    """HTTP server listening on a Unix socket"""
+
+    def server_bind(self) -> None:
+
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+        super().server_bind()
+
+
+def make_server(daemon: LineageDaemon, host: str = '127.0.0.1', port: int = 8765,
+                socket: Optional[str] = None) -> socketserver.BaseServer:
+
+    """
+    Builds the server answering daemon queries, on a Unix socket if set,
+    otherwise on host:port.
+
+    :param daemon: LineageDaemon object
+    :param host: HTTP host, should be a local address
+    :param port: HTTP port, 0 picks a free port
+    :param socket: Unix socket path
+    :return: server object
+    """
+
+    if socket:
+        server = UnixHTTPServer(socket, RequestHandler)
+    else:
+        server = HTTPServer((host, port), RequestHandler)
+
+    server.daemon = daemon
+    return server
+
+
+def serve(daemon: LineageDaemon, host: str = '127.0.0.1', port: int = 8765,
+          socket: Optional[str] = None) -> None:
+
+    """
+    Answers daemon queries until interrupted or terminated.
+
+    :param daemon: LineageDaemon object
+    :param host: HTTP host, should be a local address
+    :param port: HTTP port
+    :param socket: Unix socket path, replaces host and port if set
+    """
+
+    server = make_server(daemon, host, port, socket)
+
+    # Exit cleanly on SIGTERM, so that the Worker pool is shut down
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    address = socket or f'http://{host}:{server.server_address[1]}'
+    logger.warning(f'\n{Fore.GREEN}Serving on {address}{Style.RESET_ALL}')
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if socket and os.path.exists(socket):
+            os.remove(socket)
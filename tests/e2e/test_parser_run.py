@@ -26,11 +26,11 @@ def test_run_file(delimiter, mode, path, expected):
     :param expected: expected results
     """
 
-    p = Worker(TEST_DEFAULT_SCHEMA, delimiter, mode, None)
-    p.run(path)
+    with Worker(TEST_DEFAULT_SCHEMA, delimiter, mode, None) as p:
+        p.run(path)
     assert len(p.results) == len(expected)
     for r in p.results:
-        assert r in expected
+        assert r.to_dict() in expected
 
 
 @pytest.mark.parametrize(
@@ -49,10 +49,10 @@ def test_run_dir(delimiter, mode, path, expected):
     :param expected: expected results
     """
 
-    p = Worker(TEST_DEFAULT_SCHEMA, delimiter, mode, None)
-    p.run(path)
+    with Worker(TEST_DEFAULT_SCHEMA, delimiter, mode, None) as p:
+        p.run(path)
 
-    statements = [s for file in p.results for s in file['statements']]
+    statements = [s.to_dict() for file in p.results for s in file.statements]
     statements_expected = [s for file in expected for s in file['statements']]
 
     # Assert statements parsed are correct
@@ -0,0 +1,37 @@
+import os
+from parse import atn_cache, lexer, parser
+from parse.atn_cache import load_atn, atn_key
+
+
+def test_atn_key():
+
+    """
+    Ensure that the ATN cache keys of the generated modules match their
+    serialized ATNs, as written by the build step.
+    """
+
+    for module in (lexer, parser):
+        assert module.ATN_KEY == atn_key(module.serializedATN())
+
+
+def test_atn_cache(tmpdir, monkeypatch):
+
+    """
+    Ensure that the ATN cache is written on first load, and that the ATN
+    read from it is identical to the deserialized one.
+    """
+
+    monkeypatch.setattr(atn_cache, 'ATN_CACHE_DIR', str(tmpdir))
+
+    def states(atn):
+        return [(type(s), s.stateNumber, [(type(t), t.target.stateNumber, t.label and t.label.intervals) for t in s.transitions])
+                for s in atn.states]
+
+    for name, module in (('lexer', lexer), ('parser', parser)):
+        expected = load_atn(name, module.ATN_KEY, module.serializedATN)
+        assert os.path.exists(atn_cache.atn_cache_path(name, module.ATN_KEY))
+
+        cached = load_atn(name, module.ATN_KEY, module.serializedATN)
+        assert cached is not expected
+        assert states(cached) == states(expected)
+        assert [s.stateNumber for s in cached.decisionToState] == [s.stateNumber for s in expected.decisionToState]
@@ -0,0 +1,83 @@
+import ujson
+import socket
+import pytest
+import threading
+import http.client
+from parse.worker import Worker
+from server.daemon import LineageDaemon, make_server
+from tests.utils import TEST_DEFAULT_SCHEMA, PARSE_FILE_INSERT_EXPECTED, insert_path, test_dir_path
+
+
+@pytest.fixture
+def daemon():
+
+    with Worker(TEST_DEFAULT_SCHEMA, ';', 'ddl', 'simple', jobs=1) as worker:
+        yield LineageDaemon(worker)
+
+
+def test_daemon_queries(daemon):
+
+    """Ensure that the daemon answers parse, filter and lineage queries"""
+
+    assert daemon.handle('/parse', {'path': insert_path})['results'] == [PARSE_FILE_INSERT_EXPECTED]
+
+    lineage = daemon.handle('/lineage', {'path': insert_path, 'tables': ['default_schema.src_tab_2']})
+    assert lineage['upstream'] == []
+    assert lineage['downstream'] == ['default_schema.mytable']
+    assert lineage['results'] == [PARSE_FILE_INSERT_EXPECTED]
+
+    lineage = daemon.handle('/lineage', {'path': insert_path, 'tables': ['default_schema.mytable'],
+                                         'direction': 'up'})
+    assert lineage['upstream'] == ['default_schema.src_tab_1', 'default_schema.src_tab_2',
+                                   'default_schema.src_tab_3']
+    assert lineage['downstream'] == []
+
+    filtered = daemon.handle('/filter', {'path': test_dir_path, 'tables': ['default_schema.src_tab_1']})
+    statements = [s for p in filtered['results'] for s in p['statements']]
+    assert PARSE_FILE_INSERT_EXPECTED['statements'][0] in statements
+    assert all('src_tab_1' in [t['name'] for t in [s['target_table']] + s.get('from_table', []) + s.get('join_table', [])]
+               for s in statements)
+
+    assert daemon.handle('/status', {})['loaded'] == {insert_path: 1, test_dir_path: 18}
+
+    with pytest.raises(ValueError):
+        daemon.handle('/filter', {'path': insert_path, 'tables': ['no_schema']})
+    with pytest.raises(ValueError):
+        daemon.handle('/parse', {'path': './does/not/exist.sql'})
+    with pytest.raises(KeyError):
+        daemon.handle('/unknown', {})
+
+
+def test_daemon_unix_socket(daemon, tmpdir):
+
+    """Ensure that queries are answered over HTTP on a Unix socket"""
+
+    path = str(tmpdir.join('ezql.sock'))
+    server = make_server(daemon, socket=path)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+
+    class UnixConnection(http.client.HTTPConnection):
+
+        def connect(self):
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.connect(path)
+
+    def request(method, route, body=None):
+        conn = UnixConnection('localhost')
+        conn.request(method, route, ujson.dumps(body) if body is not None else None)
+        response = conn.getresponse()
+        status, data = response.status, ujson.loads(response.read())
+        conn.close()
+        return status, data
+
+    try:
+        assert request('POST', '/parse', {'path': insert_path}) == (200, {'results': [PARSE_FILE_INSERT_EXPECTED],
+                                                                          'errored_files': []})
+        assert request('GET', '/status')[1]['loaded'] == {insert_path: 1}
+        assert request('POST', '/filter', {'tables': ['a.b']})[0] == 400
+        assert request('GET', '/unknown')[0] == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
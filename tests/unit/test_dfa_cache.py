@@ -0,0 +1,27 @@
+from parse.worker import Worker
+from parse.dfa_cache import save_dfa_cache, load_dfa_cache, reset_dfa, dfa_size
+from tests.utils import *
+
+
+def test_dfa_cache(tmpdir):
+
+    """
+    Ensure that the warmed DFA is saved, loaded back into cold lexer/parser
+    DFAs, and that parsing results are unchanged with the loaded DFA.
+    """
+
+    p = Worker(TEST_DEFAULT_SCHEMA, ';', 'ddl', None)
+    expected = p.parse_file(insert_path)
+    size = dfa_size()
+
+    assert save_dfa_cache(str(tmpdir))
+    # Cache is not replaced by an equally warm DFA
+    assert not save_dfa_cache(str(tmpdir))
+
+    reset_dfa()
+    assert dfa_size() == 0
+    assert load_dfa_cache(str(tmpdir))
+    assert dfa_size() == size
+
+    assert p.parse_file(insert_path) == expected
+
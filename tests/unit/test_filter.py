@@ -1,7 +1,21 @@
 from parse.worker import Worker
+from parse.models import Table, Statement, Procedure
 from tests.utils import TEST_DEFAULT_SCHEMA, TEST_DELIMITER, TEST_MODE, \
     FILTER_TEST_INPUT, SIMPLE_FILTER_EXPECTED, RECURSIVE_FILTER_EXPECTED
-from copy import deepcopy
+from utils.lineage import LineageGraph
+from utils.processing import merge_results
+
+
+def table(name):
+    return Table('default_schema', name)
+
+
+def statement(target, sources):
+    return Statement('INSERT', table(target), from_table=tuple(table(x) for x in sources), procedure='proc')
+
+
+def procedures(results):
+    return [Procedure.from_dict(p) for p in results]
 
 
 def test_procedure_filter():
@@ -12,17 +26,11 @@ def test_procedure_filter():
     """
 
     p = Worker(TEST_DEFAULT_SCHEMA, TEST_DELIMITER, TEST_MODE, 'simple')
-    p.results = deepcopy(FILTER_TEST_INPUT)
-    p.procedures_filter([
-        {'schema': FILTER_TEST_INPUT[0]['schema'],
-         'name': FILTER_TEST_INPUT[0]['name']}
-    ])
-    assert p.results == FILTER_TEST_INPUT
-
-    p.procedures_filter([
-        {'schema': 'another_schema',
-         'name': 'another_name'}
-    ])
+    p.results = procedures(FILTER_TEST_INPUT)
+    p.procedures_filter([Table(FILTER_TEST_INPUT[0]['schema'], FILTER_TEST_INPUT[0]['name'])])
+    assert p.results == procedures(FILTER_TEST_INPUT)
+
+    p.procedures_filter([Table('another_schema', 'another_name')])
     assert p.results == []
 
 
@@ -34,9 +42,9 @@ def test_simple_filter():
     """
 
     p = Worker(TEST_DEFAULT_SCHEMA, TEST_DELIMITER, TEST_MODE, None)
-    p.results = deepcopy(FILTER_TEST_INPUT)
-    p.simple_filter([{'schema': 'default_schema', 'name': 'test_table_1'}])
-    assert p.results == SIMPLE_FILTER_EXPECTED
+    p.results = procedures(FILTER_TEST_INPUT)
+    p.simple_filter([Table('default_schema', 'test_table_1')])
+    assert p.results == procedures(SIMPLE_FILTER_EXPECTED)
 
 
 def test_recursive_filter():
@@ -47,6 +55,107 @@ def test_recursive_filter():
     """
 
     p = Worker(TEST_DEFAULT_SCHEMA, TEST_DELIMITER, TEST_MODE, None)
-    p.results = deepcopy(FILTER_TEST_INPUT)
-    p.recursive_filter([{'schema': 'default_schema', 'name': 'test_table_1'}])
-    assert p.results == RECURSIVE_FILTER_EXPECTED
+    p.results = procedures(FILTER_TEST_INPUT)
+    p.recursive_filter([Table('default_schema', 'test_table_1')])
+    assert p.results == procedures(RECURSIVE_FILTER_EXPECTED)
+
+
+def test_filter_case_insensitive():
+
+    """Ensure that tables and procedures are matched regardless of their casing"""
+
+    p = Worker(TEST_DEFAULT_SCHEMA, TEST_DELIMITER, TEST_MODE, None)
+    p.results = procedures(FILTER_TEST_INPUT)
+    p.simple_filter([Table('Default_Schema', 'TEST_TABLE_1')])
+    assert p.results == procedures(SIMPLE_FILTER_EXPECTED)
+
+    p.results = procedures(FILTER_TEST_INPUT)
+    p.procedures_filter([Table(FILTER_TEST_INPUT[0]['schema'].upper(), FILTER_TEST_INPUT[0]['name'].upper())])
+    assert p.results == procedures(FILTER_TEST_INPUT)
+
+
+def test_lineage_graph():
+
+    """
+    Ensure that the lineage graph gets all indirect parents/children of the selected
+    table(s), terminates on cycles, and keeps statements in source order.
+    """
+
+    results = [Procedure('default_schema', 'proc_1', 'path_1.sql',
+                         (statement('a', ['b']), statement('c', ['a']), statement('b', ['a']))),
+               Procedure('default_schema', 'proc_2', 'path_2.sql',
+                         (statement('d', ['c']), statement('e', ['f'])))]
+
+    graph = LineageGraph(results)
+
+    assert graph.upstream([table('C')]) == [results[0]]
+    assert graph.downstream([table('c')]) == [results[1]._replace(statements=results[1].statements[:1])]
+    assert graph.upstream([table('f')]) == []
+    assert graph.downstream([table('unknown')]) == []
+    assert graph.direct([table('f')]) == [results[0]._replace(statements=()),
+                                          results[1]._replace(statements=results[1].statements[1:])]
+
+
+def test_merge_results():
+
+    """
+    Ensure that fragments of the same procedure/file are merged in order of first
+    appearance, and that statements found in several fragments are kept once.
+    """
+
+    s1, s2, s3 = statement('a', ['b']), statement('b', ['c']), statement('c', ['d'])
+    proc_1 = Procedure('default_schema', 'proc_1', 'path_1.sql', ())
+    proc_2 = Procedure('default_schema', 'proc_2', 'path_2.sql', ())
+
+    merged = merge_results([proc_1._replace(statements=(s1,)),
+                            proc_2._replace(statements=(s3,)),
+                            proc_1._replace(statements=(s1, s2)),
+                            proc_2])
+
+    assert merged == [proc_1._replace(statements=(s1, s2)), proc_2._replace(statements=(s3,))]
+
+
+def test_recursive_filter_cycle():
+
+    """Ensure that statements both upstream and downstream of a table are kept once"""
+
+    p = Worker(TEST_DEFAULT_SCHEMA, TEST_DELIMITER, TEST_MODE, None)
+    p.results = [Procedure('default_schema', 'proc', 'path.sql',
+                           (statement('a', ['b']), statement('b', ['a']), statement('c', ['d'])))]
+    expected = p.results[0].statements[:2]
+
+    p.recursive_filter([table('a')])
+    assert tuple(s for x in p.results for s in x.statements) == expected
+
+
+def test_statement_dict():
+
+    """Ensure that statements convert back to their original dictionary form"""
+
+    for p in FILTER_TEST_INPUT:
+        assert Procedure.from_dict(p).to_dict() == p
+
+
+def test_filter_index():
+
+    """
+    Ensure that filters use a single index of the results, rebuilt only once results
+    change, and ignore unknown tables and procedures. Simple filtering keeps procedures
+    without matching statements, with no statements.
+    """
+
+    p = Worker(TEST_DEFAULT_SCHEMA, TEST_DELIMITER, TEST_MODE, None)
+    p.results = procedures(FILTER_TEST_INPUT)
+    graph = p.lineage()
+    assert p.lineage() is graph
+
+    p.procedures_filter([Table('default_schema', f'unknown_{i}') for i in range(500)]
+                        + [Table(FILTER_TEST_INPUT[0]['schema'], FILTER_TEST_INPUT[0]['name'])])
+    assert p.results == procedures(FILTER_TEST_INPUT)
+    assert p.lineage() is not graph
+
+    p.simple_filter([table(f'unknown_{i}') for i in range(500)] + [table('test_table_1')])
+    assert p.results == procedures(SIMPLE_FILTER_EXPECTED)
+
+    p.simple_filter([table('unknown')])
+    assert p.results == [r._replace(statements=()) for r in procedures(SIMPLE_FILTER_EXPECTED)]
@@ -1,5 +1,14 @@
-from output.json import to_json
-from output.mermaid import Mermaid
+import io
+import os
+import ujson
+import pytest
+from xml.etree import ElementTree
+from output.json import to_json, JsonWriter
+from output.mermaid import Mermaid, components
+from output.graph import to_graph
+from output.files import OutputFiles
+from output.cmd import Beautifier, render, COLORS, NO_COLORS
+from parse.models import Procedure, Statement, Table
 from tests.utils import OUTPUT_TEST_INPUT, JSON_OUTPUT_EXPECTED, MERMAID_EXPECTED
 
 
@@ -8,13 +17,273 @@ def test_output_json():
     Ensure that transformation of results into JSON returns
     expected result, without creating a file.
     """
-    assert to_json(OUTPUT_TEST_INPUT, None) == JSON_OUTPUT_EXPECTED
+    assert to_json([Procedure.from_dict(p) for p in OUTPUT_TEST_INPUT], None) == JSON_OUTPUT_EXPECTED
 
 
+def test_output_json_file(tmpdir):
+    """
+    Ensure that results streamed to .json and .jsonl files read back as
+    the expected output.
+    """
+    results = [Procedure.from_dict(p) for p in OUTPUT_TEST_INPUT]
+
+    to_json(results, str(tmpdir.join('out.json')))
+    with open(str(tmpdir.join('out.json')), 'r') as file:
+        assert ujson.load(file) == JSON_OUTPUT_EXPECTED
+
+    to_json(results, str(tmpdir.join('out.jsonl')))
+    with open(str(tmpdir.join('out.jsonl')), 'r') as file:
+        assert [ujson.loads(line) for line in file] == OUTPUT_TEST_INPUT
+
+    # Empty results are still valid JSON
+    to_json([], str(tmpdir.join('empty.json')))
+    with open(str(tmpdir.join('empty.json')), 'r') as file:
+        assert ujson.load(file) == {}
+
+
+def test_json_writer_groups(tmpdir):
+    """
+    Ensure that .json files are written in file path groups, and that
+    results of a file path cannot be split across groups.
+    """
+    p = Procedure.from_dict(OUTPUT_TEST_INPUT[0])
+    other = p._replace(path='other/path.sql')
+
+    with JsonWriter(str(tmpdir.join('out.json'))) as writer:
+        writer.write(p)
+        writer.write(p)
+        writer.write(other)
+        with pytest.raises(ValueError):
+            writer.write(p)
+
+    with open(str(tmpdir.join('out.json')), 'r') as file:
+        assert ujson.load(file) == {p.path: [p.to_dict()] * 2, other.path: [other.to_dict()]}
+
+
+
+def test_json_writer_error(tmpdir, monkeypatch):
+    """
+    Ensure that a write error does not stop results from being produced,
+    and that the incomplete file is removed.
+    """
+    p = Procedure.from_dict(OUTPUT_TEST_INPUT[0])
+    path = str(tmpdir.join('out.json'))
+
+    class FullFile(io.StringIO):
+        def write(self, s):
+            if self.tell() > 100:
+                raise OSError(28, 'No space left on device')
+            return super().write(s)
+
+    def full_open(file, mode):
+        tmpdir.join('out.json').write('')
+        return FullFile()
+
+    monkeypatch.setattr('output.json.open', full_open, raising=False)
+
+    with JsonWriter(path) as writer:
+        writer.write(p)
+        writer.write(p._replace(path='other/path.sql'))
+        writer.write(p._replace(path='third/path.sql'))
+
+    assert writer.failed
+    assert not os.path.exists(path)
+
 def test_output_mermaid():
     """
     Ensure that tables_chart function returns expected HTML code,
     without creating a file.
     """
-    m = Mermaid(OUTPUT_TEST_INPUT)
-    assert m.tables_chart(None).string == MERMAID_EXPECTED.string
+    m = Mermaid([Procedure.from_dict(p) for p in OUTPUT_TEST_INPUT])
+    assert m.tables_chart(None) == MERMAID_EXPECTED
+    assert m.tables_chart(None) == MERMAID_EXPECTED
+
+
+def test_output_mermaid_file(tmpdir):
+    """
+    Ensure that arrows found in several procedures are only drawn once,
+    and that the saved HTML file holds the expected HTML code.
+    """
+    p = Procedure.from_dict(OUTPUT_TEST_INPUT[0])
+
+    Mermaid([p, p._replace(path='other/path.sql')]).tables_chart(str(tmpdir.join('chart.html')))
+    with open(str(tmpdir.join('chart.html')), 'r') as file:
+        assert file.read() == MERMAID_EXPECTED
+
+
+def test_output_mermaid_casing():
+    """
+    Ensure that a table spelled with different casings is drawn as a single
+    node, spelled as first met.
+    """
+    p = Procedure('dwh', 'p', 'p.sql', (
+        Statement('INSERT', Table('dwh', 'orders'), from_table=(Table('stg', 'orders'),), procedure='p1'),
+        Statement('INSERT', Table('DWH', 'Orders'), from_table=(Table('STG', 'Orders'),), procedure='p1'),
+        Statement('INSERT', Table('mart', 'sales'), from_table=(Table('DWH', 'ORDERS'),), procedure='p2')))
+
+    assert [arrow for _, _, arrow in Mermaid([p]).tables_flows()] == \
+        ['stg.orders-->|p1|dwh.orders;', 'dwh.orders-->|p2|mart.sales;']
+
+
+def test_output_graph(tmpdir):
+    """
+    Ensure that graph exporters write the tables data flows of the Mermaid
+    flowchart, with edges weighted by the number of procedures, procedures
+    of the same name in different schemas being counted separately.
+    """
+    p = Procedure.from_dict(OUTPUT_TEST_INPUT[0])
+    other = p._replace(name='myotherprocedure',
+                       statements=tuple(s._replace(procedure='myotherprocedure', join_table=None)
+                                        for s in p.statements))
+    other_schema = other._replace(schema='mart', path='other/path.sql')
+
+    graph = to_graph([p, p, other, other_schema], None)
+    labels = [f'{t.schema}.{t.name}' for t in graph.tables]
+    edges = {(labels[s], labels[t]): w for s, t, w in graph.weighted_edges()}
+    assert edges == {('default_schema.test_table_2', 'default_schema.test_table_1'): 3,
+                     ('default_schema.test_table_3', 'default_schema.test_table_1'): 3,
+                     ('default_schema.test_table_4', 'default_schema.test_table_1'): 1,
+                     ('default_schema.test_table_5', 'default_schema.test_table_1'): 1}
+
+    graph.save(str(tmpdir.join('graph.dot')))
+    with open(str(tmpdir.join('graph.dot')), 'r') as file:
+        dot = file.read()
+    assert dot.startswith('digraph lineage {') and dot.count(' -> ') == 4
+    assert f'n{labels.index("default_schema.test_table_2")} -> n0 [weight=3];' in dot
+
+    graph.save(str(tmpdir.join('graph.graphml')))
+    ns = {'g': 'http://graphml.graphdrawing.org/xmlns'}
+    root = ElementTree.parse(str(tmpdir.join('graph.graphml'))).getroot()
+    assert [n.find('g:data', ns).text for n in root.iterfind('.//g:node', ns)] == labels
+    assert sorted(int(e.find('g:data', ns).text) for e in root.iterfind('.//g:edge', ns)) == [1, 1, 3, 3]
+
+    graph.save(str(tmpdir.join('graph.cyjs')))
+    with open(str(tmpdir.join('graph.cyjs')), 'r') as file:
+        elements = ujson.load(file)['elements']
+    assert [n['data']['label'] for n in elements['nodes']] == labels
+    assert {(labels[int(e['data']['source'][1:])], labels[int(e['data']['target'][1:])]): e['data']['weight']
+            for e in elements['edges']} == edges
+
+
+def test_output_mermaid_partitions(tmpdir):
+    """
+    Ensure that partitioned flowcharts hold one connected component or
+    schema per page, large partitions being split across pages, and that
+    the index page links all pages.
+    """
+    a, b, c = Table('dwh', 'a'), Table('dwh', 'b'), Table('dwh', 'c')
+    x, y = Table('stg', 'x'), Table('stg', 'y')
+    statements = (Statement('INSERT', b, from_table=(a,), procedure='p1'),
+                  Statement('INSERT', y, from_table=(x,), procedure='p1'),
+                  Statement('INSERT', c, from_table=(b,), join_table=(x,), procedure='p2'),
+                  Statement('INSERT', Table('ods', 'z'), from_table=(Table('ods', 'w'),), procedure='p3'))
+    m = Mermaid([Procedure('dwh', 'p', 'p.sql', statements)])
+
+    flows = list(m.tables_flows())
+    keys = components(flows)
+    assert len(set(keys[:4])) == 1 and keys[4] != keys[0]
+
+    # Tables spelled with different casings belong to the same component
+    spelled = [(a, b, ''), (Table('DWH', 'B'), c, ''), (x, y, '')]
+    keys = components(spelled)
+    assert keys[0] == keys[1] != keys[2]
+
+    assert [(title, tables, len(arrows)) for title, tables, arrows in m.partitions('components')] == \
+        [('Component 1', 5, 4), ('Component 2', 2, 1)]
+    assert [(title, tables, len(arrows)) for title, tables, arrows in m.partitions('schema')] == \
+        [('Schema dwh', 4, 3), ('Schema ods', 2, 1), ('Schema stg', 2, 1)]
+
+    index = str(tmpdir.join('chart.html'))
+    pages = m.partitioned_chart(index, 'components', 3)
+    assert [os.path.basename(page) for page in pages] == ['chart_1.html', 'chart_2.html', 'chart_3.html']
+
+    with open(index, 'r') as file:
+        html = file.read()
+    assert 'Component 1 (page 1 of 2)' in html and 'Component 1 (page 2 of 2)' in html
+    assert all(f'href="{os.path.basename(page)}"' in html for page in pages)
+
+    with open(pages[1], 'r') as file:
+        assert file.read().count('--&gt;') == 1
+
+
+def test_beautify():
+    """
+    Ensure that results are displayed without colour codes when the output
+    is not a terminal, end with a single blank line when displayed in several
+    writes, and that quiet and limit modes only count the results left out in
+    the summary.
+    """
+    p = Procedure.from_dict(OUTPUT_TEST_INPUT[0])
+    other = p._replace(path='other/path.sql')
+
+    output = io.StringIO()
+    Beautifier(output).write([p, other])
+    assert '\x1b' not in output.getvalue() and '\x1b' in render(p, COLORS)
+    assert output.getvalue().count('|--- INSERT ----> default_schema.test_table_1') == 2
+
+    output = io.StringIO()
+    b = Beautifier(output)
+    b.write([p])
+    b.write([other])
+    b.summary()
+    assert output.getvalue() == render(p, NO_COLORS) + render(other, NO_COLORS) + '\n'
+
+    output = io.StringIO()
+    b = Beautifier(output, limit=1)
+    b.write([p])
+    b.write([other])
+    b.summary()
+    assert 'my/test/path.sql' in output.getvalue() and 'other/path.sql' not in output.getvalue()
+    assert output.getvalue().endswith('2 procedures/files, 2 statements (1 procedures/files not displayed, '
+                                      'beyond the limit of 1)\n')
+
+    output = io.StringIO()
+    b = Beautifier(output, quiet=True)
+    b.write([p, other])
+    b.summary()
+    assert output.getvalue() == '2 procedures/files, 2 statements\n'
+
+
+def test_output_files(tmpdir):
+    """
+    Ensure that outputs updated with the results of changed and deleted
+    files only match outputs built from all results.
+    """
+    p = Procedure.from_dict(OUTPUT_TEST_INPUT[0])
+    other = p._replace(name='other', path='other/path.sql',
+                       statements=tuple(s._replace(procedure='other', join_table=None) for s in p.statements))
+    changed = other._replace(statements=tuple(s._replace(target_table=Table('mart', 'sales'))
+                                              for s in other.statements))
+    third = changed._replace(name='third', path='third/path.sql',
+                             statements=tuple(s._replace(procedure='third', target_table=Table('mart', 'orders'))
+                                              for s in changed.statements))
+
+    paths = {k: str(tmpdir.join(f'{k}.{k}')) for k in ('html', 'json', 'graphml')}
+    outputs = OutputFiles(paths['html'], paths['json'], paths['graphml'])
+    outputs.update([], [p, other])
+    outputs.update([p, other], [changed, third])
+    outputs.save()
+
+    def read(path):
+        with open(path, 'r') as file:
+            return file.read()
+
+    saved = {k: read(path) for k, path in paths.items()}
+    results = [changed, third]
+    Mermaid(results).tables_chart(paths['html'])
+    to_json(results, paths['json'])
+    to_graph(results, paths['graphml'])
+
+    assert sorted(saved['html'].splitlines()) == sorted(read(paths['html']).splitlines())
+    assert saved['json'] == read(paths['json'])
+    # Tables only found in removed results are not written
+    assert 'mart.sales' in saved['graphml'] and 'test_table_1' not in saved['graphml']
+
+    def edges(text):
+        root = ElementTree.fromstring(text)
+        ns = {'g': 'http://graphml.graphdrawing.org/xmlns'}
+        labels = {n.get('id'): n.find('g:data', ns).text for n in root.iterfind('.//g:node', ns)}
+        return sorted((labels[e.get('source')], labels[e.get('target')], e.find('g:data', ns).text)
+                      for e in root.iterfind('.//g:edge', ns))
+
+    assert edges(saved['graphml']) == edges(read(paths['graphml']))
@@ -1,7 +1,10 @@
+import gc
+import os
 import pytest
 from tests.utils import *
-from parse.worker import Worker
+from parse.worker import Worker, iter_sql_files
 from parse.mapper import Mapper
+from parse.source_map import SourceMap
 
 
 @pytest.mark.parametrize(
@@ -16,9 +19,9 @@ def test_parse_dir(delimiter, mode, expected):
     """
 
     # Test directory parsing
-    p = Worker(TEST_DEFAULT_SCHEMA, delimiter, mode, None)
-    p.parse_dir(test_dir_path)
-    statements = [s for file in p.results for s in file['statements']]
+    with Worker(TEST_DEFAULT_SCHEMA, delimiter, mode, None) as p:
+        p.parse_dir(test_dir_path)
+    statements = [s.to_dict() for file in p.results for s in file.statements]
     statements_expected = [s for file in expected for s in file['statements']]
 
     # Assert statements parsed are correct
@@ -26,6 +29,105 @@ def test_parse_dir(delimiter, mode, expected):
         sorted(statements_expected, key=lambda k: k['operation'] + k['procedure'])
 
 
+def test_iter_parse():
+
+    """
+    Ensure that streamed directory parsing yields the same statements as
+    directory parsing, whatever the number of files per pool task.
+    """
+
+    with Worker(TEST_DEFAULT_SCHEMA, ';', 'ddl', None, chunksize=3) as p:
+        statements = [s.to_dict() for file in p.iter_parse(test_dir_path) for s in file.statements]
+    statements_expected = [s for file in PARSE_DIR_EXPECTED_DDL for s in file['statements']]
+
+    assert sorted(statements, key=lambda k: k['operation'] + k['procedure']) == \
+        sorted(statements_expected, key=lambda k: k['operation'] + k['procedure'])
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_worker_pool(jobs):
+
+    """
+    Ensure that the process pool is reused between runs, that no pool is
+    started for a single job, and that the pool is shut down on exit.
+
+    :param jobs: number of parsing processes
+    """
+
+    statements_expected = sorted((s for file in PARSE_DIR_EXPECTED_DDL for s in file['statements']),
+                                 key=lambda k: k['operation'] + k['procedure'])
+
+    with Worker(TEST_DEFAULT_SCHEMA, ';', 'ddl', None, jobs=jobs) as p:
+        for _ in range(2):
+            pool = p.pool
+            p.run(test_dir_path)
+            statements = [s.to_dict() for file in p.results for s in file.statements]
+            assert sorted(statements, key=lambda k: k['operation'] + k['procedure']) == statements_expected
+        assert p.pool is pool
+        assert (p.pool is None) == (jobs == 1)
+
+    assert p.pool is None
+
+
+
+def test_worker_pool_collected():
+
+    """
+    Ensure that the process pool of a Worker used without a with statement
+    is closed once the Worker is garbage collected, processes exiting
+    normally rather than being terminated.
+    """
+
+    p = Worker(TEST_DEFAULT_SCHEMA, ';', 'ddl', None, jobs=2)
+    p.run(test_dir_path)
+    processes = list(p.pool._pool)
+    assert all(process.is_alive() for process in processes)
+
+    del p
+    gc.collect()
+    assert [process.exitcode for process in processes] == [0, 0]
+
+@pytest.mark.parametrize(
+    "delimiter, mode",
+    [(';', 'ddl'),
+     (';;', 'procedure')]
+)
+def test_parse_large_file(delimiter, mode):
+
+    """
+    Ensure that large files split in statement batches across the pool give
+    the same results, in the same order, as files parsed in a single process.
+
+    :param delimiter: statements delimiter
+    :param mode: parsing mode
+    """
+
+    with Worker(TEST_DEFAULT_SCHEMA, delimiter, mode, None, jobs=1) as p:
+        expected = p.parse_file(procedure_path)
+
+    with Worker(TEST_DEFAULT_SCHEMA, delimiter, mode, None, jobs=2,
+                split_file_mb=0, statement_batch=2) as p:
+        assert p.is_large(procedure_path)
+        assert p.parse_file(procedure_path) == expected
+        statements = [s.to_dict() for file in p.iter_parse(test_dir_path) for s in file.statements]
+
+    statements_expected = [s for file in (PARSE_DIR_EXPECTED_DDL if mode == 'ddl' else PARSE_DIR_EXPECTED_PROC)
+                           for s in file['statements']]
+    assert sorted(statements, key=lambda k: k['operation'] + k['procedure']) == \
+        sorted(statements_expected, key=lambda k: k['operation'] + k['procedure'])
+
+
+def test_iter_sql_files(tmpdir):
+
+    """Ensure that .sql files are found in nested directories only"""
+
+    for path in ('a.sql', 'b.txt', 'sub/c.sql', 'sub/deeper/d.sql', 'sub/e.sql.bak'):
+        tmpdir.join(path).write('', ensure=True)
+
+    assert sorted(os.path.relpath(f, str(tmpdir)) for f in iter_sql_files(str(tmpdir))) == \
+        ['a.sql', os.path.join('sub', 'c.sql'), os.path.join('sub', 'deeper', 'd.sql')]
+
+
 @pytest.mark.parametrize(
     "delimiter, mode, path, expected",
     [(';', 'ddl', delete_path, [PARSE_FILE_DELETE_EXPECTED]),
@@ -60,7 +162,9 @@ def test_parse_procedure():
 
     # Run parser on test procedure file
     processor = Worker(TEST_DEFAULT_SCHEMA, TEST_DELIMITER, TEST_MODE, None)
-    p = processor.parse_str(procedure_path, TEST_PROCEDURE)
+    with open(procedure_path, 'r', newline='') as file:
+        source = SourceMap(file.read(), TEST_PROCEDURE)
+    p = processor.parse_str(procedure_path, TEST_PROCEDURE, source)
 
     # Check equality at Procedure level
     assert p['name'] == PARSE_FILE_PROCEDURE_EXPECTED['name']
@@ -70,6 +174,30 @@ def test_parse_procedure():
         sorted(PARSE_FILE_PROCEDURE_EXPECTED['statements'], key=lambda k: k['operation'])
 
 
+def test_parse_file_positions(tmpdir):
+
+    """
+    Ensure that statements are returned in source order, with byte offsets and
+    line numbers pointing to the original file despite comments, backticks,
+    CRLF line endings and multi-byte characters.
+    """
+
+    raw = "-- h\u00e9llo `x`\r\n/* c;\r\n */ delete from y where a = '\u00e9';\r\n" \
+          "insert into `db`.`t` (a) -- ; c\r\nselect 'a; -- \u00fc' from s; # z\r\n"
+    path = str(tmpdir.join('positions.sql'))
+    with open(path, 'wb') as file:
+        file.write(raw.encode('utf-8'))
+
+    p = Worker(TEST_DEFAULT_SCHEMA, ';', 'ddl', None)
+    statements = p.parse_file(path)[0]['statements']
+
+    assert [(s['operation'], s['start_line'], s['end_line']) for s in statements] == \
+        [('DELETE', 3, 3), ('INSERT', 4, 5)]
+    assert [raw.encode('utf-8')[s['start']:s['end']].decode('utf-8') for s in statements] == \
+        ["delete from y where a = '\u00e9';",
+         "insert into `db`.`t` (a) -- ; c\r\nselect 'a; -- \u00fc' from s;"]
+
+
 @pytest.mark.parametrize(
     "test_input, ddl_type, expected",
     [(TEST_INSERT_STATEMENT, 'INSERT', PARSE_STATEMENT_INSERT_EXPECTED),
@@ -98,6 +226,22 @@ def test_parse_statement(test_input, ddl_type, expected):
     assert r == expected
 
 
+def test_parse_statement_case():
+
+    """Ensure that keywords are matched in any case and identifiers keep their casing"""
+
+    mapper = Mapper(';', 'ddl')
+    p = Worker(TEST_DEFAULT_SCHEMA, ';', 'ddl', None)
+    r = p.parse_statement('INSERT', "Insert into MySchema.MyTable (Col_A) "
+                                    "select 'Lit' from Src.Tab_1 t join tab_2 on t.id = tab_2.id;", mapper)
+
+    assert r == {'operation': 'INSERT',
+                 'target_table': {'schema': 'MySchema', 'name': 'MyTable'},
+                 'from_table': [{'schema': 'Src', 'name': 'Tab_1'}],
+                 'join_table': [{'schema': TEST_DEFAULT_SCHEMA, 'name': 'tab_2'}],
+                 'target_columns': ['Col_A']}
+
+
 def test_parse_object_name():
 
     """
@@ -121,3 +265,27 @@ def test_get_procedure_name():
     # Ensure that procedure name gets correctly identified and split
     p = Worker(TEST_DEFAULT_SCHEMA, TEST_DELIMITER, TEST_MODE, None)
     assert p.get_procedure_name(TEST_PROCEDURE) == ('example', 'testproc')
+
+
+@pytest.mark.parametrize(
+    "test_input, ddl_type",
+    [(TEST_INSERT_STATEMENT, 'INSERT'),
+     (TEST_UPDATE_STATEMENT, 'UPDATE'),
+     (TEST_CREATE_TABLE_QUERY_STATEMENT, 'CREATE TABLE'),
+     ('INSERT INTO TAB_1 (COL_1) SELECT COL_1 FROM TAB_2 WHERE;', 'INSERT')]
+)
+def test_parse_statement_sll(test_input, ddl_type):
+
+    """
+    Ensure that two-stage SLL/LL parsing returns the same results as LL parsing,
+    including for statements failing in SLL mode and parsed again in LL mode.
+
+    :param test_input: test statement
+    :param ddl_type: DML type of the statement tested
+    """
+
+    mapper = Mapper(TEST_DELIMITER, TEST_MODE)
+    ll = Worker(TEST_DEFAULT_SCHEMA, TEST_DELIMITER, TEST_MODE, None, sll=False)
+    sll = Worker(TEST_DEFAULT_SCHEMA, TEST_DELIMITER, TEST_MODE, None, sll=True)
+    assert sll.parse_statement(ddl_type, test_input, mapper) == \
+        ll.parse_statement(ddl_type, test_input, mapper)
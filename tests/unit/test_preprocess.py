@@ -0,0 +1,49 @@
+import os
+import pytest
+from parse.preprocess import preprocess, strip_comments
+from tests.utils import test_dir_path
+
+
+def commented(text: str) -> str:
+
+    """
+    Adds line comments, block comments and quoted names holding comment
+    markers and delimiters to SQL code.
+
+    :param text: SQL code
+    :return: commented SQL code
+    """
+
+    lines = [f"{line} -- it's a ; comment" if i % 3 == 0 else
+             f"/* block ; 'comment' */{line}" if i % 3 == 1 else
+             f"{line} # another ; comment" if line.strip() else line
+             for i, line in enumerate(text.split('\n'))]
+
+    return '/* header\n -- comment */\n' + '\n'.join(lines).replace('src_tab_1 ', '`src_tab_1` ')
+
+
+@pytest.mark.parametrize("name", sorted(os.listdir(test_dir_path)))
+@pytest.mark.parametrize("transform", [lambda x: x, commented])
+def test_preprocess_differential(name, transform):
+
+    """
+    Ensure that the fast preprocessor produces the same code as sqlparse on
+    the fixture files, up to whitespace.
+
+    :param name: fixture file name
+    :param transform: function applied to the fixture file content
+    """
+
+    with open(os.path.join(test_dir_path, name), 'r') as file:
+        text = transform(file.read())
+
+    assert preprocess(text, 'fast').split() == preprocess(text, 'sqlparse').split()
+
+
+def test_strip_comments_literals():
+
+    """Ensure that comment markers inside of literals and quoted names are kept"""
+
+    text = "SELECT 'a -- b', \"c /* d */\", 'it''s # e', `f -- g` -- h\n/* i */FROM/*+ j */x # k"
+
+    assert strip_comments(text) == "SELECT 'a -- b', \"c /* d */\", 'it''s # e', f -- g \n FROM/*+ j */x "
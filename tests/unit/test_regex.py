@@ -5,7 +5,7 @@ from tests.utils import *
 
 
 with open('./tests/_resources/expected/procedure_expected.sql', 'r') as file:
-    TEST_PROCEDURE_EXPECTED = fmt(file.read().upper(), strip_comments=True).strip()
+    TEST_PROCEDURE_EXPECTED = fmt(file.read(), strip_comments=True).strip()
 
 
 @pytest.mark.parametrize(
@@ -0,0 +1,119 @@
+import os
+import sys
+import shutil
+import subprocess
+from parse.worker import Worker
+from parse.result_cache import ResultCache
+from parse.models import Procedure
+from tests.utils import *
+
+
+def test_result_cache(tmpdir):
+
+    """
+    Ensure that cached files are not parsed again, that results read from the
+    cache are identical, and that modified files are cache misses.
+    """
+
+    cache = ResultCache(str(tmpdir), 1, TEST_DEFAULT_SCHEMA, ';', 'ddl')
+    p = Worker(TEST_DEFAULT_SCHEMA, ';', 'ddl', None, result_cache=cache, jobs=1)
+    expected = [Procedure.from_dict(r) for r in p.parse_file(insert_path)]
+
+    parsed = []
+    parse_file = p.parse_file
+    p.parse_file = lambda path: parsed.append(path) or parse_file(path)
+
+    assert list(p.iter_parse(insert_path)) == expected
+    assert (cache.hits, cache.misses, parsed) == (0, 1, [insert_path])
+    assert list(p.iter_parse(insert_path)) == expected
+    assert (cache.hits, cache.misses, parsed) == (1, 1, [insert_path])
+
+    path = str(tmpdir.join('insert.sql'))
+    shutil.copy(insert_path, path)
+    key = cache.key(path)
+    with open(path, 'a') as file:
+        file.write('\n')
+    assert cache.key(path) != key
+
+    # Other parser settings never share entries
+    other = ResultCache(str(tmpdir), 1, TEST_DEFAULT_SCHEMA, ';;', 'procedure')
+    assert other.key(insert_path) != cache.key(insert_path)
+
+
+def test_result_cache_eviction(tmpdir):
+
+    """
+    Ensure that least recently used entries are evicted first when the cache
+    exceeds its size limit.
+    """
+
+    cache = ResultCache(str(tmpdir), 0, TEST_DEFAULT_SCHEMA, ';', 'ddl')
+    for i, key in enumerate(['a1', 'b2', 'c3']):
+        cache.put(key, [{'name': key}])
+        os.utime(cache.entry_path(key), (i, i))
+
+    # Entry a1 becomes the most recently used
+    assert cache.get('a1') == [{'name': 'a1'}]
+
+    cache.max_size = 2 * os.path.getsize(cache.entry_path('a1'))
+    cache.prune()
+    assert cache.evicted == 1
+    assert cache.get('b2') is None
+    assert cache.get('a1') is not None and cache.get('c3') is not None
+
+    cache.clear()
+    assert cache.get('a1') is None
+
+
+def test_cached_run_skips_parser_import(tmpdir):
+
+    """
+    Ensure that the generated parser is not imported by the CLI entry point,
+    nor by runs whose files are all read from the results cache.
+    """
+
+    script = f"""
+import sys
+import ezql
+from parse.worker import Worker
+from parse.result_cache import ResultCache
+cache = ResultCache({str(tmpdir)!r}, 1, {TEST_DEFAULT_SCHEMA!r}, ';', 'ddl')
+results = list(Worker({TEST_DEFAULT_SCHEMA!r}, ';', 'ddl', None, result_cache=cache, jobs=1).iter_parse({insert_path!r}))
+print(len(results), 'parse.parser' in sys.modules)
+"""
+
+    # Parsing logs are printed on stdout too, the script output is the last line
+    def run() -> str:
+        return subprocess.run([sys.executable, '-c', script], stdout=subprocess.PIPE, check=True,
+                              universal_newlines=True).stdout.splitlines()[-1]
+
+    assert run() == '1 True'
+    assert run() == '1 False'
+
+
+def test_result_cache_lazy_walk(tmpdir):
+
+    """
+    Ensure that files are looked up in the results cache as they are walked,
+    cached results being yielded before the next files are read, and that
+    files parsed by the pool are stored in the cache.
+    """
+
+    cache = ResultCache(str(tmpdir), 1, TEST_DEFAULT_SCHEMA, ';', 'ddl')
+    walked = []
+
+    def paths():
+        for path in (insert_path, update_path, delete_path):
+            walked.append(path)
+            yield path
+
+    with Worker(TEST_DEFAULT_SCHEMA, ';', 'ddl', None, result_cache=cache, jobs=2) as p:
+        expected = list(p.iter_parse_files([insert_path]))
+
+        results = p.iter_parse_files(paths())
+        assert [next(results)] == expected
+        assert walked == [insert_path]
+        assert len(list(results)) == 2
+
+        assert sorted(r.path for r in p.iter_parse_files(paths())) == sorted([insert_path, update_path, delete_path])
+        assert (cache.hits, cache.misses) == (4, 3)
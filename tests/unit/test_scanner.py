@@ -0,0 +1,48 @@
+import re
+import pytest
+from parse.mapper import Mapper
+from parse.scanner import split_statements
+from tests.utils import *
+
+
+@pytest.mark.parametrize(
+    "text, delimiter, mode",
+    [(TEST_PROCEDURE, TEST_DELIMITER, TEST_MODE),
+     (TEST_INSERT_STATEMENT, ';', 'ddl'),
+     (TEST_UPDATE_STATEMENT, ';', 'ddl'),
+     (TEST_CREATE_TABLE_QUERY_STATEMENT, ';', 'ddl'),
+     (TEST_TRUNCATE_STATEMENT + TEST_DELETE_STATEMENT + TEST_DROP_TABLE_STATEMENT, ';', 'ddl')]
+)
+def test_split_statements(text, delimiter, mode):
+
+    """
+    Ensure that the single-pass splitter finds the same statements as the
+    per-type extraction regexes, in source order.
+
+    :param text: procedure/file body string
+    :param delimiter: delimiter setting for parsing
+    :param mode: parsing mode
+    """
+
+    mapper = Mapper(delimiter, mode)
+    expected = [(ddl_type, m) for ddl_type, reg in mapper.extract_regexes.items()
+                for m in re.finditer(reg, text)]
+    expected = [(ddl_type, m.group(), m.start()) for ddl_type, m in sorted(expected, key=lambda x: x[1].start())]
+
+    assert list(split_statements(text, mapper.boundary_regex)) == expected
+
+
+def test_split_statements_literals():
+
+    """
+    Ensure that delimiters and keywords inside string literals are ignored,
+    and that incomplete UPDATE and TRUNCATE statements are skipped.
+    """
+
+    mapper = Mapper(';', 'ddl')
+    text = "SET @A = 'DELETE FROM X;'; INSERT INTO T SELECT ';', \"it\\\"s;\" FROM S; " \
+           "UPDATE T2 = 1; TRUNCATE TABLE T3 CASCADE; update t4 set a = 'b';"
+
+    assert list(split_statements(text, mapper.boundary_regex)) == [
+        ('INSERT', "INSERT INTO T SELECT ';', \"it\\\"s;\" FROM S;", 27),
+        ('UPDATE', "update t4 set a = 'b';", 112)]
@@ -0,0 +1,54 @@
+import os
+import shutil
+from parse.worker import Worker
+from parse.watcher import Watcher
+from tests.utils import TEST_DEFAULT_SCHEMA, PARSE_FILE_INSERT_EXPECTED, PARSE_FILE_UPDATE_EXPECTED, \
+    PARSE_FILE_DELETE_EXPECTED, insert_path, update_path, delete_path
+
+
+def test_watcher(tmpdir):
+
+    """
+    Ensure that only added or modified files are parsed again, that results of
+    deleted files are dropped, and that previous and new results of these
+    files are kept.
+    """
+
+    for path in (insert_path, update_path):
+        shutil.copy(path, str(tmpdir))
+    insert, update, delete = (str(tmpdir.join(os.path.basename(p))) for p in (insert_path, update_path, delete_path))
+
+    # Statements of copied files only differ by their procedure, which is the file path
+    def statements(results):
+        return [dict(s, procedure=None) for p in results for s in p['statements']]
+
+    def procedures(results):
+        return [p.to_dict() for p in results]
+
+    with Worker(TEST_DEFAULT_SCHEMA, ';', 'ddl', None, jobs=1) as worker:
+
+        parsed = []
+        parse_file = worker.parse_file
+        worker.parse_file = lambda path: parsed.append(path) or parse_file(path)
+
+        watcher = Watcher(worker, str(tmpdir), interval=0)
+        assert statements(procedures(watcher.load())) == statements([PARSE_FILE_INSERT_EXPECTED, PARSE_FILE_UPDATE_EXPECTED])
+        assert sorted(parsed) == [insert, update]
+        assert watcher.poll() == ([], [])
+
+        # Modify a file, add another one and delete a third one
+        parsed.clear()
+        with open(update_path, 'r') as file:
+            body = file.read()
+        with open(insert, 'w') as file:
+            file.write(body)
+        os.utime(insert, ns=(0, 0))
+        shutil.copy(delete_path, delete)
+        os.remove(update)
+
+        assert watcher.poll() == ([delete, insert], [update])
+        assert sorted(parsed) == [delete, insert]
+        assert {p.path for p in watcher.removed} == {insert, update}
+        assert {p.path for p in watcher.parsed} == {delete, insert}
+        assert statements(procedures(watcher.procedures())) == statements([PARSE_FILE_DELETE_EXPECTED, PARSE_FILE_UPDATE_EXPECTED])
+        assert {p.path for p in watcher.procedures()} == {delete, insert}
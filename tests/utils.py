@@ -1,5 +1,4 @@
 from sqlparse import format as fmt
-from bs4 import BeautifulSoup
 
 test_dir_path = './tests/_resources/clean/'
 procedure_path = './tests/_resources/clean/procedure.sql'
@@ -13,46 +12,45 @@ create_table_columns_path = './tests/_resources/clean/create_table_columns.sql'
 create_table_like_path = './tests/_resources/clean/create_table_like.sql'
 create_table_query_path = './tests/_resources/clean/create_table_query.sql'
 
-# NB: Antlr grammar is case-sensitive. Input has to be upper case.
-# Open and upper case test procedure file
+# Open test procedure file, case is folded by the parser session
 with open(procedure_path, 'r') as file:
-    TEST_PROCEDURE = fmt(file.read().upper(), strip_comments=True).strip()
+    TEST_PROCEDURE = fmt(file.read(), strip_comments=True).strip()
 
-# Open and upper case test insert statement
+# Open test insert statement
 with open(insert_path, 'r') as file:
-    TEST_INSERT_STATEMENT = fmt(file.read().upper(), strip_comments=True).strip()
+    TEST_INSERT_STATEMENT = fmt(file.read(), strip_comments=True).strip()
 
-# Open and upper case test replace statement
+# Open test replace statement
 with open(replace_path, 'r') as file:
-    TEST_REPLACE_STATEMENT = fmt(file.read().upper(), strip_comments=True).strip()
+    TEST_REPLACE_STATEMENT = fmt(file.read(), strip_comments=True).strip()
 
-# Open and upper case test update statement
+# Open test update statement
 with open(update_path, 'r') as file:
-    TEST_UPDATE_STATEMENT = fmt(file.read().upper(), strip_comments=True).strip()
+    TEST_UPDATE_STATEMENT = fmt(file.read(), strip_comments=True).strip()
 
-# Open and upper case test delete statement
+# Open test delete statement
 with open(delete_path, 'r') as file:
-    TEST_DELETE_STATEMENT = fmt(file.read().upper(), strip_comments=True).strip()
+    TEST_DELETE_STATEMENT = fmt(file.read(), strip_comments=True).strip()
 
-# Open and upper case test truncate statement
+# Open test truncate statement
 with open(truncate_path, 'r') as file:
-    TEST_TRUNCATE_STATEMENT = fmt(file.read().upper(), strip_comments=True).strip()
+    TEST_TRUNCATE_STATEMENT = fmt(file.read(), strip_comments=True).strip()
 
-# Open and upper case test drop table statement
+# Open test drop table statement
 with open(drop_table_path, 'r') as file:
-    TEST_DROP_TABLE_STATEMENT = fmt(file.read().upper(), strip_comments=True).strip()
+    TEST_DROP_TABLE_STATEMENT = fmt(file.read(), strip_comments=True).strip()
 
-# Open and upper case test create table columns statement
+# Open test create table columns statement
 with open(create_table_columns_path, 'r') as file:
-    TEST_CREATE_TABLE_COLUMNS_STATEMENT = fmt(file.read().upper(), strip_comments=True).strip()
+    TEST_CREATE_TABLE_COLUMNS_STATEMENT = fmt(file.read(), strip_comments=True).strip()
 
-# Open and upper case test create table like statement
+# Open test create table like statement
 with open(create_table_like_path, 'r') as file:
-    TEST_CREATE_TABLE_LIKE_STATEMENT = fmt(file.read().upper(), strip_comments=True).strip()
+    TEST_CREATE_TABLE_LIKE_STATEMENT = fmt(file.read(), strip_comments=True).strip()
 
-# Open and upper case test create table query statement
+# Open test create table query statement
 with open(create_table_query_path, 'r') as file:
-    TEST_CREATE_TABLE_QUERY_STATEMENT = fmt(file.read().upper(), strip_comments=True).strip()
+    TEST_CREATE_TABLE_QUERY_STATEMENT = fmt(file.read(), strip_comments=True).strip()
 
 # test default parameters
 TEST_DEFAULT_SCHEMA = 'default_schema'
@@ -116,6 +114,7 @@ PARSE_STATEMENT_CREATE_TABLE_QUERY_EXPECTED = {'operation': 'CREATE TABLE QUERY'
 
 INSERT_EXPECTED = {'operation': 'INSERT',
                    'procedure': 'testproc',
+                   'start': 574, 'end': 1115, 'start_line': 27, 'end_line': 45,
                    'from_table': [{'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_1'}],
                    'join_table': [
                        {'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_2'},
@@ -126,6 +125,7 @@ INSERT_EXPECTED = {'operation': 'INSERT',
 
 REPLACE_EXPECTED = {'operation': 'REPLACE',
                     'procedure': 'testproc',
+                    'start': 1119, 'end': 1689, 'start_line': 47, 'end_line': 65,
                     'from_table': [{'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_1'}],
                     'join_table': [
                         {'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_2'},
@@ -137,6 +137,7 @@ REPLACE_EXPECTED = {'operation': 'REPLACE',
 
 UPDATE_EXPECTED = {'operation': 'UPDATE',
                    'procedure': 'testproc',
+                   'start': 1694, 'end': 1850, 'start_line': 68, 'end_line': 73,
                    'join_table': [
                        {'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_9'},
                    ],
@@ -145,29 +146,35 @@ UPDATE_EXPECTED = {'operation': 'UPDATE',
 
 DELETE_EXPECTED = {'operation': 'DELETE',
                    'procedure': 'testproc',
+                   'start': 1854, 'end': 1902, 'start_line': 75, 'end_line': 75,
                    'target_table': {'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_10'}}
 
 TRUNCATE_EXPECTED = {'operation': 'TRUNCATE',
                      'procedure': 'testproc',
+                     'start': 1906, 'end': 1932, 'start_line': 77, 'end_line': 77,
                      'target_table': {'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_11'}}
 
 DROP_TABLE_EXPECTED = {'operation': 'DROP TABLE',
                        'procedure': 'testproc',
+                       'start': 1936, 'end': 1968, 'start_line': 79, 'end_line': 79,
                        'target_table': {'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_12'}}
 
 CREATE_TABLE_LIKE_EXPECTED = {'operation': 'CREATE TABLE LIKE',
                               'procedure': 'testproc',
+                              'start': 2197, 'end': 2237, 'start_line': 92, 'end_line': 92,
                               'target_table': {'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_13'},
                               'from_table': [{'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_14'}]}
 
 CREATE_TABLE_COLUMNS_EXPECTED = {'operation': 'CREATE TABLE COLUMNS',
                                  'procedure': 'testproc',
+                                 'start': 1972, 'end': 2193, 'start_line': 81, 'end_line': 90,
                                  'target_table': {'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_16'},
                                  'target_columns': ['col_1', 'col_2', 'col_3', 'col_4', 'col_5',
                                                     'col_6', 'col_7']}
 
 CREATE_TABLE_QUERY_EXPECTED = {'operation': 'CREATE TABLE QUERY',
                                'procedure': 'testproc',
+                               'start': 2241, 'end': 2507, 'start_line': 94, 'end_line': 102,
                                'target_table': {'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_15'},
                                'from_table': [{'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_16'}],
                                'join_table': [{'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_17'},
@@ -196,6 +203,7 @@ PARSE_FILE_DELETE_EXPECTED = {'path': delete_path,
                               'schema': '',
                               'statements': [
                                   {'procedure': delete_path,
+                                   'start': 0, 'end': 48, 'start_line': 1, 'end_line': 1,
                                    'operation': 'DELETE',
                                    'target_table': {
                                        'name': 'src_tab_10',
@@ -209,6 +217,7 @@ PARSE_FILE_TRUNCATE_EXPECTED = {'path': truncate_path,
                                 'schema': '',
                                 'statements': [
                                     {'procedure': truncate_path,
+                                     'start': 0, 'end': 26, 'start_line': 1, 'end_line': 1,
                                      'operation': 'TRUNCATE',
                                      'target_table': {
                                          'name': 'src_tab_11',
@@ -222,6 +231,7 @@ PARSE_FILE_DROP_TABLE_EXPECTED = {'path': drop_table_path,
                                   'schema': '',
                                   'statements': [
                                       {'procedure': drop_table_path,
+                                       'start': 0, 'end': 32, 'start_line': 1, 'end_line': 1,
                                        'operation': 'DROP TABLE',
                                        'target_table': {
                                            'name': 'src_tab_12',
@@ -235,6 +245,7 @@ PARSE_FILE_INSERT_EXPECTED = {'path': insert_path,
                               'statements': [
                                   {'operation': 'INSERT',
                                    'procedure': insert_path,
+                                   'start': 0, 'end': 507, 'start_line': 1, 'end_line': 19,
                                    'from_table': [{'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_1'}],
                                    'join_table': [
                                        {'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_2'},
@@ -250,6 +261,7 @@ PARSE_FILE_REPLACE_EXPECTED = {'path': replace_path,
                                'statements': [
                                    {'operation': 'REPLACE',
                                     'procedure': replace_path,
+                                    'start': 0, 'end': 508, 'start_line': 1, 'end_line': 19,
                                     'from_table': [{'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_1'}],
                                     'join_table': [
                                         {'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_2'},
@@ -265,6 +277,7 @@ PARSE_FILE_UPDATE_EXPECTED = {'path': update_path,
                               'statements': [
                                   {'operation': 'UPDATE',
                                    'procedure': update_path,
+                                   'start': 0, 'end': 146, 'start_line': 1, 'end_line': 6,
                                    'join_table': [
                                        {'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_9'},
                                    ],
@@ -278,6 +291,7 @@ PARSE_FILE_CREATE_TABLE_LIKE_EXPECTED = {'path': create_table_like_path,
                                          'statements': [
                                              {'operation': 'CREATE TABLE LIKE',
                                               'procedure': create_table_like_path,
+                                              'start': 0, 'end': 40, 'start_line': 1, 'end_line': 1,
                                               'target_table': {'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_13'},
                                               'from_table': [{'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_14'}]}
                                          ]}
@@ -287,6 +301,7 @@ PARSE_FILE_CREATE_TABLE_COLUMNS_EXPECTED = {'path': create_table_columns_path,
                                             'schema': '',
                                             'statements': [{'operation': 'CREATE TABLE COLUMNS',
                                                            'procedure': create_table_columns_path,
+                                                           'start': 0, 'end': 219, 'start_line': 1, 'end_line': 10,
                                                             'target_table': {'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_16'},
                                                             'target_columns': ['col_1', 'col_2', 'col_3', 'col_4', 'col_5',
                                                                                'col_6', 'col_7']}]
@@ -297,6 +312,7 @@ PARSE_FILE_CREATE_TABLE_QUERY_EXPECTED = {'path': create_table_query_path,
                                           'schema': '',
                                           'statements': [{'operation': 'CREATE TABLE QUERY',
                                                           'procedure': create_table_query_path,
+                                                          'start': 0, 'end': 236, 'start_line': 1, 'end_line': 9,
                                                           'target_table': {'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_15'},
                                                           'from_table': [{'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_16'}],
                                                           'join_table': [{'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_17'},
@@ -310,6 +326,7 @@ PARSE_FILE_CREATE_TABLE_QUERY_EXPECTED = {'path': create_table_query_path,
 
 DIR_PROCEDURE_EXPECTED_INSERT = {'operation': 'INSERT',
                                  'procedure': procedure_path,
+                                 'start': 574, 'end': 1115, 'start_line': 27, 'end_line': 45,
                                  'from_table': [{'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_1'}],
                                  'join_table': [
                                      {'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_2'},
@@ -320,6 +337,7 @@ DIR_PROCEDURE_EXPECTED_INSERT = {'operation': 'INSERT',
 
 DIR_PROCEDURE_EXPECTED_REPLACE = {'operation': 'REPLACE',
                                   'procedure': procedure_path,
+                                  'start': 1119, 'end': 1689, 'start_line': 47, 'end_line': 65,
                                   'from_table': [{'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_1'}],
                                   'join_table': [
                                       {'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_2'},
@@ -330,6 +348,7 @@ DIR_PROCEDURE_EXPECTED_REPLACE = {'operation': 'REPLACE',
 
 DIR_PROCEDURE_EXPECTED_UPDATE = {'operation': 'UPDATE',
                                  'procedure': procedure_path,
+                                 'start': 1694, 'end': 1850, 'start_line': 68, 'end_line': 73,
                                  'join_table': [
                                      {'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_9'},
                                  ],
@@ -338,29 +357,35 @@ DIR_PROCEDURE_EXPECTED_UPDATE = {'operation': 'UPDATE',
 
 DIR_PROCEDURE_EXPECTED_DELETE = {'operation': 'DELETE',
                                  'procedure': procedure_path,
+                                 'start': 1854, 'end': 1902, 'start_line': 75, 'end_line': 75,
                                  'target_table': {'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_10'}}
 
 DIR_PROCEDURE_EXPECTED_TRUNCATE = {'operation': 'TRUNCATE',
                                    'procedure': procedure_path,
+                                   'start': 1906, 'end': 1932, 'start_line': 77, 'end_line': 77,
                                    'target_table': {'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_11'}}
 
 DIR_PROCEDURE_EXPECTED_DROP_TABLE = {'operation': 'DROP TABLE',
                                      'procedure': procedure_path,
+                                     'start': 1936, 'end': 1968, 'start_line': 79, 'end_line': 79,
                                      'target_table': {'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_12'}}
 
 DIR_PROCEDURE_EXPECTED_CREATE_TABLE_LIKE = {'operation': 'CREATE TABLE LIKE',
                                             'procedure': procedure_path,
+                                            'start': 2197, 'end': 2237, 'start_line': 92, 'end_line': 92,
                                             'target_table': {'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_13'},
                                             'from_table': [{'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_14'}]}
 
 DIR_PROCEDURE_EXPECTED_CREATE_TABLE_COLUMNS = {'operation': 'CREATE TABLE COLUMNS',
                                                'procedure': procedure_path,
+                                               'start': 1972, 'end': 2193, 'start_line': 81, 'end_line': 90,
                                                'target_table': {'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_16'},
                                                'target_columns': ['col_1', 'col_2', 'col_3', 'col_4', 'col_5',
                                                                   'col_6', 'col_7']}
 
 DIR_PROCEDURE_EXPECTED_CREATE_TABLE_QUERY = {'operation': 'CREATE TABLE QUERY',
                                              'procedure': procedure_path,
+                                             'start': 2241, 'end': 2507, 'start_line': 94, 'end_line': 102,
                                              'target_table': {'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_15'},
                                              'from_table': [{'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_16'}],
                                              'join_table': [{'schema': TEST_DEFAULT_SCHEMA, 'name': 'src_tab_17'},
@@ -724,4 +749,4 @@ OUTPUT_TEST_INPUT = [{
 JSON_OUTPUT_EXPECTED = {"my/test/path.sql": OUTPUT_TEST_INPUT}
 
 with open(f'./tests/_resources/output/mermaid.html', 'r') as template:
-    MERMAID_EXPECTED = BeautifulSoup(template.read(), features="html.parser")
+    MERMAID_EXPECTED = template.read()
@@ -0,0 +1,197 @@
+from collections import deque
+from itertools import chain, groupby
+from typing import List, Tuple, Set, Iterable
+from parse.models import Table, Procedure
+
+
+class LineageGraph:
+
+    """Table lineage graph built once from parsing results. Tables are
+    interned to integer ids, and each table keeps the ids of its parent and
+    child tables, as well as the statements writing and reading it, so that
+    upstream/downstream lookups only visit the reachable subgraph. Procedures
+    are indexed on their case-insensitive (schema, name) key"""
+
+    def __init__(self, results: List[Procedure]) -> None:
+
+        self.results = results
+        self.ids = {}
+        self.names = []
+        self.tables = {}
+        self.procedures = {}
+
+        # Adjacency lists and statements, indexed by table id. Adjacency lists
+        # may hold duplicates, which are skipped by breadth-first searches
+        self.parents = []
+        self.children = []
+        self.writers = []
+        self.readers = []
+
+        for i, p in enumerate(results):
+            self.procedures.setdefault(p.key(), []).append(i)
+            for j, s in enumerate(p.statements):
+                target = self.intern(s.target_table)
+                self.writers[target].append((i, j))
+                for t in s.tables():
+                    source = self.intern(t)
+                    self.readers[source].append((i, j))
+                    self.parents[target].append(source)
+                    self.children[source].append(target)
+
+    def intern(self, t: Table) -> int:
+
+        """
+        Returns the id of a table, registering it if not known yet.
+
+        :param t: Table object
+        :return: table id
+        """
+
+        # Tables with the same casing share their id without computing their key
+        table_id = self.tables.get(t)
+        if table_id is not None:
+            return table_id
+
+        key = t.key()
+        table_id = self.ids.get(key)
+
+        if table_id is None:
+            table_id = self.ids[key] = len(self.ids)
+            self.names.append(t)
+            self.parents.append([])
+            self.children.append([])
+            self.writers.append([])
+            self.readers.append([])
+
+        self.tables[t] = table_id
+        return table_id
+
+    def lookup(self, tables: List[Table]) -> Set[int]:
+
+        """
+        Gets the ids of known tables in a list of tables.
+
+        :param tables: list of Table objects
+        :return: set of table ids
+        """
+
+        keys = {t.key() for t in tables}
+        return {self.ids[k] for k in keys if k in self.ids}
+
+    def reach(self, tables: List[Table], adjacency: List[List[int]]) -> Set[int]:
+
+        """
+        Breadth-first search of all tables reachable from a list of tables.
+
+        :param tables: list of Table objects to start from
+        :param adjacency: self.parents or self.children
+        :return: set of reachable table ids, start tables included
+        """
+
+        seen = self.lookup(tables)
+        queue = deque(seen)
+
+        while queue:
+            for n in adjacency[queue.popleft()]:
+                if n not in seen:
+                    seen.add(n)
+                    queue.append(n)
+
+        return seen
+
+    def ancestors(self, tables: List[Table]) -> List[Table]:
+
+        """
+        Gets all direct and indirect parent tables of the selected tables.
+
+        :param tables: list of Table objects
+        :return: list of parent Table objects, as first found in results
+        """
+
+        ids = self.reach(tables, self.parents) - self.lookup(tables)
+        return [self.names[i] for i in sorted(ids)]
+
+    def descendants(self, tables: List[Table]) -> List[Table]:
+
+        """
+        Gets all direct and indirect child tables of the selected tables.
+
+        :param tables: list of Table objects
+        :return: list of child Table objects, as first found in results
+        """
+
+        ids = self.reach(tables, self.children) - self.lookup(tables)
+        return [self.names[i] for i in sorted(ids)]
+
+    def direct(self, tables: List[Table]) -> List[Procedure]:
+
+        """
+        Gets statements writing to or reading from the selected tables.
+        All procedures/files are kept, with no statements if none matches.
+
+        :param tables: list of Table objects
+        :return: list of Procedure objects holding these statements
+        """
+
+        refs = chain.from_iterable(self.writers[t] + self.readers[t] for t in self.lookup(tables))
+        return self.select(refs, keep_empty=True)
+
+    def upstream(self, tables: List[Table]) -> List[Procedure]:
+
+        """
+        Gets statements writing to the selected tables or any of their
+        direct and indirect parents.
+
+        :param tables: list of Table objects
+        :return: list of Procedure objects holding these statements
+        """
+
+        refs = chain.from_iterable(self.writers[t] for t in self.reach(tables, self.parents))
+        return self.select(refs)
+
+    def downstream(self, tables: List[Table]) -> List[Procedure]:
+
+        """
+        Gets statements reading from the selected tables or any of their
+        direct and indirect children.
+
+        :param tables: list of Table objects
+        :return: list of Procedure objects holding these statements
+        """
+
+        refs = chain.from_iterable(self.readers[t] for t in self.reach(tables, self.children))
+        return self.select(refs)
+
+    def select(self, refs: Iterable[Tuple[int, int]], keep_empty: bool = False) -> List[Procedure]:
+
+        """
+        Builds procedures/files holding the referenced statements,
+        in results and source order. Procedures/files without any referenced
+        statement are left out, unless keep_empty is set.
+
+        :param refs: iterable of (procedure index, statement index) tuples
+        :param keep_empty: keep procedures/files without referenced statements, with no statements
+        :return: list of Procedure objects
+        """
+
+        statements = {i: tuple(self.results[i].statements[j] for _, j in proc_refs)
+                      for i, proc_refs in groupby(sorted(set(refs)), key=lambda r: r[0])}
+
+        if keep_empty:
+            return [p._replace(statements=statements.get(i, ())) for i, p in enumerate(self.results)]
+
+        return [self.results[i]._replace(statements=statements[i]) for i in sorted(statements)]
+
+    def select_procedures(self, procedures: List[Table]) -> List[Procedure]:
+
+        """
+        Gets the procedures/files matching a list of procedure names.
+
+        :param procedures: list of procedure names, as Table objects
+        :return: list of Procedure objects, in results order
+        """
+
+        keys = {p.key() for p in procedures}
+        indexes = chain.from_iterable(self.procedures.get(k, []) for k in keys)
+
+        return [self.results[i] for i in sorted(indexes)]
@@ -1,59 +1,42 @@
-from typing import List, Dict
+from typing import List
+from parse.models import Table, Procedure
 
 
-def str_to_sql_dict(tables: List[str]) -> List[Dict]:
+def str_to_tables(tables: List[str]) -> List[Table]:
 
     """
-    Transforms a list of tables/procedures names into a list of dictionaries with keys schema and name
+    Transforms a list of tables/procedures names into a list of Table objects
 
     :param tables: list ot table names
-    :return: list of table dictionaries
+    :return: list of Table objects
     """
 
-    return [dict(zip(['schema', 'name'], t.lower().split('.'))) for t in tables]
+    return [Table(*t.lower().split('.')) for t in tables]
 
 
-def flatten(l: List[List[Dict]]) -> List[Dict]:
+def merge_results(results: List[Procedure]) -> List[Procedure]:
 
     """
-    Flattens list of lists.
+    Merges procedures/files corresponding to the same procedure/file
+    after recursive filtering, in a single pass. Statements found in several
+    procedures/files, e.g. reached from both parent and children tables, are
+    kept once.
 
-    :param l: list containing lists of table dictionaries
-    :return: list containing table dictionaries
+    :param results: list of Procedure objects to merge
+    :return: list of merged Procedure objects, in order of first appearance
     """
-    return[item for sublist in l for item in sublist]
 
+    merged = {}
+    seen = set()
 
-def merge_results(results: List[Dict]) -> List[Dict]:
-
-    """
-    Merges procedure/file dicts corresponding to the same procedure/file
-    after recursive filtering.
-
-    :param results: list of procedure/file dictionaries to merge
-    :return: list of merged procedure/file dictionaries
-    """
+    for x in results:
+        key = (x.schema, x.name, x.path)
+        statements = merged.setdefault(key, [])
 
-    combos = []
+        # Filtered procedures share the statement objects of the unfiltered results
+        for s in x.statements:
+            if id(s) not in seen:
+                seen.add(id(s))
+                statements.append(s)
 
-    # Create list of unique procedure/file dictionaries
-    for x in results:
-        c = {
-            'name': x['name'],
-            'path': x['path'],
-            'schema': x['schema'],
-            'statements': []
-        }
-        if c not in combos:
-            combos.append(c)
-
-    # Add all statements from results dictionaries to unique list's
-    # statement attribute
-    for x in combos:
-        for y in results:
-            if x['name'] == y['name'] \
-                    and x['path'] == y['path'] \
-                    and x['schema'] == y['schema']:
-                x['statements'].extend(y['statements'])
-
-    return combos
+    return [Procedure(*key, tuple(statements)) for key, statements in merged.items()]
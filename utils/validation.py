@@ -1,9 +1,10 @@
 import os
 from typing import List, Optional
 from utils.paths import is_path_creatable, is_pathname_valid
+from parse.preprocess import supported_preprocessors
 
 
-def validate_args(i: str, chart: str, json: str, tables: Optional[List[str]],
+def validate_args(i: str, chart: str, json: str, graph: str, tables: Optional[List[str]],
                   procedures: Optional[str], pmode: Optional[str],
                   fmode: Optional[str], v: Optional[str]) -> None:
 
@@ -13,7 +14,8 @@ def validate_args(i: str, chart: str, json: str, tables: Optional[List[str]],
 
     :param i: input file/directory path
     :param chart: output html flowchart path
-    :param json: output json file path
+    :param json: output json or jsonl (JSON Lines) file path
+    :param graph: output graph file path
     :param tables: list of table names, defaults to None
     :param procedures: list of procedure names, defaults to None
     :param pmode: parsing mode, defaults to None
@@ -23,7 +25,8 @@ def validate_args(i: str, chart: str, json: str, tables: Optional[List[str]],
 
     validate_input_path(i)
     validate_output_path(chart, 'html')
-    validate_output_path(json, 'json')
+    validate_output_path(json, 'jsonl' if json and json.endswith('.jsonl') else 'json')
+    validate_graph_path(graph)
     validate_sql_object_names(tables)
     validate_sql_object_names(procedures)
     validate_parsing_mode(pmode)
@@ -39,7 +42,7 @@ def validate_output_path(path: str, fmt: str) -> None:
     created at the specified path.
 
     :param path: output path argument specified by the user
-    :param fmt: file format, can be either json or html
+    :param fmt: file format, can be json, jsonl, html or a graph format
     """
 
     if path:
@@ -49,6 +52,23 @@ def validate_output_path(path: str, fmt: str) -> None:
             raise ValueError(f'output {fmt} file cannot be created at {path}')
 
 
+def validate_graph_path(path: str) -> None:
+
+    """
+    Ensures output graph file path has one of the supported graph formats
+    extensions, and can be created.
+
+    :param path: output graph path argument specified by the user
+    """
+
+    if path:
+        from output.graph import supported_graph_formats, graph_format
+        if graph_format(path) not in supported_graph_formats:
+            raise ValueError(f'Graph file extension must be one of the following values: '
+                             f'{supported_graph_formats}')
+        validate_output_path(path, graph_format(path))
+
+
 def validate_input_path(path: str) -> None:
 
     """
@@ -127,3 +147,58 @@ def validate_verbosity(v: Optional[str]) -> None:
         if v not in valid_levels:
             raise ValueError(f'Verbosity level must one of the following values: '
                              f'{valid_levels}')
+
+
+def validate_preprocessor(preprocessor: str) -> None:
+
+    """
+    Ensures the preprocessor set in config.ini has one of the accepted values.
+
+    :param preprocessor: preprocessor config value, can be fast or sqlparse
+    """
+
+    if preprocessor not in supported_preprocessors:
+        raise ValueError(f'Preprocessor must be one of the following values: '
+                         f'{supported_preprocessors}')
+
+
+def validate_partition(partition: Optional[str]) -> None:
+
+    """
+    Ensures flowchart partitioning mode has one of the accepted values.
+
+    :param partition: partitioning mode, can be components or schema, None
+    or empty for a single flowchart
+    """
+
+    if partition:
+        from output.mermaid import supported_partitions
+        if partition not in supported_partitions:
+            raise ValueError(f'Partitioning mode must be one of the following values: '
+                             f'{supported_partitions}')
+
+
+def validate_jobs(jobs: int) -> None:
+
+    """
+    Ensures the number of parsing processes is a positive integer, or 0 for
+    all available cores.
+
+    :param jobs: number of parsing processes
+    """
+
+    if not isinstance(jobs, int) or jobs < 0:
+        raise ValueError('Number of jobs must be a positive integer, or 0 to use all cores')
+
+
+def validate_limit(limit: int) -> None:
+
+    """
+    Ensures the maximum number of procedures/files displayed is a positive
+    integer, or 0 for no limit.
+
+    :param limit: maximum number of procedures/files displayed
+    """
+
+    if not isinstance(limit, int) or limit < 0:
+        raise ValueError('Display limit must be a positive integer, or 0 for no limit')